@@ -44,8 +44,11 @@ from .core_structures import (
 )
 
 # Storage and state management
-from .storage_schemas import InscriptionReference, DialogLibrarySchema, StorageManager
-from .state_machine import StateMachine, TransitionValidator, StateManager
+from .storage_schemas import (
+    InscriptionReference, DialogLibrarySchema, StorageManager, DecodedLibraryCache,
+    DialogLibraryView, LibraryLayout
+)
+from .state_machine import StateMachine, TransitionValidator, StateManager, DialogCache, TransitionTable
 
 # NLU and language processing
 from .nlu_engine import TokenMatcher, EntityRecognizer, IntentPattern
@@ -58,10 +61,13 @@ from .preference_structures import (
     TonePreference, PuzzleDifficulty, BehaviorType
 )
 from .preference_encoder import PreferenceEncoder
-from .trait_mapper import TraitMapper, MappingConflict
+from .trait_mapper import TraitMapper, MappingConflict, ConflictStatistics
+from .trait_matrix import TraitParameterMatrix
 from .response_selector import ResponseSelector
 from .behavioral_filter import BehavioralFilter, FilterResult
-from .governor_preferences import GovernorPreferencesManager
+from .text_features import TextFeatureScanner, TextFeatures, scanner_for_preferences
+from .governor_preferences import GovernorPreferencesManager, PreferenceCache
+from .preference_snapshot import PreferenceSnapshot, build_preference_snapshot
 
 __version__ = "1.0.0"
 __author__ = "Enochian Governor Generation Team"
@@ -81,9 +87,14 @@ __all__ = [
     "InscriptionReference",
     "DialogLibrarySchema",
     "StorageManager",
+    "DecodedLibraryCache",
+    "DialogLibraryView",
+    "LibraryLayout",
     "StateMachine",
     "TransitionValidator",
     "StateManager",
+    "DialogCache",
+    "TransitionTable",
     
     # NLU components
     "TokenMatcher",
@@ -104,10 +115,18 @@ __all__ = [
     "PreferenceEncoder",
     "TraitMapper",
     "MappingConflict",
+    "ConflictStatistics",
+    "TraitParameterMatrix",
     "ResponseSelector",
     "BehavioralFilter",
     "FilterResult",
+    "TextFeatureScanner",
+    "TextFeatures",
+    "scanner_for_preferences",
     "GovernorPreferencesManager",
+    "PreferenceCache",
+    "PreferenceSnapshot",
+    "build_preference_snapshot",
 ]
 
 # Convenience groupings for easier imports
@@ -14,10 +14,12 @@ Key Components:
 
 from typing import Dict, List, Any, Optional, Tuple, Set
 import logging
+import re
 from dataclasses import dataclass, field
 
 from .preference_structures import GovernorPreferences, TonePreference
 from .core_structures import PlayerState, IntentCategory, ResponseType
+from .text_features import TEXT_INDICATORS, DEFAULT_SCANNER, TextFeatures, scanner_for_preferences
 
 logger = logging.getLogger(__name__)
 
@@ -65,8 +67,11 @@ class BehavioralFilter:
         result = FilterResult(passed=True)
         
         try:
+            # Scan the player input once for every constraint check
+            input_features = scanner_for_preferences(preferences).scan(interaction_data.get('player_input', ''))
+            
             # Check formality requirements
-            formality_result = self._check_formality_constraints(interaction_data, preferences)
+            formality_result = self._check_formality_constraints(interaction_data, preferences, input_features)
             if not formality_result.passed:
                 result.passed = False
                 result.constraint_violations.extend(formality_result.constraint_violations)
@@ -80,7 +85,7 @@ class BehavioralFilter:
                 result.reasons.extend(reputation_result.reasons)
             
             # Check patience constraints
-            patience_result = self._check_patience_constraints(interaction_data, preferences)
+            patience_result = self._check_patience_constraints(interaction_data, preferences, input_features)
             if not patience_result.passed:
                 result.passed = False
                 result.constraint_violations.extend(patience_result.constraint_violations)
@@ -117,21 +122,24 @@ class BehavioralFilter:
         result = FilterResult(passed=True, filtered_content=content)
         
         try:
+            # Scan the content once for forbidden words, tone and metaphor checks
+            content_features = scanner_for_preferences(preferences).scan(content)
+            
             # Check for forbidden words
-            forbidden_result = self._filter_forbidden_content(content, preferences)
+            forbidden_result = self._filter_forbidden_content(content, preferences, content_features)
             if not forbidden_result.passed:
                 result.passed = False
                 result.reasons.extend(forbidden_result.reasons)
                 return result
             
             # Apply tone-based content modifications
-            tone_result = self._apply_tone_content_filter(content, preferences.tone_preference)
+            tone_result = self._apply_tone_content_filter(content, preferences.tone_preference, content_features)
             result.filtered_content = tone_result.filtered_content
             result.modifications_applied.extend(tone_result.modifications_applied)
             
-            # Apply metaphor tolerance filtering
+            # Apply metaphor tolerance filtering (tone rewrites never touch metaphor phrases)
             content_for_metaphor = result.filtered_content or content
-            metaphor_result = self._apply_metaphor_filter(content_for_metaphor, preferences)
+            metaphor_result = self._apply_metaphor_filter(content_for_metaphor, preferences, content_features)
             result.filtered_content = metaphor_result.filtered_content
             result.modifications_applied.extend(metaphor_result.modifications_applied)
             
@@ -233,10 +241,8 @@ class BehavioralFilter:
     def _initialize_content_filters(self) -> Dict[str, List[str]]:
         """Initialize content filtering rules."""
         return {
-            'profanity': ['damn', 'hell', 'crap'],
-            'modern_references': ['internet', 'computer', 'phone', 'email'],
-            'casual_speech': ['yeah', 'ok', 'cool', 'awesome'],
-            'disrespectful': ['stupid', 'dumb', 'idiot', 'moron']
+            category: list(TEXT_INDICATORS[category])
+            for category in ('profanity', 'modern_references', 'casual_speech', 'disrespectful')
         }
     
     def _initialize_reputation_modifiers(self) -> Dict[str, float]:
@@ -249,20 +255,18 @@ class BehavioralFilter:
         }
     
     def _check_formality_constraints(self, interaction_data: Dict[str, Any], 
-                                   preferences: GovernorPreferences) -> FilterResult:
+                                   preferences: GovernorPreferences,
+                                   input_features: Optional[TextFeatures] = None) -> FilterResult:
         """Check if interaction meets formality requirements."""
         result = FilterResult(passed=True)
         
-        player_input = interaction_data.get('player_input', '')
         required_formality = preferences.greeting_formality
         
         # Simple formality check based on keywords
-        formal_indicators = ['please', 'respectfully', 'kindly', 'may i', 'would you']
-        casual_indicators = ['hey', 'yo', 'sup', 'whatever']
-        
-        input_lower = player_input.lower()
-        formal_count = sum(1 for word in formal_indicators if word in input_lower)
-        casual_count = sum(1 for word in casual_indicators if word in input_lower)
+        if input_features is None:
+            input_features = scanner_for_preferences(preferences).scan(interaction_data.get('player_input', ''))
+        formal_count = input_features.count('input_formal')
+        casual_count = input_features.count('input_casual')
         
         if required_formality > 0.7 and casual_count > 0:
             result.passed = False
@@ -293,17 +297,16 @@ class BehavioralFilter:
         return result
     
     def _check_patience_constraints(self, interaction_data: Dict[str, Any], 
-                                  preferences: GovernorPreferences) -> FilterResult:
+                                  preferences: GovernorPreferences,
+                                  input_features: Optional[TextFeatures] = None) -> FilterResult:
         """Check patience-related constraints."""
         result = FilterResult(passed=True)
         
         # Check if player is being too hasty or impatient
-        player_input = interaction_data.get('player_input', '')
-        haste_indicators = ['hurry', 'quick', 'fast', 'now', 'immediately']
-        
         if preferences.response_patience > 0.7:  # Patient governor
-            input_lower = player_input.lower()
-            if any(indicator in input_lower for indicator in haste_indicators):
+            if input_features is None:
+                input_features = scanner_for_preferences(preferences).scan(interaction_data.get('player_input', ''))
+            if input_features.has('haste'):
                 result.passed = False
                 result.reasons.append("Governor values patience and deliberation")
                 result.constraint_violations.append("excessive_haste")
@@ -333,19 +336,22 @@ class BehavioralFilter:
         
         return result
     
-    def _filter_forbidden_content(self, content: str, preferences: GovernorPreferences) -> FilterResult:
+    def _filter_forbidden_content(self, content: str, preferences: GovernorPreferences,
+                                  content_features: Optional[TextFeatures] = None) -> FilterResult:
         """Filter out forbidden content based on preferences."""
         result = FilterResult(passed=True)
         
+        if content_features is None:
+            content_features = scanner_for_preferences(preferences).scan(content)
+        
         # Check against forbidden words
-        if preferences.has_forbidden_word(content):
+        if content_features.has('forbidden'):
             result.passed = False
             result.reasons.append("Content contains forbidden words")
         
         # Check against content filters
-        content_lower = content.lower()
-        for category, words in self.content_filters.items():
-            if any(word in content_lower for word in words):
+        for category in self.content_filters:
+            if content_features.has(category):
                 if category == 'profanity':
                     result.passed = False
                     result.reasons.append("Content contains inappropriate language")
@@ -353,28 +359,36 @@ class BehavioralFilter:
         
         return result
     
-    def _apply_tone_content_filter(self, content: str, tone_preference: TonePreference) -> FilterResult:
+    def _apply_tone_content_filter(self, content: str, tone_preference: TonePreference,
+                                   content_features: Optional[TextFeatures] = None) -> FilterResult:
         """Apply tone-based content filtering."""
         result = FilterResult(passed=True, filtered_content=content)
         
+        if content_features is None:
+            content_features = DEFAULT_SCANNER.scan(content)
+        
         # Apply tone-specific modifications
         if tone_preference == TonePreference.MYSTICAL_POETIC:
-            if 'truth' in content.lower():
-                result.filtered_content = content.replace('truth', 'sacred truth')
+            if content_features.has('mystical_enhancement'):
+                result.filtered_content = re.sub(r'\btruth\b', 'sacred truth', content)
                 result.modifications_applied.append("mystical_language_enhancement")
         
         elif tone_preference == TonePreference.SCHOLARLY_PATIENT:
-            if 'wrong' in content.lower():
-                result.filtered_content = content.replace('wrong', 'not quite accurate')
+            if content_features.has('scholarly_softening'):
+                result.filtered_content = re.sub(r'\bwrong\b', 'not quite accurate', content)
                 result.modifications_applied.append("scholarly_softening")
         
         return result
     
-    def _apply_metaphor_filter(self, content: str, preferences: GovernorPreferences) -> FilterResult:
+    def _apply_metaphor_filter(self, content: str, preferences: GovernorPreferences,
+                               content_features: Optional[TextFeatures] = None) -> FilterResult:
         """Apply metaphor tolerance filtering."""
         result = FilterResult(passed=True, filtered_content=content)
         
         if preferences.metaphor_tolerance < 0.3:  # Low metaphor tolerance
+            if content_features is None:
+                content_features = scanner_for_preferences(preferences).scan(content)
+            
             # Convert metaphors to more literal language
             metaphor_replacements = {
                 'shadow of doubt': 'uncertainty',
@@ -384,7 +398,7 @@ class BehavioralFilter:
             
             modified_content = content
             for metaphor, literal in metaphor_replacements.items():
-                if metaphor in modified_content.lower():
+                if content_features.has_term('literalizable_metaphors', metaphor):
                     modified_content = modified_content.replace(metaphor, literal)
                     result.modifications_applied.append(f"literalized_{metaphor.replace(' ', '_')}")
             
@@ -7,34 +7,75 @@ Governor Preferences System to maximize performance in production environments.
 
 Key Components:
 - AdvancedCache: Multi-level caching with intelligent eviction
+- ShardedAdvancedCache: Lock-striped AdvancedCache for multi-threaded workers
+- TimingWheel / ExpirySweeper: Amortized O(1) TTL expiry with optional background sweeping
 - PreferenceOptimizer: Performance optimization for preference operations
 - MemoryManager: Memory usage optimization and monitoring
 """
 
 import time
 import logging
+import asyncio
 import threading
 import hashlib
 import pickle
 import gzip
+import zlib
 import re
+import os
+import sys
+import mmap
+import struct
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple, Callable
+from typing import Dict, Any, Optional, List, Tuple, Callable, Set, FrozenSet, Iterable
 from dataclasses import dataclass, field
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks (e.g. Windows); segment directory ownership is then unchecked
+    fcntl = None
+
 from .preference_structures import GovernorPreferences, PreferenceEncoding
 from .core_structures import GovernorProfile
 
 logger = logging.getLogger(__name__)
 
+# Returned by AdvancedCache._decompress_data for unreadable entries (None is a valid cached value)
+DECOMPRESSION_FAILED = object()
+
 class CacheLevel(Enum):
     """Cache level priorities for multi-level caching"""
     L1_MEMORY = "l1_memory"        # Fast in-memory cache
     L2_COMPRESSED = "l2_compressed" # Compressed memory cache
     L3_PERSISTENT = "l3_persistent" # Persistent disk cache
 
+class L3Backend(Enum):
+    """Storage backends available for the L3 persistent cache level"""
+    FILE_PER_KEY = "file_per_key"  # One pickle file per key (L3StorageManager)
+    SEGMENT = "segment"            # Append-only segment files (SegmentL3StorageManager)
+
+class CacheTags:
+    """Builders for the invalidation tags attached to cache entries"""
+    
+    @staticmethod
+    def governor(governor_id: str) -> str:
+        """Tag for entries derived from a governor's profile"""
+        return f"governor:{governor_id}"
+    
+    @staticmethod
+    def traits(traits: Iterable[str]) -> str:
+        """Tag for entries derived from a trait signature"""
+        return "traits:" + "_".join(sorted(traits))
+    
+    @staticmethod
+    def content_version(version: str) -> str:
+        """Tag for entries derived from a specific content version"""
+        return f"version:{version}"
+
 @dataclass
 class CacheEntry:
     """Single cache entry with metadata"""
@@ -45,6 +86,9 @@ class CacheEntry:
     last_access: float = field(default_factory=time.time)
     cache_level: CacheLevel = CacheLevel.L1_MEMORY
     compressed_size: int = 0
+    uncompressed_size: int = 0
+    approximate_size: int = 0  # Rough L1 footprint, recorded when the data is stored
+    tags: FrozenSet[str] = frozenset()
     
     def __post_init__(self):
         """Update access metadata"""
@@ -148,6 +192,16 @@ class L3StorageManager:
             logger.error(f"Failed to load from L3 cache: {key}, error: {e}")
             return None
     
+    def delete_from_persistent_cache(self, key: str) -> bool:
+        """Delete a single key from persistent storage"""
+        try:
+            safe_filename = self._create_safe_filename(key)
+            (self.storage_dir / f"{safe_filename}.cache").unlink(missing_ok=True)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete from L3 cache: {key}, error: {e}")
+            return False
+    
     def clear_persistent_cache(self) -> bool:
         """Clear all persistent cache files"""
         try:
@@ -185,39 +239,765 @@ class L3StorageManager:
         computed_checksum = hashlib.md5(cache_data['data']).hexdigest()
         return computed_checksum == cache_data['checksum']
 
+@dataclass
+class SegmentRecordLocation:
+    """Location of a live record inside an L3 segment file"""
+    segment_id: int
+    offset: int
+    length: int
+    timestamp: float
+
+class SegmentL3StorageManager:
+    """
+    Append-only segment-file storage manager for the L3 cache level.
+    
+    Records are appended to a small number of segment files and located via an
+    in-memory key -> (segment, offset) index, so a spill or a miss costs one
+    append or one mmap slice instead of a file create/open per key. Every record
+    carries a CRC32, and sealed segments dominated by dead records are rewritten
+    by compaction (on demand or from a background thread).
+    
+    The index lives only in this process, so a directory must be owned by a
+    single manager: another process appending to the same segments would
+    invalidate its offsets. Ownership is held with an exclusive lock on
+    LOCK_FILE_NAME until close(); give each worker process its own directory.
+    
+    Record layout: crc32 | flags | key_len | value_len | timestamp | key | value
+    """
+    
+    RECORD_HEADER = struct.Struct(">IBHId")  # crc, flags, key_len, value_len, timestamp
+    FLAG_TOMBSTONE = 0x01
+    SEGMENT_SUFFIX = ".seg"
+    LOCK_FILE_NAME = "segments.lock"
+    
+    def __init__(self, storage_dir: str = "cache_storage", max_segment_bytes: int = 64 * 1024 * 1024,
+                 max_age_seconds: int = 86400, compaction_threshold: float = 0.5,
+                 fsync_writes: bool = False):
+        """
+        Initialize segment storage manager and rebuild the index from disk.
+        
+        Raises RuntimeError if another manager already owns storage_dir.
+        
+        Args:
+            storage_dir: Directory holding the segment files
+            max_segment_bytes: Size at which the active segment is sealed
+            max_age_seconds: Age after which records are treated as expired
+            compaction_threshold: Dead-byte ratio at which a sealed segment is compacted
+            fsync_writes: Whether to fsync the active segment after every append
+        """
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(exist_ok=True)
+        self._lock_file = self._acquire_directory_lock()
+        self.compression_level = 6  # Balanced compression
+        self.max_segment_bytes = max_segment_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compaction_threshold = compaction_threshold
+        self.fsync_writes = fsync_writes
+        
+        self.index: Dict[str, SegmentRecordLocation] = {}
+        self.segment_sizes: Dict[int, int] = {}
+        self.segment_live_bytes: Dict[int, int] = {}
+        self.compaction_stats = {'compactions': 0, 'segments_removed': 0, 'bytes_reclaimed': 0}
+        
+        self._lock = threading.RLock()
+        self._mmaps: Dict[int, mmap.mmap] = {}
+        self._active_segment_id = 0
+        self._active_file = None
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._stop_compaction = threading.Event()
+        
+        self._rebuild_index()
+        self._open_active_segment(max(self.segment_sizes, default=0))
+        logger.info(f"SegmentL3StorageManager initialized: {self.storage_dir} "
+                    f"({len(self.index)} records in {len(self.segment_sizes)} segments)")
+    
+    def save_to_persistent_cache(self, key: str, data: Any) -> bool:
+        """
+        Save data to persistent storage.
+        
+        Args:
+            key: Cache key
+            data: Data to save
+            
+        Returns:
+            True if saved successfully
+        """
+        try:
+            serialized_data = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            compressed_data = zlib.compress(serialized_data, self.compression_level)
+            with self._lock:
+                self._append_record(key, compressed_data, flags=0)
+            logger.debug(f"Saved to L3 segment cache: {key}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save to L3 cache: {key}, error: {e}")
+            return False
+    
+    def load_from_persistent_cache(self, key: str) -> Optional[Any]:
+        """
+        Load data from persistent storage.
+        
+        Args:
+            key: Cache key to load
+            
+        Returns:
+            Cached data if found and valid, None otherwise
+        """
+        try:
+            with self._lock:
+                location = self.index.get(key)
+                if location is None:
+                    return None
+                
+                if time.time() - location.timestamp > self.max_age_seconds:
+                    logger.debug(f"L3 cache expired for key: {key}")
+                    self._drop_from_index(key)
+                    return None
+                
+                record = self._read_record(location)
+                if record is None:
+                    logger.warning(f"L3 cache corruption detected for key: {key}")
+                    self._drop_from_index(key)
+                    return None
+                compressed_data = record[2]
+            
+            # Decompress and deserialize outside the lock
+            data = pickle.loads(zlib.decompress(compressed_data))
+            logger.debug(f"Loaded from L3 segment cache: {key}")
+            return data
+        
+        except Exception as e:
+            logger.error(f"Failed to load from L3 cache: {key}, error: {e}")
+            return None
+    
+    def delete_from_persistent_cache(self, key: str) -> bool:
+        """Delete a single key by appending a tombstone record"""
+        try:
+            with self._lock:
+                if key in self.index:
+                    self._append_record(key, b"", flags=self.FLAG_TOMBSTONE)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete from L3 cache: {key}, error: {e}")
+            return False
+    
+    def clear_persistent_cache(self) -> bool:
+        """Clear all persistent cache segments"""
+        try:
+            with self._lock:
+                self._close_files()
+                for segment_id in list(self.segment_sizes):
+                    self._segment_path(segment_id).unlink(missing_ok=True)
+                self.index.clear()
+                self.segment_sizes.clear()
+                self.segment_live_bytes.clear()
+                self._open_active_segment(0)
+            logger.info("L3 segment cache cleared")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to clear L3 cache: {e}")
+            return False
+    
+    def get_cache_size(self) -> int:
+        """Get total size of persistent cache in bytes"""
+        with self._lock:
+            return sum(self.segment_sizes.values())
+    
+    def compact(self, force: bool = False) -> int:
+        """
+        Rewrite live records out of sealed segments dominated by dead bytes.
+        
+        Tombstones are carried forward while an older segment remains that
+        could still hold the deleted put; dropping them would let the index
+        rebuild resurrect the key.
+        
+        Args:
+            force: Compact every sealed segment regardless of dead-byte ratio
+            
+        Returns:
+            Number of bytes reclaimed
+        """
+        reclaimed = 0
+        with self._lock:
+            sealed_segments = sorted(sid for sid in self.segment_sizes if sid != self._active_segment_id)
+            for segment_id in sealed_segments:
+                size = self.segment_sizes[segment_id]
+                live = self.segment_live_bytes.get(segment_id, 0)
+                if not force and size > 0 and (size - live) / size < self.compaction_threshold:
+                    continue
+                
+                # Copy live records into the active segment
+                for key, location in list(self.index.items()):
+                    if location.segment_id != segment_id:
+                        continue
+                    record = self._read_record(location)
+                    if record is None:
+                        self._drop_from_index(key)
+                        continue
+                    self._append_record(key, record[2], flags=0, timestamp=location.timestamp)
+                
+                if any(older_id < segment_id for older_id in self.segment_sizes):
+                    for key, timestamp in self._segment_tombstones(segment_id).items():
+                        if key not in self.index:
+                            self._append_record(key, b"", flags=self.FLAG_TOMBSTONE, timestamp=timestamp)
+                
+                reclaimed += self._remove_segment(segment_id)
+            
+            if reclaimed:
+                self.compaction_stats['compactions'] += 1
+                self.compaction_stats['bytes_reclaimed'] += reclaimed
+        
+        if reclaimed:
+            logger.info(f"L3 segment compaction reclaimed {reclaimed} bytes")
+        return reclaimed
+    
+    def start_background_compaction(self, interval_seconds: float = 60.0) -> None:
+        """Start a daemon thread that periodically compacts sealed segments"""
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+        
+        self._stop_compaction.clear()
+        
+        def compaction_loop():
+            while not self._stop_compaction.wait(interval_seconds):
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"Background L3 compaction failed: {e}")
+        
+        self._compaction_thread = threading.Thread(
+            target=compaction_loop, name="l3-segment-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+        logger.info(f"L3 background compaction started (every {interval_seconds}s)")
+    
+    def stop_background_compaction(self) -> None:
+        """Stop the background compaction thread"""
+        self._stop_compaction.set()
+        if self._compaction_thread:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+    
+    def close(self) -> None:
+        """Stop compaction, release open file handles and mappings, and give up the directory"""
+        self.stop_background_compaction()
+        with self._lock:
+            self._close_files()
+            if self._lock_file is not None:
+                self._lock_file.close()  # Releases the directory lock
+                self._lock_file = None
+    
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Get segment layout and compaction statistics"""
+        with self._lock:
+            total_bytes = sum(self.segment_sizes.values())
+            live_bytes = sum(self.segment_live_bytes.values())
+            return {
+                'records': len(self.index),
+                'segments': len(self.segment_sizes),
+                'total_bytes': total_bytes,
+                'live_bytes': live_bytes,
+                'dead_bytes': total_bytes - live_bytes,
+                **self.compaction_stats
+            }
+    
+    def _append_record(self, key: str, value: bytes, flags: int,
+                       timestamp: Optional[float] = None) -> SegmentRecordLocation:
+        """Append a record to the active segment and update the index (lock held)"""
+        if self.segment_sizes[self._active_segment_id] >= self.max_segment_bytes:
+            self._open_active_segment(self._active_segment_id + 1)
+        
+        key_bytes = key.encode('utf-8')
+        timestamp = time.time() if timestamp is None else timestamp
+        body = self.RECORD_HEADER.pack(0, flags, len(key_bytes), len(value), timestamp)[4:]
+        body += key_bytes + value
+        record = struct.pack(">I", zlib.crc32(body)) + body
+        
+        segment_id = self._active_segment_id
+        offset = self.segment_sizes[segment_id]
+        self._active_file.write(record)
+        self._active_file.flush()
+        if self.fsync_writes:
+            os.fsync(self._active_file.fileno())
+        self.segment_sizes[segment_id] = offset + len(record)
+        
+        self._drop_from_index(key)
+        location = SegmentRecordLocation(segment_id, offset, len(record), timestamp)
+        if not flags & self.FLAG_TOMBSTONE:
+            self.index[key] = location
+            self.segment_live_bytes[segment_id] = self.segment_live_bytes.get(segment_id, 0) + len(record)
+        return location
+    
+    def _read_record(self, location: SegmentRecordLocation) -> Optional[Tuple[int, str, bytes, float]]:
+        """Read and CRC-verify a record through the segment mmap (lock held)"""
+        end = location.offset + location.length
+        segment_map = self._mmaps.get(location.segment_id)
+        if segment_map is None or len(segment_map) < end:
+            segment_map = self._map_segment(location.segment_id)
+            if segment_map is None or len(segment_map) < end:
+                return None
+        return self._parse_record(segment_map[location.offset:end])
+    
+    def _parse_record(self, record: bytes) -> Optional[Tuple[int, str, bytes, float]]:
+        """Parse a raw record, returning (flags, key, value, timestamp) if the CRC matches"""
+        header_size = self.RECORD_HEADER.size
+        if len(record) < header_size:
+            return None
+        crc, flags, key_len, value_len, timestamp = self.RECORD_HEADER.unpack_from(record)
+        if len(record) != header_size + key_len + value_len or zlib.crc32(record[4:]) != crc:
+            return None
+        key = record[header_size:header_size + key_len].decode('utf-8')
+        return flags, key, record[header_size + key_len:], timestamp
+    
+    def _segment_tombstones(self, segment_id: int) -> Dict[str, float]:
+        """Keys deleted by tombstones in a segment, with their timestamps (lock held)"""
+        segment_map = self._map_segment(segment_id)
+        if segment_map is None:
+            return {}
+        
+        tombstones: Dict[str, float] = {}
+        header_size = self.RECORD_HEADER.size
+        offset = 0
+        while offset + header_size <= len(segment_map):
+            _, _, key_len, value_len, _ = self.RECORD_HEADER.unpack_from(segment_map, offset)
+            length = header_size + key_len + value_len
+            record = self._parse_record(segment_map[offset:offset + length])
+            if record is None:
+                break
+            flags, key, _, timestamp = record
+            if flags & self.FLAG_TOMBSTONE:
+                tombstones[key] = timestamp
+            offset += length
+        return tombstones
+    
+    def _drop_from_index(self, key: str) -> None:
+        """Remove a key from the index and mark its bytes dead (lock held)"""
+        location = self.index.pop(key, None)
+        if location is not None:
+            self.segment_live_bytes[location.segment_id] -= location.length
+    
+    def _rebuild_index(self) -> None:
+        """Scan existing segments in order, replaying puts and tombstones"""
+        header_size = self.RECORD_HEADER.size
+        for segment_path in sorted(self.storage_dir.glob(f"*{self.SEGMENT_SUFFIX}")):
+            try:
+                segment_id = int(segment_path.stem.split('_')[-1])
+            except ValueError:
+                continue
+            
+            data = segment_path.read_bytes()
+            self.segment_sizes[segment_id] = len(data)
+            self.segment_live_bytes.setdefault(segment_id, 0)
+            offset = 0
+            while offset + header_size <= len(data):
+                _, _, key_len, value_len, _ = self.RECORD_HEADER.unpack_from(data, offset)
+                length = header_size + key_len + value_len
+                record = self._parse_record(data[offset:offset + length])
+                if record is None:
+                    logger.warning(f"Truncated or corrupt L3 record in {segment_path.name} at {offset}")
+                    break
+                flags, key, _, timestamp = record
+                self._drop_from_index(key)
+                if not flags & self.FLAG_TOMBSTONE:
+                    self.index[key] = SegmentRecordLocation(segment_id, offset, length, timestamp)
+                    self.segment_live_bytes[segment_id] += length
+                offset += length
+            
+            if offset < len(data):
+                # Drop the torn tail so later appends start on a record boundary
+                with open(segment_path, 'r+b') as f:
+                    f.truncate(offset)
+                self.segment_sizes[segment_id] = offset
+    
+    def _open_active_segment(self, segment_id: int) -> None:
+        """Open (or create) the segment that receives appends (lock held)"""
+        if self._active_file:
+            self._active_file.close()
+        self._active_segment_id = segment_id
+        self._active_file = open(self._segment_path(segment_id), 'ab')
+        self.segment_sizes.setdefault(segment_id, 0)
+        self.segment_live_bytes.setdefault(segment_id, 0)
+    
+    def _map_segment(self, segment_id: int) -> Optional[mmap.mmap]:
+        """(Re)create the read-only mapping of a segment (lock held)"""
+        old_map = self._mmaps.pop(segment_id, None)
+        if old_map is not None:
+            old_map.close()
+        if not self.segment_sizes.get(segment_id):
+            return None
+        with open(self._segment_path(segment_id), 'rb') as f:
+            segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mmaps[segment_id] = segment_map
+        return segment_map
+    
+    def _remove_segment(self, segment_id: int) -> int:
+        """Delete a sealed segment file, returning its size (lock held)"""
+        segment_map = self._mmaps.pop(segment_id, None)
+        if segment_map is not None:
+            segment_map.close()
+        size = self.segment_sizes.pop(segment_id, 0)
+        self.segment_live_bytes.pop(segment_id, None)
+        self._segment_path(segment_id).unlink(missing_ok=True)
+        self.compaction_stats['segments_removed'] += 1
+        return size
+    
+    def _acquire_directory_lock(self):
+        """Take the exclusive ownership lock on the storage directory"""
+        lock_file = open(self.storage_dir / self.LOCK_FILE_NAME, "ab")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                raise RuntimeError(f"Segment directory {self.storage_dir} is owned by another "
+                                   f"storage manager; use a separate directory per process")
+        return lock_file
+    
+    def _close_files(self) -> None:
+        """Close the active segment and all mappings (lock held)"""
+        for segment_map in self._mmaps.values():
+            segment_map.close()
+        self._mmaps.clear()
+        if self._active_file:
+            self._active_file.close()
+            self._active_file = None
+    
+    def _segment_path(self, segment_id: int) -> Path:
+        """Path of the segment file with the given id"""
+        return self.storage_dir / f"segment_{segment_id:08d}{self.SEGMENT_SUFFIX}"
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel for bulk expiry of cache keys.
+    
+    Level 0 has `slots_per_level` slots of one tick each. Each higher level
+    covers `slots_per_level` times the span of the level below. Keys far in the
+    future sit in coarse slots and cascade down as the wheel turns, so
+    scheduling, cancelling and expiring a key are all amortized O(1).
+    """
+    
+    def __init__(self, tick_seconds: float = 1.0, slots_per_level: int = 64, levels: int = 4,
+                 start_time: Optional[float] = None):
+        """
+        Initialize the timing wheel.
+        
+        Args:
+            tick_seconds: Resolution of the finest level
+            slots_per_level: Slots in each level
+            levels: Number of levels (deadlines beyond the top level are clamped and re-cascaded)
+            start_time: Wall-clock time of tick zero (defaults to now)
+        """
+        self.tick_seconds = tick_seconds
+        self.slots_per_level = slots_per_level
+        self._wheels: List[List[Set[str]]] = [
+            [set() for _ in range(slots_per_level)] for _ in range(levels)
+        ]
+        self._deadlines: Dict[str, int] = {}  # key -> deadline tick
+        self._positions: Dict[str, Tuple[int, int]] = {}  # key -> (level, slot)
+        self._current_tick = self._to_tick(time.time() if start_time is None else start_time)
+    
+    def __len__(self) -> int:
+        return len(self._deadlines)
+    
+    def schedule(self, key: str, expires_at: float) -> None:
+        """Schedule (or reschedule) a key to expire at a wall-clock time"""
+        self.cancel(key)
+        # Round up so a key never fires before its deadline
+        deadline_tick = -int(-expires_at // self.tick_seconds)
+        self._deadlines[key] = max(deadline_tick, self._current_tick + 1)
+        self._place(key)
+    
+    def cancel(self, key: str) -> None:
+        """Stop tracking a key"""
+        if self._deadlines.pop(key, None) is None:
+            return
+        level, slot = self._positions.pop(key)
+        self._wheels[level][slot].discard(key)
+    
+    def advance(self, now: Optional[float] = None) -> List[str]:
+        """
+        Turn the wheel up to `now`, returning the keys whose deadlines passed.
+        
+        Args:
+            now: Wall-clock time to advance to (defaults to now)
+            
+        Returns:
+            Keys that expired, no longer tracked by the wheel
+        """
+        target_tick = self._to_tick(time.time() if now is None else now)
+        expired: List[str] = []
+        
+        while self._current_tick < target_tick:
+            if not self._deadlines:
+                self._current_tick = target_tick
+                break
+            
+            self._current_tick += 1
+            tick = self._current_tick
+            
+            # Cascade coarser levels whose slot boundary was just crossed
+            span = 1
+            for level in range(1, len(self._wheels)):
+                span *= self.slots_per_level
+                if tick % span:
+                    break
+                slot = (tick // span) % self.slots_per_level
+                for key in list(self._wheels[level][slot]):
+                    self._wheels[level][slot].discard(key)
+                    self._place(key)
+            
+            # Expire everything due in the current fine slot
+            bucket = self._wheels[0][tick % self.slots_per_level]
+            for key in list(bucket):
+                if self._deadlines[key] <= tick:
+                    bucket.discard(key)
+                    del self._deadlines[key]
+                    del self._positions[key]
+                    expired.append(key)
+        
+        return expired
+    
+    def _place(self, key: str) -> None:
+        """Put a key into the slot matching its remaining delay"""
+        deadline = self._deadlines[key]
+        delay = deadline - self._current_tick
+        span = 1
+        for level in range(len(self._wheels)):
+            if delay < span * self.slots_per_level or level == len(self._wheels) - 1:
+                if delay >= span * self.slots_per_level:
+                    # Beyond the top level: park in the furthest slot and cascade again later
+                    deadline = self._current_tick + span * (self.slots_per_level - 1)
+                slot = (deadline // span) % self.slots_per_level
+                self._wheels[level][slot].add(key)
+                self._positions[key] = (level, slot)
+                return
+            span *= self.slots_per_level
+    
+    def _to_tick(self, timestamp: float) -> int:
+        """Convert wall-clock seconds to a wheel tick"""
+        return int(timestamp // self.tick_seconds)
+
+class ExpirySweeper:
+    """
+    Runs an expiry callback periodically on a daemon thread or as an asyncio task.
+    
+    The callback is typically AdvancedCache.expire_entries or
+    GovernorPreferencesManager.expire_stale_preferences.
+    """
+    
+    def __init__(self, sweep_func: Callable[[], Any], interval_seconds: float = 5.0,
+                 name: str = "expiry-sweeper"):
+        """Initialize the sweeper with the callback to run every interval"""
+        self.sweep_func = sweep_func
+        self.interval_seconds = interval_seconds
+        self.name = name
+        self.sweeps = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start sweeping on a background daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"{self.name} started (every {self.interval_seconds}s)")
+    
+    def stop(self) -> None:
+        """Stop the background thread (or asyncio loop) and wait for it"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    async def run_async(self) -> None:
+        """Sweep periodically inside an asyncio event loop until stop() is called"""
+        self._stop_event.clear()
+        while not self._stop_event.is_set():
+            await asyncio.sleep(self.interval_seconds)
+            self._sweep_once()
+    
+    def _run(self) -> None:
+        """Thread body"""
+        while not self._stop_event.wait(self.interval_seconds):
+            self._sweep_once()
+    
+    def _sweep_once(self) -> None:
+        """Run the callback, logging rather than propagating failures"""
+        try:
+            self.sweep_func()
+            self.sweeps += 1
+        except Exception as e:
+            logger.error(f"{self.name} sweep failed: {e}")
+
+class CountMinSketch:
+    """
+    Compact frequency estimator with periodic aging.
+    
+    Uses `depth` rows of saturating 4-bit counters (stored one per byte) indexed
+    by double hashing. After `sample_size` increments every counter is halved,
+    so the estimates track recent popularity instead of all-time totals.
+    """
+    
+    MAX_COUNT = 15
+    
+    def __init__(self, width: int = 1024, depth: int = 4, sample_size: Optional[int] = None):
+        """
+        Initialize the sketch.
+        
+        Args:
+            width: Counters per row (rounded up to a power of two)
+            depth: Number of hash rows
+            sample_size: Increments between aging passes (default 10 * width)
+        """
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.depth = depth
+        self.sample_size = sample_size or 10 * self.width
+        self._mask = self.width - 1
+        self._rows = [bytearray(self.width) for _ in range(depth)]
+        self._additions = 0
+        self.resets = 0
+    
+    def increment(self, key: str) -> None:
+        """Record one occurrence of a key"""
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+        
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+    
+    def estimate(self, key: str) -> int:
+        """Estimate how often a key occurred recently"""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+    
+    def _indexes(self, key: str) -> List[int]:
+        """Derive one counter index per row from a single hash"""
+        key_hash = hash(key)
+        h1 = key_hash & 0xFFFFFFFF
+        h2 = ((key_hash >> 32) & 0xFFFFFFFF) | 1
+        return [(h1 + i * h2) & self._mask for i in range(self.depth)]
+    
+    def _age(self) -> None:
+        """Halve all counters so old popularity decays"""
+        for row_index, row in enumerate(self._rows):
+            self._rows[row_index] = bytearray(count >> 1 for count in row)
+        self._additions //= 2
+        self.resets += 1
+
+class AdmissionPolicy:
+    """
+    Decides whether a new key may displace the L1 LRU victim.
+    
+    The base policy admits everything, matching plain LRU behaviour.
+    """
+    
+    def record_access(self, key: str) -> None:
+        """Observe a get or put for a key"""
+        pass
+    
+    def admit(self, candidate_key: str, victim_key: str) -> bool:
+        """Return True if the candidate should replace the victim in L1"""
+        return True
+
+class TinyLFUAdmissionPolicy(AdmissionPolicy):
+    """
+    TinyLFU admission: a new key only enters a full L1 if it has been seen
+    more often recently than the entry it would evict.
+    """
+    
+    def __init__(self, capacity: int = 1000, depth: int = 4):
+        """Initialize with a sketch sized for the expected L1 capacity"""
+        self.sketch = CountMinSketch(width=max(capacity, 256), depth=depth)
+    
+    def record_access(self, key: str) -> None:
+        """Observe a get or put for a key"""
+        self.sketch.increment(key)
+    
+    def admit(self, candidate_key: str, victim_key: str) -> bool:
+        """Admit the candidate only if it is more frequent than the victim"""
+        return self.sketch.estimate(candidate_key) > self.sketch.estimate(victim_key)
+
 class AdvancedCache:
     """
     Multi-level caching system with intelligent eviction policies.
     
     Implements L1 (fast memory), L2 (compressed), and L3 (persistent) caching
-    with LRU eviction and performance monitoring.
+    with LRU eviction and performance monitoring. L2 holds zlib-compressed
+    pickles and is bounded by a compressed byte budget rather than entry count.
     """
     
-    def __init__(self, max_l1_size: int = 1000, max_l2_size: int = 5000, 
-                 ttl_seconds: int = 3600):
-        """Initialize advanced cache system"""
+    MAX_L3_READ_ATTEMPTS = 3  # Unlocked L3 reads per get before a changing key is reported as a miss
+    
+    def __init__(self, max_l1_size: int = 1000, max_l2_size: Optional[int] = None, 
+                 ttl_seconds: int = 3600, max_l2_bytes: int = 64 * 1024 * 1024,
+                 l2_compression_level: int = 6, l3_storage_dir: str = "cache_storage",
+                 l3_backend: L3Backend = L3Backend.FILE_PER_KEY,
+                 l3_storage_manager: Optional[Any] = None,
+                 admission_policy: Optional[AdmissionPolicy] = None,
+                 expiry_tick_seconds: float = 1.0):
+        """
+        Initialize advanced cache system.
+        
+        Args:
+            max_l1_size: Maximum number of live entries held in L1
+            max_l2_size: Optional entry-count cap for L2 (None for byte budget only)
+            ttl_seconds: Time-to-live for L1/L2 entries
+            max_l2_bytes: Budget for the total compressed bytes held in L2
+            l2_compression_level: zlib level used when demoting entries to L2
+            l3_storage_dir: Directory used by the L3 persistent tier
+            l3_backend: Storage backend for the L3 persistent tier
+            l3_storage_manager: Existing L3 storage manager to share (overrides l3_backend)
+            admission_policy: Policy gating new keys into a full L1 (default admits all)
+            expiry_tick_seconds: Resolution of the timing wheel used by expire_entries
+        """
         self.max_l1_size = max_l1_size
         self.max_l2_size = max_l2_size
+        self.max_l2_bytes = max_l2_bytes
+        self.l2_compression_level = l2_compression_level
         self.ttl_seconds = ttl_seconds
+        self.admission_policy = admission_policy or AdmissionPolicy()
         
         # Multi-level cache storage
         self.l1_cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self.l2_cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.l2_cache: OrderedDict[str, CacheEntry] = OrderedDict()  # data holds compressed bytes
         self.l3_cache: Dict[str, str] = {}  # file paths for persistent storage
+        self._pending_l3_writes: Dict[str, Any] = {}  # L2 spills not yet written to L3
+        self._l3_writes_in_flight: Set[str] = set()  # Keys a flush is currently writing
+        self._l3_loads: Dict[str, object] = {}  # Token per key whose L3 read runs unlocked
+        
+        # Secondary tag index covering every tier (tag -> keys, key -> tags)
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, FrozenSet[str]] = {}
+        self.l2_bytes = 0  # Compressed bytes currently held in L2
+        self.l2_uncompressed_bytes = 0  # Serialized size of L2 entries before compression
+        
+        # TTL expiry for L1/L2 entries, reclaimed by expire_entries or a sweeper
+        self._expiry_wheel = TimingWheel(tick_seconds=expiry_tick_seconds)
+        self._expiry_sweeper: Optional[ExpirySweeper] = None
         
         # Performance metrics
         self.cache_stats = {
             'l1_hits': 0, 'l1_misses': 0,
             'l2_hits': 0, 'l2_misses': 0,
             'l3_hits': 0, 'l3_misses': 0,
-            'evictions': 0, 'compressions': 0
+            'evictions': 0, 'compressions': 0,
+            'invalidations': 0, 'admissions': 0, 'rejections': 0,
+            'expirations': 0, 'reclaimed_bytes': 0
         }
         
         # Thread safety
         self._lock = threading.RLock()
         
         # L3 persistent storage manager
-        self._l3_storage_manager = L3StorageManager()
+        if l3_storage_manager is not None:
+            self._l3_storage_manager = l3_storage_manager
+        elif l3_backend == L3Backend.SEGMENT:
+            self._l3_storage_manager = SegmentL3StorageManager(l3_storage_dir)
+        else:
+            self._l3_storage_manager = L3StorageManager(l3_storage_dir)
         
         logger.info("AdvancedCache initialized with multi-level storage")
     
@@ -231,51 +1011,19 @@ class AdvancedCache:
         Returns:
             Cached item if found, None otherwise
         """
+        for attempt in range(self.MAX_L3_READ_ATTEMPTS):
+            settled, data = self._lookup(key, record_access=attempt == 0)
+            if settled:
+                return data
+        
+        # Every L3 read raced with a write to the key; report a miss rather than keep retrying
         with self._lock:
-            # Check L1 cache first (fastest)
-            if key in self.l1_cache:
-                entry = self.l1_cache[key]
-                if self._is_valid_entry(entry):
-                    self._update_access_stats(entry)
-                    self.cache_stats['l1_hits'] += 1
-                    # Move to end (LRU)
-                    self.l1_cache.move_to_end(key)
-                    logger.debug(f"L1 cache hit for key: {key}")
-                    return entry.data
-                else:
-                    del self.l1_cache[key]
-            
-            # Check L2 cache (compressed memory)
-            if key in self.l2_cache:
-                entry = self.l2_cache[key]
-                if self._is_valid_entry(entry):
-                    self._update_access_stats(entry)
-                    self.cache_stats['l2_hits'] += 1
-                    # Promote to L1
-                    self._promote_to_l1(key, entry)
-                    logger.debug(f"L2 cache hit for key: {key}, promoted to L1")
-                    return entry.data
-                else:
-                    del self.l2_cache[key]
-            
-            # Check L3 cache (persistent)
-            if key in self.l3_cache:
-                data = self._load_from_l3(key)
-                if data is not None:
-                    self.cache_stats['l3_hits'] += 1
-                    # Promote to L1
-                    self.put(key, data, promote_from_l3=True)
-                    logger.debug(f"L3 cache hit for key: {key}, promoted to L1")
-                    return data
-                else:
-                    del self.l3_cache[key]
-            
-            # Cache miss
             self.cache_stats['l1_misses'] += 1
-            logger.debug(f"Cache miss for key: {key}")
-            return None
+        logger.debug(f"Cache miss for key: {key}, changed during every L3 read")
+        return None
     
-    def put(self, key: str, data: Any, promote_from_l3: bool = False) -> None:
+    def put(self, key: str, data: Any, promote_from_l3: bool = False,
+            tags: Optional[Iterable[str]] = None) -> None:
         """
         Store item in cache with automatic level management.
         
@@ -283,46 +1031,127 @@ class AdvancedCache:
             key: Cache key
             data: Data to cache
             promote_from_l3: Whether this is a promotion from L3
+            tags: Invalidation tags for the entry (None keeps the key's existing tags)
         """
         with self._lock:
-            entry = CacheEntry(
-                key=key,
-                data=data,
-                timestamp=time.time(),
-                cache_level=CacheLevel.L1_MEMORY
-            )
-            
-            # Store in L1 cache
-            self.l1_cache[key] = entry
-            
-            # Manage L1 cache size
-            if len(self.l1_cache) > self.max_l1_size:
-                self._evict_from_l1()
+            self._put_locked(key, data, promote_from_l3, tags)
+        
+        # Write any L2 spills to L3 outside the lock
+        self._flush_l3_writes()
+    
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Remove every entry carrying a tag from all cache levels, including L3.
+        
+        Args:
+            tag: Tag to invalidate (see CacheTags)
             
-            logger.debug(f"Stored in L1 cache: {key}")
+        Returns:
+            Number of keys invalidated
+        """
+        with self._lock:
+            keys = self._tag_index.pop(tag, set())
+            persisted_keys = self._invalidate_keys(keys)
+        
+        # Drop persisted records outside the lock
+        for key in persisted_keys:
+            self._l3_storage_manager.delete_from_persistent_cache(key)
+        
+        logger.debug(f"Invalidated {len(keys)} entries tagged {tag}")
+        return len(keys)
     
     def clear(self, governor_id: Optional[str] = None) -> None:
-        """Clear cache entries, optionally for specific governor"""
+        """
+        Clear cache entries, optionally for specific governor.
+        
+        A governor clear goes through the tag index only, so it removes exactly the
+        entries written with CacheTags.governor(governor_id); writers of governor
+        specific entries must tag them.
+        """
+        if governor_id:
+            removed = self.invalidate_tag(CacheTags.governor(governor_id))
+            logger.info(f"Cleared cache for governor: {governor_id} ({removed} entries)")
+            return
+        
         with self._lock:
-            if governor_id:
-                # Clear entries for specific governor
-                keys_to_remove = [k for k in self.l1_cache.keys() 
-                                if k.startswith(governor_id)]
-                for key in keys_to_remove:
-                    del self.l1_cache[key]
-                
-                keys_to_remove = [k for k in self.l2_cache.keys() 
-                                if k.startswith(governor_id)]
-                for key in keys_to_remove:
-                    del self.l2_cache[key]
+            # Clear all caches
+            self.l1_cache.clear()
+            self.l2_cache.clear()
+            self.l3_cache.clear()
+            self._pending_l3_writes.clear()
+            self._l3_loads.clear()
+            self._tag_index.clear()
+            self._key_tags.clear()
+            self._expiry_wheel = TimingWheel(tick_seconds=self._expiry_wheel.tick_seconds)
+            self.l2_bytes = 0
+            self.l2_uncompressed_bytes = 0
+            logger.info("Cleared all caches")
+    
+    def expire_entries(self, now: Optional[float] = None) -> int:
+        """
+        Reclaim L1/L2 entries whose TTL has passed, in amortized O(1) per entry.
+        
+        Args:
+            now: Wall-clock time to expire against (defaults to now)
+            
+        Returns:
+            Number of entries reclaimed
+        """
+        now = time.time() if now is None else now
+        expired_entries: List[CacheEntry] = []
+        reclaimed_bytes = 0
+        
+        with self._lock:
+            for key in self._expiry_wheel.advance(now):
+                entry = self.l1_cache.get(key) or self.l2_cache.get(key)
+                if entry is None:
+                    continue  # Already spilled to L3, which has its own expiry
+                if self._is_valid_entry(entry, now):
+                    self._expiry_wheel.schedule(key, entry.timestamp + self.ttl_seconds)
+                    continue
                 
-                logger.info(f"Cleared cache for governor: {governor_id}")
-            else:
-                # Clear all caches
-                self.l1_cache.clear()
-                self.l2_cache.clear()
-                self.l3_cache.clear()
-                logger.info("Cleared all caches")
+                # Sizes were recorded when the entry was stored or demoted; nothing is pickled here
+                if entry.cache_level == CacheLevel.L2_COMPRESSED:
+                    self._remove_from_l2(key)
+                    reclaimed_bytes += entry.compressed_size
+                else:
+                    del self.l1_cache[key]
+                    reclaimed_bytes += entry.approximate_size
+                expired_entries.append(entry)
+                self._release_tags_if_absent(key)
+        
+            self.cache_stats['expirations'] += len(expired_entries)
+            self.cache_stats['reclaimed_bytes'] += reclaimed_bytes
+        
+        if not expired_entries:
+            return 0
+        logger.debug(f"Expired {len(expired_entries)} entries ({reclaimed_bytes} bytes)")
+        return len(expired_entries)
+    
+    def start_expiry_sweeper(self, interval_seconds: float = 5.0) -> ExpirySweeper:
+        """
+        Start a background thread that calls expire_entries periodically.
+        
+        For asyncio services, schedule ExpirySweeper(cache.expire_entries).run_async()
+        as a task instead.
+        
+        Args:
+            interval_seconds: Delay between sweeps
+            
+        Returns:
+            The running sweeper
+        """
+        if self._expiry_sweeper is None:
+            self._expiry_sweeper = ExpirySweeper(self.expire_entries, interval_seconds,
+                                                 name="cache-expiry-sweeper")
+            self._expiry_sweeper.start()
+        return self._expiry_sweeper
+    
+    def stop_expiry_sweeper(self) -> None:
+        """Stop the background expiry sweeper if running"""
+        if self._expiry_sweeper is not None:
+            self._expiry_sweeper.stop()
+            self._expiry_sweeper = None
     
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics"""
@@ -335,18 +1164,29 @@ class AdvancedCache:
                             self.cache_stats['l3_hits'])
                 hit_rate = total_hits / total_requests
             
+            compression_ratio = 1.0
+            if self.l2_bytes > 0:
+                compression_ratio = self.l2_uncompressed_bytes / self.l2_bytes
+            
             return {
                 'l1_size': len(self.l1_cache),
                 'l2_size': len(self.l2_cache),
                 'l3_size': len(self.l3_cache),
+                'tag_count': len(self._tag_index),
+                'expiry_tracked': len(self._expiry_wheel),
+                'l2_bytes': self.l2_bytes,
+                'l2_uncompressed_bytes': self.l2_uncompressed_bytes,
+                'max_l2_bytes': self.max_l2_bytes,
+                'l2_compression_ratio': compression_ratio,
                 'hit_rate': hit_rate,
+                'admission_policy': type(self.admission_policy).__name__,
                 'cache_levels': self.cache_stats.copy(),
                 'memory_efficiency': self._calculate_memory_efficiency()
             }
     
-    def _is_valid_entry(self, entry: CacheEntry) -> bool:
+    def _is_valid_entry(self, entry: CacheEntry, now: Optional[float] = None) -> bool:
         """Check if cache entry is still valid (not expired)"""
-        age = time.time() - entry.timestamp
+        age = (time.time() if now is None else now) - entry.timestamp
         return age < self.ttl_seconds
     
     def _update_access_stats(self, entry: CacheEntry) -> None:
@@ -354,38 +1194,200 @@ class AdvancedCache:
         entry.access_count += 1
         entry.last_access = time.time()
     
-    def _promote_to_l1(self, key: str, entry: CacheEntry) -> None:
-        """Promote entry from L2 to L1 cache"""
+    def _promote_to_l1(self, key: str, entry: CacheEntry, data: Any) -> None:
+        """Promote entry from L2 to L1 cache, restoring its decompressed data"""
+        self._remove_from_l2(key)
+        
+        entry.data = data
         entry.cache_level = CacheLevel.L1_MEMORY
+        entry.approximate_size = entry.uncompressed_size or self._approximate_size(data)
+        entry.compressed_size = 0
+        entry.uncompressed_size = 0
         self.l1_cache[key] = entry
         
-        # Remove from L2
-        if key in self.l2_cache:
-            del self.l2_cache[key]
-        
         # Manage L1 size
         if len(self.l1_cache) > self.max_l1_size:
             self._evict_from_l1()
     
+    def _lookup(self, key: str, record_access: bool = True) -> Tuple[bool, Optional[Any]]:
+        """
+        One lookup pass through every level for get.
+        
+        Returns:
+            (settled, data); settled is False when the key changed during the unlocked L3 read
+        """
+        with self._lock:
+            if record_access:
+                self.admission_policy.record_access(key)
+            
+            # Check L1 cache first (fastest)
+            if key in self.l1_cache:
+                entry = self.l1_cache[key]
+                if self._is_valid_entry(entry):
+                    self._update_access_stats(entry)
+                    self.cache_stats['l1_hits'] += 1
+                    # Move to end (LRU)
+                    self.l1_cache.move_to_end(key)
+                    logger.debug(f"L1 cache hit for key: {key}")
+                    return True, entry.data
+                else:
+                    del self.l1_cache[key]
+            
+            # Check L2 cache (compressed memory)
+            promoted = False
+            if key in self.l2_cache:
+                entry = self.l2_cache[key]
+                if self._is_valid_entry(entry):
+                    promoted_data = self._decompress_data(entry.data)
+                    if promoted_data is not DECOMPRESSION_FAILED:
+                        promoted = True
+                        self._update_access_stats(entry)
+                        self.cache_stats['l2_hits'] += 1
+                        # Promote to L1
+                        self._promote_to_l1(key, entry, promoted_data)
+                        logger.debug(f"L2 cache hit for key: {key}, promoted to L1")
+                if not promoted:
+                    self._remove_from_l2(key)
+            
+            # Spilled from L2 but the L3 write has not completed yet
+            elif key in self._pending_l3_writes:
+                promoted = True
+                promoted_data = self._pending_l3_writes.pop(key)
+                self.cache_stats['l3_hits'] += 1
+                entry = CacheEntry(key=key, data=None, timestamp=time.time(),
+                                   tags=self._key_tags.get(key, frozenset()))
+                self._promote_to_l1(key, entry, promoted_data)
+                self._expiry_wheel.schedule(key, entry.timestamp + self.ttl_seconds)
+            
+            if not promoted and key not in self.l3_cache:
+                # Cache miss (including expired or unreadable L2 entries with no L3 copy)
+                self.cache_stats['l1_misses'] += 1
+                self._release_tags_if_absent(key)
+                logger.debug(f"Cache miss for key: {key}")
+                return True, None
+        
+            if not promoted:
+                # Any put, invalidation or clear of the key meanwhile replaces this token
+                load_token = self._l3_loads.setdefault(key, object())
+        
+        if promoted:
+            # Promotion may have spilled entries; write them outside the lock
+            self._flush_l3_writes()
+            return True, promoted_data
+        
+        # Check L3 cache (persistent) without holding the lock during disk I/O
+        data = self._load_from_l3(key)
+        
+        with self._lock:
+            if self._l3_loads.get(key) is not load_token:
+                # The key changed during the read; drop the stale value and look again
+                logger.debug(f"Discarded L3 read for {key}, changed while loading")
+                return False, None
+            
+            del self._l3_loads[key]
+            if data is not None:
+                self.cache_stats['l3_hits'] += 1
+                # Promote to L1 with the tags the key still carries
+                self._put_locked(key, data, promote_from_l3=True)
+            else:
+                self.l3_cache.pop(key, None)
+                self.cache_stats['l1_misses'] += 1
+                self._release_tags_if_absent(key)
+        
+        if data is not None:
+            self._flush_l3_writes()
+            logger.debug(f"L3 cache hit for key: {key}, promoted to L1")
+            return True, data
+        
+        logger.debug(f"Cache miss for key: {key}")
+        return True, None
+    
+    def _put_locked(self, key: str, data: Any, promote_from_l3: bool = False,
+                    tags: Optional[Iterable[str]] = None) -> None:
+        """Store an item in L1, queueing any spills for _flush_l3_writes (lock held)"""
+        if not promote_from_l3:
+            self.admission_policy.record_access(key)
+            # A newer value supersedes any L3 read in progress
+            self._l3_loads.pop(key, None)
+        
+        # A new key may only displace the L1 LRU victim if the policy admits it
+        if (not promote_from_l3 and key not in self.l1_cache and
+                len(self.l1_cache) >= self.max_l1_size and self.l1_cache):
+            victim_key = next(iter(self.l1_cache))
+            if not self.admission_policy.admit(key, victim_key):
+                self.cache_stats['rejections'] += 1
+                logger.debug(f"Admission rejected {key} in favour of {victim_key}")
+                self._drop_rejected_key(key)
+                return
+            self.cache_stats['admissions'] += 1
+        
+        if tags is None:
+            entry_tags = self._key_tags.get(key, frozenset())
+        else:
+            entry_tags = frozenset(tags)
+        
+        entry = CacheEntry(
+            key=key,
+            data=data,
+            timestamp=time.time(),
+            cache_level=CacheLevel.L1_MEMORY,
+            approximate_size=self._approximate_size(data),
+            tags=entry_tags
+        )
+        
+        # Store in L1 cache, dropping any stale lower-level copy
+        self._remove_from_l2(key)
+        self._pending_l3_writes.pop(key, None)
+        self.l1_cache[key] = entry
+        self._index_tags(key, entry_tags)
+        self._expiry_wheel.schedule(key, entry.timestamp + self.ttl_seconds)
+        
+        # Manage L1 cache size
+        if len(self.l1_cache) > self.max_l1_size:
+            self._evict_from_l1()
+        
+        logger.debug(f"Stored in L1 cache: {key}")
+    
     def _evict_from_l1(self) -> None:
-        """Evict least recently used item from L1 to L2"""
+        """Evict least recently used item from L1 into compressed L2"""
         if not self.l1_cache:
             return
         
         # Get LRU item (first in OrderedDict)
         lru_key, lru_entry = self.l1_cache.popitem(last=False)
+        self.cache_stats['evictions'] += 1
         
-        # Move to L2 if space available
-        if len(self.l2_cache) < self.max_l2_size:
-            lru_entry.cache_level = CacheLevel.L2_COMPRESSED
-            self.l2_cache[lru_key] = lru_entry
-            logger.debug(f"Evicted {lru_key} from L1 to L2")
-        else:
-            # L2 is full, evict to L3 or discard
-            self._evict_from_l2()
-            self.l2_cache[lru_key] = lru_entry
+        serialized_data = self._serialize_data(lru_entry.data)
+        if serialized_data is None:
+            logger.debug(f"Could not serialize {lru_key} for L2, discarded")
+            self._release_tags_if_absent(lru_key)
+            return
         
-        self.cache_stats['evictions'] += 1
+        compressed_data = zlib.compress(serialized_data, self.l2_compression_level)
+        self.cache_stats['compressions'] += 1
+        
+        if len(compressed_data) > self.max_l2_bytes:
+            # Entry alone exceeds the L2 budget, spill straight to L3
+            self._save_to_l3(lru_key, lru_entry.data)
+            return
+        
+        lru_entry.data = compressed_data
+        lru_entry.cache_level = CacheLevel.L2_COMPRESSED
+        lru_entry.compressed_size = len(compressed_data)
+        lru_entry.uncompressed_size = len(serialized_data)
+        
+        self.l2_cache[lru_key] = lru_entry
+        self.l2_bytes += lru_entry.compressed_size
+        self.l2_uncompressed_bytes += lru_entry.uncompressed_size
+        logger.debug(f"Evicted {lru_key} from L1 to L2 "
+                     f"({lru_entry.uncompressed_size} -> {lru_entry.compressed_size} bytes)")
+        
+        # Enforce the L2 byte budget (and optional entry cap)
+        while self.l2_cache and (
+            self.l2_bytes > self.max_l2_bytes or
+            (self.max_l2_size is not None and len(self.l2_cache) > self.max_l2_size)
+        ):
+            self._evict_from_l2()
     
     def _evict_from_l2(self) -> None:
         """Evict least recently used item from L2"""
@@ -393,14 +1395,137 @@ class AdvancedCache:
             return
         
         # Get LRU item from L2
-        lru_key, lru_entry = self.l2_cache.popitem(last=False)
+        lru_key = next(iter(self.l2_cache))
+        lru_entry = self._remove_from_l2(lru_key)
         
-        # Save to L3 persistent storage
-        if self._l3_storage_manager.save_to_persistent_cache(lru_key, lru_entry.data):
-            self.l3_cache[lru_key] = "persistent"  # Mark as stored in L3
-            logger.debug(f"Evicted {lru_key} from L2 to L3 persistent storage")
+        data = self._decompress_data(lru_entry.data)
+        if data is not DECOMPRESSION_FAILED:
+            self._save_to_l3(lru_key, data)
         else:
-            logger.debug(f"Failed to save {lru_key} to L3, discarded")
+            self._release_tags_if_absent(lru_key)
+    
+    def _remove_from_l2(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry from L2 and release its byte accounting"""
+        entry = self.l2_cache.pop(key, None)
+        if entry is not None:
+            self.l2_bytes -= entry.compressed_size
+            self.l2_uncompressed_bytes -= entry.uncompressed_size
+        return entry
+    
+    def _save_to_l3(self, key: str, data: Any) -> None:
+        """Queue data for L3 persistent storage (written by _flush_l3_writes)"""
+        self.l3_cache.pop(key, None)
+        self._pending_l3_writes[key] = data
+    
+    def _flush_l3_writes(self) -> None:
+        """Write queued L2 spills to L3 persistent storage without holding the lock"""
+        while True:
+            with self._lock:
+                # One writer per key, so an older value never lands after a newer one
+                key = next((pending_key for pending_key in self._pending_l3_writes
+                            if pending_key not in self._l3_writes_in_flight), None)
+                if key is None:
+                    return
+                data = self._pending_l3_writes[key]
+                self._l3_writes_in_flight.add(key)
+            
+            try:
+                saved = self._l3_storage_manager.save_to_persistent_cache(key, data)
+            
+                with self._lock:
+                    if self._pending_l3_writes.get(key) is data:
+                        del self._pending_l3_writes[key]
+                        if saved:
+                            self.l3_cache[key] = "persistent"  # Mark as stored in L3
+                            logger.debug(f"Evicted {key} to L3 persistent storage")
+                        else:
+                            self._release_tags_if_absent(key)
+                            logger.debug(f"Failed to save {key} to L3, discarded")
+                        continue
+                    # Re-put, invalidated or cleared meanwhile: the record just written is stale
+                    orphaned = saved and key not in self._pending_l3_writes and key not in self.l3_cache
+                
+                if orphaned:
+                    self._l3_storage_manager.delete_from_persistent_cache(key)
+                    logger.debug(f"Deleted L3 record for {key}, invalidated while writing")
+            finally:
+                with self._lock:
+                    self._l3_writes_in_flight.discard(key)
+    
+    def _invalidate_keys(self, keys: Set[str]) -> List[str]:
+        """Remove keys from every level, returning those with L3 records to delete (lock held)"""
+        persisted_keys = []
+        for key in keys:
+            self.l1_cache.pop(key, None)
+            self._remove_from_l2(key)
+            self._pending_l3_writes.pop(key, None)
+            self._l3_loads.pop(key, None)
+            if self.l3_cache.pop(key, None) is not None:
+                persisted_keys.append(key)
+            self._index_tags(key, frozenset())
+            self._expiry_wheel.cancel(key)
+        self.cache_stats['invalidations'] += len(keys)
+        return persisted_keys
+    
+    def _drop_rejected_key(self, key: str) -> None:
+        """Forget older copies of a key whose new value was not admitted (lock held)"""
+        self._remove_from_l2(key)
+        self._pending_l3_writes.pop(key, None)
+        # The L3 record is left on disk but no longer reachable through l3_cache
+        self.l3_cache.pop(key, None)
+        self._release_tags_if_absent(key)
+    
+    def _index_tags(self, key: str, tags: FrozenSet[str]) -> None:
+        """Point the tag index for a key at a new tag set (lock held)"""
+        old_tags = self._key_tags.get(key, frozenset())
+        if old_tags == tags:
+            return
+        
+        for tag in old_tags - tags:
+            tagged_keys = self._tag_index.get(tag)
+            if tagged_keys is not None:
+                tagged_keys.discard(key)
+                if not tagged_keys:
+                    del self._tag_index[tag]
+        for tag in tags - old_tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        
+        if tags:
+            self._key_tags[key] = tags
+        else:
+            self._key_tags.pop(key, None)
+    
+    def _release_tags_if_absent(self, key: str) -> None:
+        """Drop a key from the tag index once no cache level holds it (lock held)"""
+        if (key not in self.l1_cache and key not in self.l2_cache and
+                key not in self._pending_l3_writes and key not in self.l3_cache):
+            self._index_tags(key, frozenset())
+    
+    @staticmethod
+    def _approximate_size(data: Any) -> int:
+        """Cheap footprint estimate: the object plus its direct members, without pickling"""
+        size = sys.getsizeof(data)
+        if isinstance(data, dict):
+            size += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in data.items())
+        elif isinstance(data, (list, tuple, set, frozenset)):
+            size += sum(sys.getsizeof(item) for item in data)
+        return size
+    
+    def _serialize_data(self, data: Any) -> Optional[bytes]:
+        """Serialize cache data for the compressed tier"""
+        try:
+            return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Cache data is not serializable: {e}")
+            return None
+    
+    def _decompress_data(self, compressed_data: bytes) -> Any:
+        """Decompress and deserialize data held in the compressed tier (DECOMPRESSION_FAILED on error)"""
+        try:
+            return pickle.loads(zlib.decompress(compressed_data))
+        except Exception as e:
+            logger.error(f"Failed to decompress L2 cache entry: {e}")
+            return DECOMPRESSION_FAILED
     
     def _load_from_l3(self, key: str) -> Optional[Any]:
         """Load data from L3 persistent storage"""
@@ -420,6 +1545,138 @@ class AdvancedCache:
         
         return min(total_accesses / total_entries / 10.0, 1.0)  # Normalized efficiency
 
+class ShardedAdvancedCache:
+    """
+    Lock-striped multi-level cache for multi-threaded dialog workers.
+    
+    Keys are hashed onto independent AdvancedCache shards, each with its own
+    lock, LRU order and statistics, so concurrent requests for different keys
+    rarely contend. All shards share one L3 storage manager, and L3 reads and
+    writes happen outside the shard locks.
+    """
+    
+    def __init__(self, num_shards: int = 16, max_l1_size: int = 1000, ttl_seconds: int = 3600,
+                 max_l2_bytes: int = 64 * 1024 * 1024, l2_compression_level: int = 6,
+                 l3_storage_dir: str = "cache_storage",
+                 l3_backend: L3Backend = L3Backend.FILE_PER_KEY,
+                 admission_policy_factory: Optional[Callable[[int], AdmissionPolicy]] = None):
+        """
+        Initialize sharded cache system.
+        
+        Args:
+            num_shards: Number of independently locked segments
+            max_l1_size: Total L1 entry budget, split evenly across shards
+            ttl_seconds: Time-to-live for L1/L2 entries
+            max_l2_bytes: Total compressed L2 byte budget, split evenly across shards
+            l2_compression_level: zlib level used when demoting entries to L2
+            l3_storage_dir: Directory used by the shared L3 persistent tier
+            l3_backend: Storage backend for the shared L3 persistent tier (SEGMENT
+                needs an l3_storage_dir owned by this process alone)
+            admission_policy_factory: Builds one admission policy per shard from its
+                L1 capacity (e.g. TinyLFUAdmissionPolicy)
+        """
+        if num_shards < 1:
+            raise ValueError(f"num_shards must be at least 1, got {num_shards}")
+        
+        self.num_shards = num_shards
+        self._expiry_sweeper: Optional[ExpirySweeper] = None
+        if l3_backend == L3Backend.SEGMENT:
+            self._l3_storage_manager = SegmentL3StorageManager(l3_storage_dir)
+        else:
+            self._l3_storage_manager = L3StorageManager(l3_storage_dir)
+        
+        shard_l1_size = max(1, max_l1_size // num_shards)
+        self.shards: List[AdvancedCache] = [
+            AdvancedCache(
+                max_l1_size=shard_l1_size,
+                ttl_seconds=ttl_seconds,
+                max_l2_bytes=max(1, max_l2_bytes // num_shards),
+                l2_compression_level=l2_compression_level,
+                l3_storage_manager=self._l3_storage_manager,
+                admission_policy=admission_policy_factory(shard_l1_size) if admission_policy_factory else None
+            )
+            for _ in range(num_shards)
+        ]
+        logger.info(f"ShardedAdvancedCache initialized with {num_shards} shards")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get item from the shard owning the key"""
+        return self._shard_for(key).get(key)
+    
+    def put(self, key: str, data: Any, promote_from_l3: bool = False,
+            tags: Optional[Iterable[str]] = None) -> None:
+        """Store item in the shard owning the key"""
+        self._shard_for(key).put(key, data, promote_from_l3=promote_from_l3, tags=tags)
+    
+    def invalidate_tag(self, tag: str) -> int:
+        """Remove every entry carrying a tag from all shards"""
+        return sum(shard.invalidate_tag(tag) for shard in self.shards)
+    
+    def clear(self, governor_id: Optional[str] = None) -> None:
+        """Clear cache entries in every shard, optionally for specific governor"""
+        for shard in self.shards:
+            shard.clear(governor_id)
+    
+    def expire_entries(self, now: Optional[float] = None) -> int:
+        """Reclaim expired L1/L2 entries in every shard"""
+        return sum(shard.expire_entries(now) for shard in self.shards)
+    
+    def start_expiry_sweeper(self, interval_seconds: float = 5.0) -> ExpirySweeper:
+        """Start one background thread sweeping every shard periodically"""
+        if self._expiry_sweeper is None:
+            self._expiry_sweeper = ExpirySweeper(self.expire_entries, interval_seconds,
+                                                 name="sharded-cache-expiry-sweeper")
+            self._expiry_sweeper.start()
+        return self._expiry_sweeper
+    
+    def stop_expiry_sweeper(self) -> None:
+        """Stop the background expiry sweeper if running"""
+        if self._expiry_sweeper is not None:
+            self._expiry_sweeper.stop()
+            self._expiry_sweeper = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics merged from the per-shard counters"""
+        shard_stats = [shard.get_stats() for shard in self.shards]
+        
+        merged_levels: Dict[str, int] = {}
+        for stats in shard_stats:
+            for counter, value in stats['cache_levels'].items():
+                merged_levels[counter] = merged_levels.get(counter, 0) + value
+        
+        total_requests = merged_levels.get('l1_hits', 0) + merged_levels.get('l1_misses', 0)
+        hit_rate = 0.0
+        if total_requests > 0:
+            total_hits = (merged_levels.get('l1_hits', 0) +
+                          merged_levels.get('l2_hits', 0) +
+                          merged_levels.get('l3_hits', 0))
+            hit_rate = total_hits / total_requests
+        
+        l2_bytes = sum(stats['l2_bytes'] for stats in shard_stats)
+        l2_uncompressed_bytes = sum(stats['l2_uncompressed_bytes'] for stats in shard_stats)
+        
+        return {
+            'shards': self.num_shards,
+            'l1_size': sum(stats['l1_size'] for stats in shard_stats),
+            'l2_size': sum(stats['l2_size'] for stats in shard_stats),
+            'l3_size': sum(stats['l3_size'] for stats in shard_stats),
+            'tag_count': sum(stats['tag_count'] for stats in shard_stats),
+            'expiry_tracked': sum(stats['expiry_tracked'] for stats in shard_stats),
+            'l2_bytes': l2_bytes,
+            'l2_uncompressed_bytes': l2_uncompressed_bytes,
+            'max_l2_bytes': sum(stats['max_l2_bytes'] for stats in shard_stats),
+            'l2_compression_ratio': l2_uncompressed_bytes / l2_bytes if l2_bytes else 1.0,
+            'hit_rate': hit_rate,
+            'admission_policy': shard_stats[0]['admission_policy'],
+            'cache_levels': merged_levels,
+            'memory_efficiency': sum(stats['memory_efficiency'] for stats in shard_stats) / self.num_shards,
+            'shard_sizes': [stats['l1_size'] + stats['l2_size'] for stats in shard_stats]
+        }
+    
+    def _shard_for(self, key: str) -> AdvancedCache:
+        """Select the shard owning a key"""
+        return self.shards[hash(key) % self.num_shards]
+
 class PreferenceOptimizer:
     """
     Performance optimizer for governor preference operations.
@@ -435,6 +1692,8 @@ class PreferenceOptimizer:
         self.precompute_patterns = set()  # Patterns for precomputation
         self.optimization_stats = {
             'batch_operations': 0,
+            'signature_encodings': 0,
+            'patched_encodings': 0,
             'cache_optimizations': 0,
             'precomputed_hits': 0,
             'lazy_loads': 0
@@ -442,13 +1701,24 @@ class PreferenceOptimizer:
         logger.info("PreferenceOptimizer initialized")
     
     def optimize_batch_encoding(self, profiles: List[GovernorProfile], 
-                              encoder_func: Callable) -> Dict[str, GovernorPreferences]:
+                              encoder_func: Callable,
+                              personalize_func: Optional[Callable] = None,
+                              signature_func: Optional[Callable] = None,
+                              max_workers: Optional[int] = None) -> Dict[str, GovernorPreferences]:
         """
         Optimize batch encoding of multiple governor preferences.
         
+        Profiles sharing an encoding signature (traits plus interaction models) are
+        encoded once; the rest of the group is derived by patching governor-specific
+        fields. When encoder_func is a bound PreferenceEncoder method its
+        personalize_preferences / encoding_signature are used automatically.
+        
         Args:
             profiles: List of governor profiles to encode
             encoder_func: Function to encode individual preferences
+            personalize_func: (template, profile) -> preferences for a same-signature profile
+            signature_func: profile -> hashable encoding signature
+            max_workers: Encode distinct signatures in a process pool of this size
             
         Returns:
             Dictionary mapping governor_id to preferences
@@ -459,31 +1729,43 @@ class PreferenceOptimizer:
             # Not worth batch optimization, process individually
             return {p.governor_id: encoder_func(p) for p in profiles}
         
+        encoder = getattr(encoder_func, '__self__', None)
+        personalize_func = personalize_func or getattr(encoder, 'personalize_preferences', None)
+        signature_func = signature_func or getattr(encoder, 'encoding_signature', None)
+        
         results = {}
+        pending = []
+        for profile in profiles:
+            # Check cache first
+            cached_result = self.cache.get(f"preferences_{profile.governor_id}")
+            if cached_result:
+                results[profile.governor_id] = cached_result
+            else:
+                pending.append(profile)
         
-        # Group profiles by similarity for batch optimization
-        trait_groups = self._group_profiles_by_traits(profiles)
+        if personalize_func is None or signature_func is None:
+            # Without a way to patch governor-specific fields every profile is encoded
+            signature_groups = {profile.governor_id: [profile] for profile in pending}
+        else:
+            signature_groups = self._group_profiles_by_signature(pending, signature_func)
         
-        for trait_signature, group_profiles in trait_groups.items():
-            logger.debug(f"Processing trait group '{trait_signature}' with {len(group_profiles)} profiles")
-            
-            # Optimize similar profiles together
-            for profile in group_profiles:
-                cache_key = f"preferences_{profile.governor_id}"
-                
-                # Check cache first
-                cached_result = self.cache.get(cache_key)
-                if cached_result:
-                    results[profile.governor_id] = cached_result
-                    continue
-                
-                # Encode and cache
-                preferences = encoder_func(profile)
-                self.cache.put(cache_key, preferences)
+        representatives = [group[0] for group in signature_groups.values()]
+        encoded = self._encode_representatives(representatives, encoder_func, max_workers)
+        
+        for (signature, group_profiles), template in zip(signature_groups.items(), encoded):
+            logger.debug(f"Encoded signature {signature} once for {len(group_profiles)} profiles")
+            for index, profile in enumerate(group_profiles):
+                preferences = template if index == 0 else personalize_func(template, profile)
+                self.cache.put(f"preferences_{profile.governor_id}", preferences, tags=(
+                    CacheTags.governor(profile.governor_id), CacheTags.traits(profile.traits)
+                ))
                 results[profile.governor_id] = preferences
         
         self.optimization_stats['batch_operations'] += 1
-        logger.info(f"Batch encoding completed: {len(results)} preferences generated")
+        self.optimization_stats['signature_encodings'] += len(representatives)
+        self.optimization_stats['patched_encodings'] += len(pending) - len(representatives)
+        logger.info(f"Batch encoding completed: {len(results)} preferences generated "
+                    f"from {len(representatives)} distinct signatures")
         return results
     
     def optimize_trait_mapping_lookup(self, traits: List[str], 
@@ -510,7 +1792,7 @@ class PreferenceOptimizer:
         
         # Compute and cache
         result = mapper_func(traits)
-        self.cache.put(cache_key, result)
+        self.cache.put(cache_key, result, tags=(CacheTags.traits(traits),))
         
         logger.debug(f"Trait mapping computed and cached for: {trait_signature}")
         return result
@@ -543,7 +1825,7 @@ class PreferenceOptimizer:
             
             # Precompute and cache
             preferences = encoder_func(dummy_profile)
-            self.cache.put(cache_key, preferences)
+            self.cache.put(cache_key, preferences, tags=(CacheTags.traits(traits),))
             self.precompute_patterns.add(trait_signature)
         
         logger.info(f"Precomputation completed: {len(self.precompute_patterns)} patterns cached")
@@ -579,7 +1861,8 @@ class PreferenceOptimizer:
         
         # Cache if deterministic (no context-specific randomness)
         if self._is_deterministic_selection(context):
-            self.cache.put(cache_key, selected_response)
+            self.cache.put(cache_key, selected_response,
+                           tags=(CacheTags.governor(preferences.governor_id),))
         
         return selected_response
     
@@ -594,21 +1877,27 @@ class PreferenceOptimizer:
             'overall_efficiency': self._calculate_efficiency()
         }
     
-    def _group_profiles_by_traits(self, profiles: List[GovernorProfile]) -> Dict[str, List[GovernorProfile]]:
-        """Group profiles by trait similarity for batch optimization"""
-        groups = {}
-        
+    def _group_profiles_by_signature(self, profiles: List[GovernorProfile],
+                                     signature_func: Callable) -> Dict[Any, List[GovernorProfile]]:
+        """Group profiles whose encodings differ only in governor-specific fields"""
+        groups: Dict[Any, List[GovernorProfile]] = {}
         for profile in profiles:
-            # Create signature from sorted traits
-            trait_signature = "_".join(sorted(profile.traits))
-            
-            if trait_signature not in groups:
-                groups[trait_signature] = []
-            
-            groups[trait_signature].append(profile)
-        
+            groups.setdefault(signature_func(profile), []).append(profile)
         return groups
     
+    def _encode_representatives(self, profiles: List[GovernorProfile], encoder_func: Callable,
+                                max_workers: Optional[int]) -> List[GovernorPreferences]:
+        """Encode one profile per signature, fanning out to a process pool if requested"""
+        if max_workers and max_workers > 1 and len(profiles) >= self.batch_threshold:
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    return list(executor.map(encoder_func, profiles))
+            except Exception as e:
+                # Typically an unpicklable encoder_func; encode in-process instead
+                logger.warning(f"Process pool encoding failed, encoding serially: {e}")
+        
+        return [encoder_func(profile) for profile in profiles]
+    
     def _is_deterministic_selection(self, context: Dict[str, Any]) -> bool:
         """Check if response selection is deterministic for caching"""
         # Avoid caching if context contains non-deterministic elements
@@ -161,9 +161,9 @@ class GovernorProfile:
         Returns:
             GovernorProfile instance
         """
-        governor_name = governor_data.get("name", "")
+        governor_name = governor_data.get("name") or governor_data.get("governor_name", "")
         if not governor_name:
-            raise ValueError("Governor data must contain a 'name' field")
+            raise ValueError("Governor data must contain a 'name' or 'governor_name' field")
             
         return cls(
             governor_id=governor_name,
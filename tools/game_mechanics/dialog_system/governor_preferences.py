@@ -8,14 +8,17 @@ BehavioralFilter) into a unified API for dialog system use.
 
 Key Components:
 - GovernorPreferencesManager: Main interface for preference management
-- PreferenceCache: Performance optimization through caching
+- PreferenceCache: Bounded LRU of preferences with TTL expiry and single-flight generation
 - IntegratedDialogProcessor: Complete dialog processing pipeline
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple, Callable
 import logging
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 import hashlib
+import pickle
+import threading
 import time
 
 from .core_structures import GovernorProfile, PlayerState, DialogResponse, ResponseType
@@ -24,9 +27,254 @@ from .preference_encoder import PreferenceEncoder
 from .trait_mapper import TraitMapper
 from .response_selector import ResponseSelector
 from .behavioral_filter import BehavioralFilter, FilterResult
+from .cache_optimizer import TimingWheel, ExpirySweeper
+from .preference_snapshot import (
+    PreferenceSnapshot, compute_snapshot_hash, list_profile_paths,
+    DEFAULT_PROFILES_DIR, DEFAULT_SNAPSHOT_PATH
+)
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class CachedPreferences:
+    """A cached preferences entry with its insertion time and approximate size."""
+    preferences: GovernorPreferences
+    cached_at: float
+    size_bytes: int
+
+class PendingGeneration:
+    """An in-flight preference generation that concurrent callers wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[GovernorPreferences] = None
+        self.error: Optional[BaseException] = None
+        self.stale = False  # Invalidated while generating; result must not be cached
+
+class PreferenceCache:
+    """
+    Bounded LRU cache of governor preferences.
+    
+    Entries expire after a TTL (reclaimed in bulk through a timing wheel), the
+    least recently used governors are evicted beyond an entry count or byte
+    budget, and concurrent misses for the same governor are coalesced: one
+    caller runs the generation pipeline and the others wait for its result.
+    """
+    
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None,
+                 ttl_seconds: float = 3600):
+        """
+        Initialize the preference cache.
+        
+        Args:
+            max_entries: Maximum number of governors held
+            max_bytes: Optional budget for the pickled size of all held preferences
+            ttl_seconds: Time-to-live for cached preferences
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.total_bytes = 0
+        
+        self._entries: OrderedDict[str, CachedPreferences] = OrderedDict()
+        self._pending: Dict[str, PendingGeneration] = {}
+        self._expiry_wheel = TimingWheel()
+        self._lock = threading.RLock()
+        
+        self.stats = {
+            'hits': 0, 'misses': 0, 'coalesced': 0,
+            'evictions': 0, 'expirations': 0, 'reclaimed_bytes': 0
+        }
+    
+    def __contains__(self, governor_id: str) -> bool:
+        with self._lock:
+            return governor_id in self._entries
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def get(self, governor_id: str) -> Optional[GovernorPreferences]:
+        """
+        Get unexpired cached preferences, marking them most recently used.
+        
+        Args:
+            governor_id: Governor to look up
+        
+        Returns:
+            Cached preferences, or None if absent or past the TTL
+        """
+        with self._lock:
+            entry = self._entries.get(governor_id)
+            if entry is None or time.time() - entry.cached_at >= self.ttl_seconds:
+                return None
+            self._entries.move_to_end(governor_id)
+            return entry.preferences
+    
+    def peek(self, governor_id: str) -> Optional[GovernorPreferences]:
+        """Get held preferences without checking the TTL or updating recency."""
+        with self._lock:
+            entry = self._entries.get(governor_id)
+            return entry.preferences if entry is not None else None
+    
+    def put(self, governor_id: str, preferences: GovernorPreferences) -> None:
+        """Cache preferences, evicting least recently used governors if over budget."""
+        size_bytes = self._estimate_bytes(preferences)
+        with self._lock:
+            pending = self._pending.get(governor_id)
+            if pending is not None:
+                pending.stale = True  # Newer than whatever is being generated
+            self._insert(governor_id, preferences, size_bytes)
+    
+    def get_or_generate(self, governor_id: str,
+                        generate: Callable[[], GovernorPreferences]) -> GovernorPreferences:
+        """
+        Get cached preferences, generating them once for concurrent misses.
+        
+        If another thread is already generating preferences for the governor,
+        this call waits for (and returns) that result instead of generating again.
+        
+        Args:
+            governor_id: Governor to look up
+            generate: Produces the preferences on a miss; exceptions reach every waiter
+        
+        Returns:
+            Cached or newly generated preferences
+        """
+        with self._lock:
+            cached = self.get(governor_id)
+            if cached is not None:
+                self.stats['hits'] += 1
+                return cached
+            
+            pending = self._pending.get(governor_id)
+            is_leader = pending is None
+            if is_leader:
+                pending = self._pending[governor_id] = PendingGeneration()
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+        
+        if not is_leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+        
+        try:
+            preferences = generate()
+            pending.result = preferences
+            size_bytes = self._estimate_bytes(preferences)
+            with self._lock:
+                if not pending.stale:
+                    self._insert(governor_id, preferences, size_bytes)
+            return preferences
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._pending.get(governor_id) is pending:
+                    del self._pending[governor_id]
+            pending.done.set()
+    
+    def invalidate(self, governor_id: Optional[str] = None) -> None:
+        """
+        Drop cached preferences for one governor or all governors.
+        
+        Generations in flight for dropped governors still return to their
+        callers but are not cached.
+        
+        Args:
+            governor_id: Specific governor to drop, or None for all
+        """
+        with self._lock:
+            if governor_id is not None:
+                entry = self._entries.pop(governor_id, None)
+                if entry is not None:
+                    self.total_bytes -= entry.size_bytes
+                self._expiry_wheel.cancel(governor_id)
+                pending = self._pending.get(governor_id)
+                if pending is not None:
+                    pending.stale = True
+            else:
+                self._entries.clear()
+                self.total_bytes = 0
+                self._expiry_wheel = TimingWheel()
+                for pending in self._pending.values():
+                    pending.stale = True
+    
+    def expire(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Reclaim cached preferences older than the TTL.
+        
+        Args:
+            now: Wall-clock time to expire against (defaults to now)
+        
+        Returns:
+            Tuple of (governors expired, bytes reclaimed)
+        """
+        now = time.time() if now is None else now
+        expired_count = 0
+        reclaimed_bytes = 0
+        
+        with self._lock:
+            for governor_id in self._expiry_wheel.advance(now):
+                entry = self._entries.get(governor_id)
+                if entry is None:
+                    continue
+                if now - entry.cached_at < self.ttl_seconds:
+                    self._expiry_wheel.schedule(governor_id, entry.cached_at + self.ttl_seconds)
+                    continue
+                del self._entries[governor_id]
+                self.total_bytes -= entry.size_bytes
+                expired_count += 1
+                reclaimed_bytes += entry.size_bytes
+            
+            self.stats['expirations'] += expired_count
+            self.stats['reclaimed_bytes'] += reclaimed_bytes
+        
+        return expired_count, reclaimed_bytes
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache occupancy and hit statistics."""
+        with self._lock:
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'in_flight': len(self._pending)
+            }
+    
+    def _insert(self, governor_id: str, preferences: GovernorPreferences, size_bytes: int) -> None:
+        """Store an entry and enforce the budgets (caller holds the lock)."""
+        previous = self._entries.pop(governor_id, None)
+        if previous is not None:
+            self.total_bytes -= previous.size_bytes
+        
+        cached_at = time.time()
+        self._entries[governor_id] = CachedPreferences(preferences, cached_at, size_bytes)
+        self.total_bytes += size_bytes
+        self._expiry_wheel.schedule(governor_id, cached_at + self.ttl_seconds)
+        
+        while self._entries and (
+            len(self._entries) > self.max_entries or
+            (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            evicted_id, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.size_bytes
+            self._expiry_wheel.cancel(evicted_id)
+            self.stats['evictions'] += 1
+    
+    def _estimate_bytes(self, preferences: GovernorPreferences) -> int:
+        """Approximate memory held by preferences (pickled size)."""
+        try:
+            return len(pickle.dumps(preferences, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return 0  # Size is informational unless a byte budget is set
+
 class GovernorPreferencesManager:
     """
     Main interface for the Governor Preferences System.
@@ -36,12 +284,18 @@ class GovernorPreferencesManager:
     behavioral filters throughout the dialog system.
     """
     
-    def __init__(self, enable_caching: bool = True):
+    def __init__(self, enable_caching: bool = True, snapshot_path: Optional[str] = None,
+                 profiles_dir: Optional[str] = None, max_cached_governors: int = 256,
+                 max_cache_bytes: Optional[int] = None):
         """
         Initialize the preferences manager with all component systems.
         
         Args:
             enable_caching: Whether to enable preference caching for performance
+            snapshot_path: Prebuilt preference snapshot to serve from (see preference_snapshot)
+            profiles_dir: Governor profile directory the snapshot must match
+            max_cached_governors: Maximum number of governors whose preferences are cached
+            max_cache_bytes: Optional memory budget (pickled bytes) for cached preferences
         """
         self.preference_encoder = PreferenceEncoder()
         self.trait_mapper = TraitMapper()
@@ -50,17 +304,35 @@ class GovernorPreferencesManager:
         
         # Performance optimization
         self.enable_caching = enable_caching
-        self.preference_cache: Dict[str, GovernorPreferences] = {}
-        self.cache_timestamps: Dict[str, float] = {}
-        self.cache_ttl = 3600  # 1 hour cache TTL
+        self.preference_cache = PreferenceCache(
+            max_entries=max_cached_governors, max_bytes=max_cache_bytes, ttl_seconds=3600  # 1 hour cache TTL
+        )
+        self._expiry_sweeper: Optional[ExpirySweeper] = None
+        
+        # Prebuilt preferences, used only while its content hash matches
+        self.preference_snapshot: Optional[PreferenceSnapshot] = None
+        self.snapshot_hits = 0
+        if snapshot_path:
+            self.load_preference_snapshot(snapshot_path, profiles_dir or DEFAULT_PROFILES_DIR)
         
         logger.info("GovernorPreferencesManager initialized with all systems")
     
+    @property
+    def cache_ttl(self) -> float:
+        """Time-to-live for cached preferences, in seconds"""
+        return self.preference_cache.ttl_seconds
+    
+    @cache_ttl.setter
+    def cache_ttl(self, ttl_seconds: float) -> None:
+        self.preference_cache.ttl_seconds = ttl_seconds
+    
     def get_governor_preferences(self, governor_profile: GovernorProfile, 
                                force_refresh: bool = False) -> GovernorPreferences:
         """
         Get or generate preferences for a governor.
         
+        Concurrent cache misses for the same governor share one generation.
+        
         Args:
             governor_profile: The governor profile to analyze
             force_refresh: Force regeneration even if cached
@@ -70,35 +342,39 @@ class GovernorPreferencesManager:
         """
         cache_key = governor_profile.governor_id
         
-        # Check cache first
-        if self.enable_caching and not force_refresh and self._is_cache_valid(cache_key):
-            logger.debug(f"Returning cached preferences for {cache_key}")
-            return self.preference_cache[cache_key]
-        
-        logger.info(f"Generating preferences for governor {governor_profile.governor_id}")
-        
         try:
-            # Step 1: Encode base preferences from profile
-            base_preferences = self.preference_encoder.encode_governor_preferences(governor_profile)
+            if self.enable_caching and not force_refresh:
+                return self.preference_cache.get_or_generate(
+                    cache_key, lambda: self._generate_preferences(governor_profile)
+                )
             
-            # Step 2: Apply trait mappings for refinement
-            refined_preferences = self.trait_mapper.apply_trait_mappings_to_preferences(
-                governor_profile, base_preferences
-            )
-            
-            # Cache the result
+            preferences = self._generate_preferences(governor_profile, use_snapshot=not force_refresh)
             if self.enable_caching:
-                self.preference_cache[cache_key] = refined_preferences
-                self.cache_timestamps[cache_key] = time.time()
-            
-            logger.info(f"Successfully generated preferences for {governor_profile.governor_id}")
-            return refined_preferences
-            
+                self.preference_cache.put(cache_key, preferences)
+            return preferences
+        
         except Exception as e:
             logger.error(f"Failed to generate preferences for {governor_profile.governor_id}: {e}")
             # Return basic fallback preferences
             return self._create_fallback_preferences(governor_profile.governor_id)
     
+    def generate_preferences_batch(self, governor_profiles: List[GovernorProfile]) -> List[GovernorPreferences]:
+        """
+        Run the encode and trait-mapping pipeline for many governors at once.
+        
+        Uses the vectorized batch paths of the encoder and trait mapper. Meant for
+        what-if analysis over large (often synthetic) populations, so results
+        bypass the preference cache and snapshot.
+        
+        Args:
+            governor_profiles: Governor profiles to encode
+            
+        Returns:
+            Preferences for each profile, in input order
+        """
+        base_preferences = self.preference_encoder.encode_preferences_batch(governor_profiles)
+        return self.trait_mapper.apply_trait_mappings_batch(governor_profiles, base_preferences)
+    
     def process_dialog_interaction(self, player_input: str, 
                                  response_variants: List[str],
                                  governor_profile: GovernorProfile,
@@ -197,8 +473,8 @@ class GovernorPreferencesManager:
         Returns:
             Dictionary containing preference summary
         """
-        if governor_id in self.preference_cache:
-            preferences = self.preference_cache[governor_id]
+        preferences = self.preference_cache.peek(governor_id)
+        if preferences is not None:
             return {
                 'governor_id': preferences.governor_id,
                 'tone_preference': preferences.tone_preference.value,
@@ -222,23 +498,100 @@ class GovernorPreferencesManager:
         Args:
             governor_id: Specific governor to clear, or None for all
         """
+        self.preference_cache.invalidate(governor_id or None)
         if governor_id:
-            self.preference_cache.pop(governor_id, None)
-            self.cache_timestamps.pop(governor_id, None)
             logger.info(f"Cleared cache for governor {governor_id}")
         else:
-            self.preference_cache.clear()
-            self.cache_timestamps.clear()
             logger.info("Cleared all preference cache")
     
+    def expire_stale_preferences(self, now: Optional[float] = None) -> int:
+        """
+        Reclaim cached preferences older than the cache TTL.
+        
+        Args:
+            now: Wall-clock time to expire against (defaults to now)
+            
+        Returns:
+            Number of governors whose cached preferences were reclaimed
+        """
+        expired, reclaimed_bytes = self.preference_cache.expire(now)
+        if expired:
+            logger.debug(f"Expired cached preferences for {expired} governors ({reclaimed_bytes} bytes)")
+        return expired
+    
+    def start_expiry_sweeper(self, interval_seconds: float = 60.0) -> ExpirySweeper:
+        """
+        Start a background thread that calls expire_stale_preferences periodically.
+        
+        For asyncio services, schedule ExpirySweeper(manager.expire_stale_preferences).run_async()
+        as a task instead.
+        
+        Args:
+            interval_seconds: Delay between sweeps
+            
+        Returns:
+            The running sweeper
+        """
+        if self._expiry_sweeper is None:
+            self._expiry_sweeper = ExpirySweeper(self.expire_stale_preferences, interval_seconds,
+                                                 name="preference-expiry-sweeper")
+            self._expiry_sweeper.start()
+        return self._expiry_sweeper
+    
+    def stop_expiry_sweeper(self) -> None:
+        """Stop the background expiry sweeper if running"""
+        if self._expiry_sweeper is not None:
+            self._expiry_sweeper.stop()
+            self._expiry_sweeper = None
+    
+    def load_preference_snapshot(self, snapshot_path: str = str(DEFAULT_SNAPSHOT_PATH),
+                                 profiles_dir: str = str(DEFAULT_PROFILES_DIR)) -> bool:
+        """
+        Serve preferences from a prebuilt snapshot instead of encoding on demand.
+        
+        The snapshot is rejected (and live encoding used) when its content hash
+        does not match the current profile files and mapping tables.
+        
+        Args:
+            snapshot_path: Snapshot built by preference_snapshot.build_preference_snapshot
+            profiles_dir: Governor profile directory the snapshot must match
+            
+        Returns:
+            True if the snapshot was loaded
+        """
+        try:
+            snapshot = PreferenceSnapshot(snapshot_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Preference snapshot unavailable, using live encoding: {e}")
+            return False
+        
+        expected_hash = compute_snapshot_hash(
+            list_profile_paths(profiles_dir), self.preference_encoder, self.trait_mapper
+        )
+        if snapshot.content_hash != expected_hash:
+            snapshot.close()
+            logger.warning(f"Preference snapshot {snapshot_path} is stale, using live encoding")
+            return False
+        
+        if self.preference_snapshot is not None:
+            self.preference_snapshot.close()
+        self.preference_snapshot = snapshot
+        logger.info(f"Loaded preference snapshot with {len(snapshot)} governors")
+        return True
+    
     def get_system_status(self) -> Dict[str, Any]:
         """Get status information about the preferences system."""
         return {
             'cache_enabled': self.enable_caching,
             'cached_governors': len(self.preference_cache),
             'cache_ttl_seconds': self.cache_ttl,
+            'expired_preferences': self.preference_cache.stats['expirations'],
+            'reclaimed_bytes': self.preference_cache.stats['reclaimed_bytes'],
+            'preference_cache': self.preference_cache.get_stats(),
+            'snapshot_governors': len(self.preference_snapshot) if self.preference_snapshot else 0,
+            'snapshot_hits': self.snapshot_hits,
             'trait_mappings_count': len(self.trait_mapper.mappings_registry),
-            'conflicts_recorded': len(self.trait_mapper.parameter_conflicts),
+            'conflicts_recorded': self.trait_mapper.conflicts_recorded,
             'system_components': {
                 'preference_encoder': 'active',
                 'trait_mapper': 'active', 
@@ -247,16 +600,27 @@ class GovernorPreferencesManager:
             }
         }
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Check if cached preferences are still valid."""
-        if cache_key not in self.preference_cache:
-            return False
+    def _generate_preferences(self, governor_profile: GovernorProfile,
+                              use_snapshot: bool = True) -> GovernorPreferences:
+        """Produce preferences from the snapshot or the encode and trait-mapping pipeline."""
+        if use_snapshot and self.preference_snapshot is not None:
+            snapshot_preferences = self.preference_snapshot.get(governor_profile.governor_id, governor_profile)
+            if snapshot_preferences is not None:
+                self.snapshot_hits += 1
+                return snapshot_preferences
         
-        if cache_key not in self.cache_timestamps:
-            return False
+        logger.info(f"Generating preferences for governor {governor_profile.governor_id}")
+        
+        # Step 1: Encode base preferences from profile
+        base_preferences = self.preference_encoder.encode_governor_preferences(governor_profile)
+        
+        # Step 2: Apply trait mappings for refinement
+        refined_preferences = self.trait_mapper.apply_trait_mappings_to_preferences(
+            governor_profile, base_preferences
+        )
         
-        cache_age = time.time() - self.cache_timestamps[cache_key]
-        return cache_age < self.cache_ttl
+        logger.info(f"Successfully generated preferences for {governor_profile.governor_id}")
+        return refined_preferences
     
     def _create_fallback_preferences(self, governor_id: str) -> GovernorPreferences:
         """Create fallback preferences when encoding fails."""
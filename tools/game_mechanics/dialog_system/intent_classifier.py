@@ -11,13 +11,17 @@ Key Components:
 - FallbackHandler: Handles unmatched or ambiguous inputs
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Any
 import logging
+import threading
 
 from .core_structures import IntentCategory
 from .nlu_engine import TokenMatcher, MatchResult, EntityRecognizer
-from .similarity_engine import SimpleEmbedding, SimilarityMatcher
+from .similarity_engine import (
+    SimpleEmbedding, SimilarityMatcher, PatternEmbeddingIndex, NUMPY_AVAILABLE, np
+)
 
 @dataclass
 class ClassificationResult:
@@ -38,8 +42,13 @@ class IntentClassifier:
     to provide robust intent recognition for player inputs.
     """
     
-    def __init__(self):
-        """Initialize the intent classifier."""
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize the intent classifier.
+        
+        Args:
+            cache_size: Maximum memoized results keyed by normalized tokens (0 disables)
+        """
         self.logger = logging.getLogger(__name__)
         
         # Initialize component systems
@@ -52,11 +61,29 @@ class IntentClassifier:
         self.high_confidence_threshold = 0.8
         self.medium_confidence_threshold = 0.5
         self.low_confidence_threshold = 0.3
+        self.semantic_alternatives = 3  # Alternative intents reported by semantic matching
+        
+        # Stacked pattern-token embeddings, rebuilt when patterns or embeddings change
+        self._pattern_index: Optional[PatternEmbeddingIndex] = None
+        self._pattern_index_key: Optional[Tuple[Any, ...]] = None
+        
+        # Memoized results keyed on the normalized token tuple (LRU order); entities are
+        # not part of the memo since they are scanned from each call's raw text
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._result_cache: OrderedDict[Tuple[str, ...], ClassificationResult] = OrderedDict()
+        self._cache_versions = self._component_versions()
+        self._cache_lock = threading.Lock()
     
     def classify(self, text: str) -> ClassificationResult:
         """
         Classify player input text to determine intent.
         
+        Inputs that normalize to the same tokens share a memoized intent result;
+        entities are always extracted from this text, and the caller receives
+        its own copy.
+        
         Args:
             text: Player input text
             
@@ -66,49 +93,188 @@ class IntentClassifier:
         if not text or not text.strip():
             return self._create_unknown_result("Empty input")
         
+        if self.cache_size <= 0:
+            return self._classify_uncached(text)
+        
+        cache_key = tuple(self.token_matcher.tokenize(text))
+        with self._cache_lock:
+            self._refresh_cache_versions()
+            cached_result = self._result_cache.get(cache_key)
+            if cached_result is not None:
+                self._result_cache.move_to_end(cache_key)
+                self.cache_hits += 1
+                return self._result_for_text(cached_result, text)
+            self.cache_misses += 1
+        
+        result = self._classify_uncached(text)
+        
+        with self._cache_lock:
+            self._store_result(cache_key, result)
+        return result
+    
+    def classify_many(self, texts: List[str]) -> List[ClassificationResult]:
+        """
+        Classify a batch of player inputs.
+        
+        Inputs are tokenized up front and deduplicated by their normalized tokens,
+        so repeated messages are classified once (entities are still extracted
+        per distinct text); the semantic fallback for every input not resolved
+        by token matching runs as one vectorized pass.
+        
+        Args:
+            texts: Player input texts
+            
+        Returns:
+            ClassificationResult for each input, in input order
+        """
+        results: List[Optional[ClassificationResult]] = [None] * len(texts)
+        positions: Dict[Tuple[str, ...], List[int]] = {}  # normalized tokens -> input positions
+        representatives: Dict[Tuple[str, ...], str] = {}
+        for position, text in enumerate(texts):
+            if not text or not text.strip():
+                results[position] = self._create_unknown_result("Empty input")
+                continue
+            
+            cache_key = tuple(self.token_matcher.tokenize(text))
+            if cache_key not in positions:
+                positions[cache_key] = []
+                representatives[cache_key] = text
+            positions[cache_key].append(position)
+        
+        resolved: Dict[Tuple[str, ...], ClassificationResult] = {}
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._refresh_cache_versions()
+                for cache_key, key_positions in positions.items():
+                    cached_result = self._result_cache.get(cache_key)
+                    if cached_result is not None:
+                        self._result_cache.move_to_end(cache_key)
+                        resolved[cache_key] = cached_result
+                        self.cache_hits += len(key_positions)
+                    else:
+                        # Duplicates after the first would have hit the cache
+                        self.cache_misses += 1
+                        self.cache_hits += len(key_positions) - 1
+        
+        pending = [cache_key for cache_key in positions if cache_key not in resolved]
+        entities_by_text: Dict[str, Dict[str, List[str]]] = {}
+        if pending:
+            computed = self._classify_batch_uncached(
+                [representatives[cache_key] for cache_key in pending],
+                [list(cache_key) for cache_key in pending]
+            )
+            resolved.update(zip(pending, computed))
+            for cache_key, result in zip(pending, computed):
+                entities_by_text[representatives[cache_key]] = result.entities
+            
+            if self.cache_size > 0:
+                with self._cache_lock:
+                    for cache_key, result in zip(pending, computed):
+                        self._store_result(cache_key, result)
+        
+        for cache_key, key_positions in positions.items():
+            for position in key_positions:
+                text = texts[position]
+                if text not in entities_by_text:
+                    entities_by_text[text] = self.entity_recognizer.extract_entities(text)
+                results[position] = self._copy_result(resolved[cache_key], entities_by_text[text])
+        return results
+    
+    def invalidate_cache(self) -> None:
+        """Drop memoized results (e.g. after changing thresholds or pattern internals)"""
+        with self._cache_lock:
+            self._result_cache.clear()
+            self._cache_versions = self._component_versions()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get memoization statistics"""
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'cache_size': len(self._result_cache),
+                'max_cache_size': self.cache_size,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'hit_rate': self.cache_hits / lookups if lookups else 0.0
+            }
+    
+    def _classify_uncached(self, text: str) -> ClassificationResult:
+        """Run the full classification pipeline for non-empty input."""
+        return self._classify_batch_uncached([text], [self.token_matcher.tokenize(text)])[0]
+    
+    def _classify_batch_uncached(self, texts: List[str],
+                                 token_lists: List[List[str]]) -> List[ClassificationResult]:
+        """
+        Run the full classification pipeline for a batch of non-empty inputs.
+        
+        Args:
+            texts: Input texts
+            token_lists: Tokenized form of each text
+            
+        Returns:
+            ClassificationResult for each input, in order
+        """
         # Step 1: Try exact token matching first (fastest)
-        token_matches = self.token_matcher.classify_intent(text)
+        token_match_lists = [self.token_matcher.classify_tokens(tokens) for tokens in token_lists]
         
         # Step 2: Extract entities
-        entities = self.entity_recognizer.extract_entities(text)
+        entity_lists = [self.entity_recognizer.extract_entities(text) for text in texts]
         
         # Step 3: If we have high-confidence token matches, use them
-        if token_matches and token_matches[0].confidence >= self.high_confidence_threshold:
-            best_match = token_matches[0]
-            alternatives = [(m.intent, m.confidence) for m in token_matches[1:3]]
-            
-            return ClassificationResult(
-                intent=best_match.intent,
-                confidence=best_match.confidence,
-                method="token_matching",
-                matched_tokens=best_match.matched_tokens,
-                entities=entities,
-                alternatives=alternatives,
-                metadata=best_match.metadata
-            )
+        results: List[Optional[ClassificationResult]] = [
+            self._token_match_result(token_matches, entities, self.high_confidence_threshold, "token_matching")
+            for token_matches, entities in zip(token_match_lists, entity_lists)
+        ]
         
-        # Step 4: Try semantic similarity for medium confidence
-        semantic_result = self._semantic_classification(text, entities)
-        if semantic_result and semantic_result.confidence >= self.medium_confidence_threshold:
-            return semantic_result
+        # Step 4: Try semantic similarity for medium confidence, all unresolved inputs at once
+        unresolved = [i for i, result in enumerate(results) if result is None]
+        semantic_results: Dict[int, Optional[ClassificationResult]] = {}
+        semantic_batch = [i for i in unresolved if token_lists[i]]
+        if semantic_batch and NUMPY_AVAILABLE:
+            batch_results = self._semantic_classify_batch(
+                [token_lists[i] for i in semantic_batch], [entity_lists[i] for i in semantic_batch]
+            )
+            semantic_results.update(zip(semantic_batch, batch_results))
+        else:
+            for i in semantic_batch:
+                semantic_results[i] = self._semantic_classification_scan(token_lists[i], entity_lists[i])
         
-        # Step 5: Use best token match if above low threshold
-        if token_matches and token_matches[0].confidence >= self.low_confidence_threshold:
-            best_match = token_matches[0]
-            alternatives = [(m.intent, m.confidence) for m in token_matches[1:3]]
+        for i in unresolved:
+            semantic_result = semantic_results.get(i)
+            if semantic_result and semantic_result.confidence >= self.medium_confidence_threshold:
+                results[i] = semantic_result
+                continue
             
-            return ClassificationResult(
-                intent=best_match.intent,
-                confidence=best_match.confidence,
-                method="token_matching_low_confidence",
-                matched_tokens=best_match.matched_tokens,
-                entities=entities,
-                alternatives=alternatives,
-                metadata=best_match.metadata
+            # Step 5: Use best token match if above low threshold
+            results[i] = self._token_match_result(
+                token_match_lists[i], entity_lists[i], self.low_confidence_threshold,
+                "token_matching_low_confidence"
             )
+            
+            # Step 6: Fallback to unknown intent
+            if results[i] is None:
+                results[i] = self._create_unknown_result("No confident matches found", entity_lists[i])
+        
+        return results
+    
+    def _token_match_result(self, token_matches: List[MatchResult], entities: Dict[str, List[str]],
+                            threshold: float, method: str) -> Optional[ClassificationResult]:
+        """Build a result from the best token match if it reaches the threshold."""
+        if not token_matches or token_matches[0].confidence < threshold:
+            return None
+        
+        best_match = token_matches[0]
+        alternatives = [(m.intent, m.confidence) for m in token_matches[1:3]]
         
-        # Step 6: Fallback to unknown intent
-        return self._create_unknown_result("No confident matches found", entities)
+        return ClassificationResult(
+            intent=best_match.intent,
+            confidence=best_match.confidence,
+            method=method,
+            matched_tokens=best_match.matched_tokens,
+            entities=entities,
+            alternatives=alternatives,
+            metadata=best_match.metadata
+        )
     
     def _semantic_classification(self, text: str, entities: Dict[str, List[str]]) -> Optional[ClassificationResult]:
         """
@@ -125,6 +291,79 @@ class IntentClassifier:
         if not tokens:
             return None
         
+        if not NUMPY_AVAILABLE:
+            return self._semantic_classification_scan(tokens, entities)
+        return self._semantic_classify_batch([tokens], [entities])[0]
+    
+    def _semantic_classify_batch(self, token_lists: List[List[str]],
+                                 entity_lists: List[Dict[str, List[str]]]) -> List[Optional[ClassificationResult]]:
+        """
+        Score every pattern against a batch of tokenized inputs in one vectorized pass.
+        
+        Args:
+            token_lists: Non-empty tokenized inputs
+            entity_lists: Already extracted entities for each input
+            
+        Returns:
+            ClassificationResult (or None if not confident) for each input
+        """
+        index = self._get_pattern_index()
+        if not index.patterns:
+            return [None] * len(token_lists)
+        
+        required_similarity, optional_similarity, best_tokens = index.score_batch(token_lists)
+        confidences = index.confidences(required_similarity, optional_similarity)
+        
+        results: List[Optional[ClassificationResult]] = []
+        for batch_index, tokens in enumerate(token_lists):
+            pattern_confidences = confidences[batch_index]
+            best_pattern = int(pattern_confidences.argmax())  # Earliest pattern wins ties
+            best_confidence = float(pattern_confidences[best_pattern])
+            if best_confidence < self.medium_confidence_threshold:
+                results.append(None)
+                continue
+            
+            # Top alternative intents, best pattern per intent
+            best_intent = index.patterns[best_pattern].intent
+            seen_intents = {best_intent}
+            alternatives = []
+            for pattern_index in np.argsort(-pattern_confidences, kind="stable"):
+                confidence = float(pattern_confidences[pattern_index])
+                if confidence <= self.low_confidence_threshold or len(alternatives) >= self.semantic_alternatives:
+                    break
+                intent = index.patterns[pattern_index].intent
+                if intent not in seen_intents:
+                    seen_intents.add(intent)
+                    alternatives.append((intent, confidence))
+            
+            results.append(ClassificationResult(
+                intent=best_intent,
+                confidence=best_confidence,
+                method="semantic_similarity",
+                matched_tokens=index.matched_tokens(best_pattern, tokens, best_tokens[batch_index]),
+                entities=entity_lists[batch_index],
+                alternatives=alternatives,
+                metadata={"semantic_match": True}
+            ))
+        return results
+    
+    def _get_pattern_index(self) -> PatternEmbeddingIndex:
+        """Return the pattern-embedding index, rebuilding it if its inputs changed."""
+        index_key = (self.token_matcher.version, self.embedding_system.version,
+                     self.similarity_matcher.similarity_threshold)
+        if self._pattern_index is None or self._pattern_index_key != index_key:
+            self._pattern_index = PatternEmbeddingIndex(
+                self.embedding_system, self.similarity_matcher.similarity_threshold
+            )
+            self._pattern_index.build([
+                pattern for patterns in self.token_matcher.intent_patterns.values() for pattern in patterns
+            ])
+            self._pattern_index_key = index_key
+        return self._pattern_index
+    
+    def _semantic_classification_scan(self, tokens: List[str],
+                                      entities: Dict[str, List[str]]) -> Optional[ClassificationResult]:
+        """Pattern-by-pattern semantic classification (used without NumPy)."""
         # Try semantic matching against known patterns
         best_intent = None
         best_confidence = 0.0
@@ -173,6 +412,40 @@ class IntentClassifier:
         
         return None
     
+    def _refresh_cache_versions(self) -> None:
+        """Drop memoized results if patterns or embeddings changed (caller holds the lock)."""
+        if self._cache_versions != self._component_versions():
+            self._result_cache.clear()
+            self._cache_versions = self._component_versions()
+    
+    def _store_result(self, cache_key: Tuple[str, ...], result: ClassificationResult) -> None:
+        """Memoize a copy of a result, evicting least recently used entries (caller holds the lock)."""
+        self._result_cache[cache_key] = self._copy_result(result)
+        self._result_cache.move_to_end(cache_key)
+        while len(self._result_cache) > self.cache_size:
+            self._result_cache.popitem(last=False)
+    
+    def _component_versions(self) -> Tuple[int, int]:
+        """Versions of the components memoized results depend on (entities are rescanned per call)."""
+        return (self.token_matcher.version, self.embedding_system.version)
+    
+    def _result_for_text(self, result: ClassificationResult, text: str) -> ClassificationResult:
+        """Copy a memoized result with the entities found in this exact text."""
+        return self._copy_result(result, self.entity_recognizer.extract_entities(text))
+    
+    def _copy_result(self, result: ClassificationResult,
+                     entities: Optional[Dict[str, List[str]]] = None) -> ClassificationResult:
+        """Copy a result so cached state cannot be mutated by callers (optionally with other entities)."""
+        if entities is None:
+            entities = result.entities
+        return replace(
+            result,
+            matched_tokens=list(result.matched_tokens),
+            entities={entity_type: list(found) for entity_type, found in entities.items()},
+            alternatives=list(result.alternatives),
+            metadata=dict(result.metadata)
+        )
+    
     def _create_unknown_result(self, reason: str, entities: Optional[Dict[str, List[str]]] = None) -> ClassificationResult:
         """Create a result for unknown/unmatched input."""
         return ClassificationResult(
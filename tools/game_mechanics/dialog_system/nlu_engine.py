@@ -14,8 +14,11 @@ Key Components:
 """
 
 import re
+import json
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple, Any
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Any, Iterable
 from enum import Enum
 import logging
 
@@ -64,6 +67,14 @@ class TokenMatcher:
         """Initialize the token matcher."""
         self.logger = logging.getLogger(__name__)
         self.intent_patterns: Dict[IntentCategory, List[IntentPattern]] = {}
+        self.version = 0  # Bumped whenever patterns change, for downstream caches
+        
+        # Inverted index: token -> (pattern order, pattern, is_required) for TOKEN_MATCH
+        # patterns; other pattern types are still scanned. Pattern order is
+        # (intent rank, position within intent) so results tie-break as a full scan would.
+        self._token_index: Dict[str, List[Tuple[Tuple[int, int], IntentPattern, bool]]] = {}
+        self._scanned_patterns: List[Tuple[Tuple[int, int], IntentPattern]] = []
+        self._intent_rank: Dict[IntentCategory, int] = {}
         self.stopwords: Set[str] = {
             'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
             'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the',
@@ -139,7 +150,20 @@ class TokenMatcher:
         """Add a new intent pattern."""
         if pattern.intent not in self.intent_patterns:
             self.intent_patterns[pattern.intent] = []
+            self._intent_rank[pattern.intent] = len(self._intent_rank)
+        order = (self._intent_rank[pattern.intent], len(self.intent_patterns[pattern.intent]))
         self.intent_patterns[pattern.intent].append(pattern)
+        self.version += 1
+        
+        if pattern.pattern_type != PatternType.TOKEN_MATCH:
+            self._scanned_patterns.append((order, pattern))
+            return
+        
+        # One posting per occurrence so duplicate tokens count as they do in a scan
+        for token in pattern.required_tokens:
+            self._token_index.setdefault(token, []).append((order, pattern, True))
+        for token in pattern.optional_tokens:
+            self._token_index.setdefault(token, []).append((order, pattern, False))
     
     def tokenize(self, text: str) -> List[str]:
         """
@@ -209,6 +233,26 @@ class TokenMatcher:
             metadata={"pattern_type": pattern.pattern_type.value}
         )
     
+    def _token_match_from_counts(self, token_set: Set[str], pattern: IntentPattern,
+                                 required_count: int, optional_count: int) -> Optional[MatchResult]:
+        """Build a token match from inverted-index counts (same math as _match_token_pattern)."""
+        required_ratio = required_count / len(pattern.required_tokens)
+        optional_ratio = optional_count / len(pattern.optional_tokens) if pattern.optional_tokens else 0.0
+        
+        confidence = (required_ratio * 0.8 + optional_ratio * 0.2) * pattern.confidence_weight
+        if confidence < 0.3:
+            return None
+        
+        required_matches = [token for token in pattern.required_tokens if token in token_set]
+        optional_matches = [token for token in pattern.optional_tokens if token in token_set]
+        return MatchResult(
+            intent=pattern.intent,
+            confidence=confidence,
+            matched_tokens=required_matches + optional_matches,
+            extracted_entities={},
+            metadata={"pattern_type": pattern.pattern_type.value}
+        )
+    
     def _match_regex_pattern(self, tokens: List[str], pattern: IntentPattern) -> Optional[MatchResult]:
         """Match tokens against a regex pattern."""
         text = " ".join(tokens)
@@ -254,20 +298,47 @@ class TokenMatcher:
         Returns:
             List of MatchResult objects sorted by confidence
         """
-        tokens = self.tokenize(text)
+        return self.classify_tokens(self.tokenize(text))
+    
+    def classify_tokens(self, tokens: List[str]) -> List[MatchResult]:
+        """
+        Classify the intent of already tokenized text (see tokenize).
+        
+        Args:
+            tokens: Normalized input tokens
+            
+        Returns:
+            List of MatchResult objects sorted by confidence
+        """
         if not tokens:
             return []
         
-        matches = []
+        token_set = set(tokens)
+        candidates: List[Tuple[Tuple[int, int], MatchResult]] = []
         
-        # Try to match against all patterns
-        for intent, patterns in self.intent_patterns.items():
-            for pattern in patterns:
-                match = self.match_pattern(tokens, pattern)
+        # Only token patterns sharing a required token with the input can match
+        match_counts: Dict[int, List[Any]] = {}  # id(pattern) -> [order, pattern, required, optional]
+        for token in token_set:
+            for order, pattern, is_required in self._token_index.get(token, ()):
+                counts = match_counts.get(id(pattern))
+                if counts is None:
+                    counts = match_counts[id(pattern)] = [order, pattern, 0, 0]
+                counts[2 if is_required else 3] += 1
+        
+        for order, pattern, required_count, optional_count in match_counts.values():
+            if required_count:
+                match = self._token_match_from_counts(token_set, pattern, required_count, optional_count)
                 if match:
-                    matches.append(match)
+                    candidates.append((order, match))
+        
+        for order, pattern in self._scanned_patterns:
+            match = self.match_pattern(tokens, pattern)
+            if match:
+                candidates.append((order, match))
         
-        # Sort by confidence (highest first)
+        # Registration order first, then a stable sort by confidence (highest first)
+        candidates.sort(key=lambda candidate: candidate[0])
+        matches = [match for _, match in candidates]
         matches.sort(key=lambda x: x.confidence, reverse=True)
         
         return matches
@@ -285,36 +356,122 @@ class TokenMatcher:
         matches = self.classify_intent(text)
         return matches[0].intent if matches else None
 
+# Built-in vocabulary, extended from the data directory by load_entity_vocabulary
+BUILTIN_ENTITY_VOCABULARY: Dict[str, Tuple[str, ...]] = {
+    "governor_names": (
+        "occodon", "pascomb", "valgars", "doagnis", "pacasna", "dialoia", "samapha",
+        "virooli", "andispi", "thotanp", "axxiarg", "pothnir", "lazdixi", "nocamal",
+        "tiarpax", "saxtomp", "vauaamp", "zirzird", "opmacas", "genadol", "aspiaon"
+    ),
+    "mystical_terms": (
+        "aethyr", "enochian", "sigil", "pentagram", "hexagram", "invocation",
+        "scrying", "divination", "oracle", "prophecy", "vision", "revelation",
+        "ritual", "ceremony", "rite", "sacrament", "offering", "tribute"
+    ),
+    "items": (
+        "crystal", "wand", "chalice", "pentacle", "sword", "dagger",
+        "scroll", "tome", "grimoire", "tablet", "stone", "ring",
+        "incense", "candle", "oil", "herb", "powder", "elixir"
+    )
+}
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+
+@lru_cache(maxsize=None)
+def load_entity_vocabulary(data_dir: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """
+    Load entity vocabulary from the repository data directory.
+    
+    Governor names come from the governor profile file names and mystical
+    terms from the key concepts of the generated knowledge bases. No item
+    vocabulary is loaded: neither the profiles nor the knowledge bases list
+    items, so items stay at BUILTIN_ENTITY_VOCABULARY (extend them with
+    EntityRecognizer.add_vocabulary). Results are cached per data directory,
+    so recognizers after the first build from memory.
+    
+    Args:
+        data_dir: Repository data directory
+        
+    Returns:
+        (entity_type, terms) pairs
+    """
+    data_path = Path(data_dir)
+    governor_names = tuple(sorted(
+        path.stem.lower() for path in (data_path / "governors" / "profiles").glob("*.json")
+    ))
+    
+    concepts = set()
+    for path in sorted((data_path / "knowledge" / "generated").glob("*_knowledge_base.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                knowledge_base = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.getLogger(__name__).warning(f"Skipping knowledge base {path.name}: {e}")
+            continue
+        for entry in knowledge_base.get("entries", []):
+            concepts.update(concept.replace("_", " ") for concept in entry.get("key_concepts", []))
+    
+    return (("governor_names", governor_names), ("mystical_terms", tuple(sorted(concepts))))
+
 class EntityRecognizer:
     """
     Recognizes named entities and game objects in player input.
     
     This component identifies governor names, mystical terms, items,
     and other game-specific entities to enhance dialog understanding.
+    The whole vocabulary is compiled into a single trie-factored regex so
+    extraction is one scan of the input regardless of vocabulary size.
     """
     
-    def __init__(self):
-        """Initialize the entity recognizer."""
+    def __init__(self, data_dir: Optional[str] = None, load_data: bool = True):
+        """
+        Initialize the entity recognizer.
+        
+        Args:
+            data_dir: Repository data directory (governor profiles and knowledge bases)
+            load_data: Whether to extend the built-in vocabulary from data_dir
+        """
         self.logger = logging.getLogger(__name__)
+        self.version = 0  # Bumped whenever vocabulary changes, for downstream caches
         
-        # Entity patterns for different types
-        self.entity_patterns = {
-            "governor_names": [
-                r"\b(occodon|pascomb|valgars|doagnis|pacasna|dialoia|samapha)\b",
-                r"\b(virooli|andispi|thotanp|axxiarg|pothnir|lazdixi|nocamal)\b",
-                r"\b(tiarpax|saxtomp|vauaamp|zirzird|opmacas|genadol|aspiaon)\b"
-            ],
-            "mystical_terms": [
-                r"\b(aethyr|enochian|sigil|pentagram|hexagram|invocation)\b",
-                r"\b(scrying|divination|oracle|prophecy|vision|revelation)\b",
-                r"\b(ritual|ceremony|rite|sacrament|offering|tribute)\b"
-            ],
-            "items": [
-                r"\b(crystal|wand|chalice|pentacle|sword|dagger)\b",
-                r"\b(scroll|tome|grimoire|tablet|stone|ring)\b",
-                r"\b(incense|candle|oil|herb|powder|elixir)\b"
-            ]
-        }
+        # Vocabulary per entity type, plus the term trie the scanner is compiled from
+        self.vocabulary: Dict[str, Set[str]] = {}
+        self._term_types: Dict[str, Set[str]] = {}
+        self._term_trie: Dict[str, Any] = {}
+        self._scanner: Optional[re.Pattern] = None
+        
+        for entity_type, terms in BUILTIN_ENTITY_VOCABULARY.items():
+            self.add_vocabulary(entity_type, terms)
+        if load_data:
+            for entity_type, terms in load_entity_vocabulary(str(data_dir or DEFAULT_DATA_DIR)):
+                self.add_vocabulary(entity_type, terms)
+    
+    def add_vocabulary(self, entity_type: str, terms: Iterable[str]) -> int:
+        """
+        Add terms for an entity type; the scanner is recompiled on next use.
+        
+        Args:
+            entity_type: Entity type the terms are tagged with
+            terms: Words or phrases (matched case-insensitively on word boundaries)
+            
+        Returns:
+            Number of new terms added
+        """
+        known_terms = self.vocabulary.setdefault(entity_type, set())
+        added = 0
+        for term in terms:
+            term = " ".join(re.findall(r'\w+', term.lower()))
+            if not term or term in known_terms:
+                continue
+            known_terms.add(term)
+            self._term_types.setdefault(term, set()).add(entity_type)
+            self._insert_term(term)
+            added += 1
+        
+        if added:
+            self._scanner = None
+            self.version += 1
+        return added
     
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
@@ -326,17 +483,43 @@ class EntityRecognizer:
         Returns:
             Dictionary mapping entity types to found entities
         """
-        entities = {}
-        text_lower = text.lower()
+        if self._scanner is None:
+            self._scanner = self._compile_scanner()
         
-        for entity_type, patterns in self.entity_patterns.items():
-            found_entities = []
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, text_lower, re.IGNORECASE)
-                found_entities.extend(matches)
-            
-            if found_entities:
-                entities[entity_type] = list(set(found_entities))  # Remove duplicates
+        entities: Dict[str, List[str]] = {}
+        for match in self._scanner.finditer(text.lower()):
+            term = " ".join(match.group().split())
+            for entity_type in self._term_types[term]:
+                found_entities = entities.setdefault(entity_type, [])
+                if term not in found_entities:  # Remove duplicates
+                    found_entities.append(term)
+        
+        return entities
+    
+    def _insert_term(self, term: str) -> None:
+        """Add a term to the character trie."""
+        node = self._term_trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = True  # Terminal marker
+    
+    def _compile_scanner(self) -> re.Pattern:
+        """Compile the term trie into one regex alternation."""
+        if not self._term_trie:
+            return re.compile(r'(?!)')  # Matches nothing
+        return re.compile(r'\b' + self._trie_pattern(self._term_trie) + r'\b')
+    
+    def _trie_pattern(self, node: Dict[str, Any]) -> str:
+        """Regex for a trie node: shared prefixes are factored so matching stays linear."""
+        branches = []
+        for char in sorted(key for key in node if key):
+            char_pattern = r'\s+' if char == " " else re.escape(char)
+            branches.append(char_pattern + self._trie_pattern(node[char]))
         
-        return entities 
\ No newline at end of file
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A term ends here; greedily try the longer terms first
+            return ("(?:" + pattern + ")?") if len(branches) > 1 or len(pattern) > 1 else pattern + "?"
+        return pattern
@@ -10,21 +10,69 @@ Key Components:
 - PreferenceEncoder: Main encoding engine for trait-to-preference conversion
 - TraitAnalyzer: Analyzes and weights governor traits
 - ParameterGenerator: Generates behavioral parameters from trait analysis
+- encode_preferences_batch: Vectorized encoding of whole governor populations
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 import hashlib
-from dataclasses import asdict
+from dataclasses import asdict, replace
 
 from .core_structures import GovernorProfile, InteractionType
 from .preference_structures import (
     GovernorPreferences, PreferenceEncoding, TraitBehaviorMapping,
-    TonePreference, PuzzleDifficulty, BehaviorType
+    TonePreference, PuzzleDifficulty, BehaviorType, CORE_PARAMETERS
 )
+from .trait_matrix import NUMPY_AVAILABLE, TraitParameterMatrix, build_trait_incidence
+
+if NUMPY_AVAILABLE:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
+TRAIT_IMPORTANCE_MODIFIERS = {
+    'patient': 1.2,      # High importance for dialog flow
+    'cryptic': 1.3,      # High importance for response style
+    'scholarly': 1.1,    # Moderate importance
+    'mystical': 1.4,     # Very high importance for tone
+    'formal': 1.2,       # High importance for interaction style
+    'stern': 1.1,        # Moderate importance
+    'playful': 1.0,      # Normal importance
+    'wise': 1.2,         # High importance
+    'methodical': 1.1    # Moderate importance
+}
+
+# Tone scoring order; ties go to the earlier tone
+TONE_SCORE_ORDER = (
+    TonePreference.SOLEMN_CRYPTIC,
+    TonePreference.MYSTICAL_POETIC,
+    TonePreference.SCHOLARLY_PATIENT,
+    TonePreference.STERN_FORMAL,
+    TonePreference.ENIGMATIC_BRIEF,
+    TonePreference.PLAYFUL_RIDDLES,
+    TonePreference.COLD_DISTANT,
+    TonePreference.WARM_ENCOURAGING
+)
+
+TRAIT_TONE_SCORES = {
+    'mystical': ((TonePreference.MYSTICAL_POETIC, 0.8), (TonePreference.SOLEMN_CRYPTIC, 0.6)),
+    'scholarly': ((TonePreference.SCHOLARLY_PATIENT, 0.9),),
+    'cryptic': ((TonePreference.SOLEMN_CRYPTIC, 0.9), (TonePreference.ENIGMATIC_BRIEF, 0.7)),
+    'stern': ((TonePreference.STERN_FORMAL, 0.8), (TonePreference.COLD_DISTANT, 0.6)),
+    'patient': ((TonePreference.SCHOLARLY_PATIENT, 0.7), (TonePreference.WARM_ENCOURAGING, 0.5)),
+    'playful': ((TonePreference.PLAYFUL_RIDDLES, 0.9),)
+}
+
+TRAIT_DIFFICULTY_CONTRIBUTIONS = {
+    'wise': 0.3,
+    'scholarly': 0.2,
+    'cryptic': 0.3,
+    'mystical': 0.2,
+    'methodical': 0.2,
+    'patient': -0.1,  # Patient governors might use easier puzzles
+    'playful': -0.2   # Playful governors prefer simpler challenges
+}
+
 class PreferenceEncoder:
     """
     Main encoding engine that converts governor traits into behavioral preferences.
@@ -97,6 +145,228 @@ class PreferenceEncoder:
             # Return default preferences on error
             return self._create_default_preferences(governor_profile.governor_id)
     
+    def encoding_signature(self, governor_profile: GovernorProfile) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Key identifying profiles whose trait-derived preferences are identical.
+        
+        Two profiles with the same signature differ only in the fields patched by
+        personalize_preferences. Trait order is kept because weight application
+        and tie-breaking depend on it.
+        
+        Args:
+            governor_profile: The governor profile to key
+            
+        Returns:
+            Tuple of normalized traits and interaction model values
+        """
+        return (
+            tuple(trait.lower().strip() for trait in governor_profile.traits),
+            tuple(model.value for model in governor_profile.interaction_models)
+        )
+    
+    def personalize_preferences(self, template: GovernorPreferences,
+                                governor_profile: GovernorProfile) -> GovernorPreferences:
+        """
+        Derive a governor's preferences from those encoded for another governor
+        with the same encoding_signature, recomputing only governor-specific fields.
+        
+        Args:
+            template: Preferences encoded for a profile with the same signature
+            governor_profile: The governor to personalize for
+            
+        Returns:
+            GovernorPreferences for governor_profile
+        """
+        traits = governor_profile.traits
+        return replace(
+            template,
+            governor_id=governor_profile.governor_id,
+            trigger_words=self._generate_trigger_words(traits, governor_profile),
+            forbidden_words=list(template.forbidden_words),
+            preferred_topics=self._generate_preferred_topics(governor_profile),
+            behavioral_modifiers=dict(template.behavioral_modifiers)
+        )
+    
+    def encode_preferences_batch(self, governor_profiles: List[GovernorProfile]) -> List[GovernorPreferences]:
+        """
+        Encode preferences for many governors at once.
+        
+        Traits are compiled into a trait x output matrix (see compile_trait_matrix)
+        and the batch into a governor x trait weight matrix, so behavioral
+        parameters, modifiers, tone scores and difficulty scores for the whole
+        batch come from one matrix product, followed by the same clamping and
+        selection rules as encode_governor_preferences. Results agree with the
+        per-governor path up to floating-point rounding.
+        
+        Clamping once after summing equals the per-trait clamping of
+        _generate_behavioral_parameters only while a parameter's contributions
+        share a sign, and a modifier mapped by several traits keeps the last
+        trait's value; governors hitting either case (none do with the default
+        tables) are encoded individually. Without NumPy every governor is.
+        
+        Args:
+            governor_profiles: Governor profiles to encode
+        
+        Returns:
+            GovernorPreferences for each profile, in input order
+        """
+        if not NUMPY_AVAILABLE or not governor_profiles:
+            return [self.encode_governor_preferences(profile) for profile in governor_profiles]
+        
+        logger.info(f"Batch encoding preferences for {len(governor_profiles)} governors")
+        matrix = self.compile_trait_matrix()
+        
+        trait_lists = []
+        individual_rows = set()
+        for row, profile in enumerate(governor_profiles):
+            try:
+                trait_lists.append([trait.lower().strip() for trait in profile.traits])
+            except Exception:
+                trait_lists.append([])
+                individual_rows.add(row)  # Let the per-governor path handle (and log) the error
+        
+        incidence = build_trait_incidence(trait_lists, matrix.trait_index)
+        presence = incidence.presence
+        
+        # Equal base weights cancel when renormalizing: weight = importance / total importance
+        importance = np.array([TRAIT_IMPORTANCE_MODIFIERS.get(trait, 1.0) for trait in matrix.traits])
+        raw_weights = presence * importance
+        totals = (raw_weights.sum(axis=1) + incidence.unmatched)[:, None]
+        weights = np.divide(raw_weights, totals, out=np.zeros_like(raw_weights), where=totals > 0)
+        
+        parameter_names, parameter_columns = self._column_group(matrix, 'parameter:')
+        modifier_names, modifier_columns = self._column_group(matrix, 'modifier:')
+        _, tone_columns = self._column_group(matrix, 'tone:')
+        _, tone_combo_columns = self._column_group(matrix, 'tone_combo:')
+        _, difficulty_combo_columns = self._column_group(matrix, 'difficulty_combo:')
+        weighted_columns = np.concatenate([
+            parameter_columns, modifier_columns, tone_columns, matrix.column_positions(['difficulty'])
+        ])
+        
+        # One product for every weighted output of every governor
+        outputs = weights @ matrix.weights[:, weighted_columns]
+        parameter_end = len(parameter_columns)
+        modifier_end = parameter_end + len(modifier_columns)
+        tone_end = modifier_end + len(tone_columns)
+        parameters = np.clip(0.5 + outputs[:, :parameter_end], 0.0, 1.0)
+        modifiers = outputs[:, parameter_end:modifier_end]
+        tone_scores = outputs[:, modifier_end:tone_end]
+        difficulty_scores = outputs[:, tone_end]
+        
+        listed = matrix.listed.astype(float)
+        modifier_sources = presence @ listed[:, modifier_columns]
+        
+        # Governors whose result depends on trait order go through the per-governor path
+        parameter_weights = matrix.weights[:, parameter_columns]
+        raises = presence @ (parameter_weights > 0).astype(float)
+        lowers = presence @ (parameter_weights < 0).astype(float)
+        order_dependent = ((raises > 0) & (lowers > 0)).any(axis=1) | (modifier_sources > 1).any(axis=1)
+        individual_rows.update(np.flatnonzero(order_dependent).tolist())
+        
+        tone_combo, tone_combo_matched = self._first_combo_match(presence, listed[:, tone_combo_columns])
+        difficulty_combo, difficulty_combo_matched = self._first_combo_match(
+            presence, listed[:, difficulty_combo_columns]
+        )
+        best_tone = tone_scores.argmax(axis=1)
+        best_tone_score = tone_scores[np.arange(len(governor_profiles)), best_tone]
+        
+        combo_tones = list(self.tone_trait_mappings.values())
+        combo_difficulties = list(self.difficulty_trait_mappings.values())
+        (parameters, modifiers, modifier_sources, tone_combo, tone_combo_matched, best_tone, best_tone_score,
+         difficulty_combo, difficulty_combo_matched, difficulty_scores) = (
+            array.tolist() for array in (
+                parameters, modifiers, modifier_sources, tone_combo, tone_combo_matched, best_tone,
+                best_tone_score, difficulty_combo, difficulty_combo_matched, difficulty_scores
+            )
+        )
+        
+        results = []
+        for row, profile in enumerate(governor_profiles):
+            if row in individual_rows:
+                results.append(self.encode_governor_preferences(profile))
+                continue
+            
+            if tone_combo_matched[row]:
+                tone_preference = combo_tones[tone_combo[row]]
+            elif best_tone_score[row] > 0:
+                tone_preference = TONE_SCORE_ORDER[best_tone[row]]
+            else:
+                tone_preference = TonePreference.SCHOLARLY_PATIENT
+            
+            if difficulty_combo_matched[row]:
+                puzzle_difficulty = combo_difficulties[difficulty_combo[row]]
+            else:
+                puzzle_difficulty = self._difficulty_for_score(difficulty_scores[row])
+            
+            values = dict(zip(parameter_names, parameters[row]))
+            traits = profile.traits
+            results.append(GovernorPreferences(
+                governor_id=profile.governor_id,
+                tone_preference=tone_preference,
+                interaction_style=self._determine_interaction_style(profile.interaction_models),
+                greeting_formality=values['greeting_formality'],
+                puzzle_difficulty=puzzle_difficulty,
+                response_patience=values['response_patience'],
+                metaphor_tolerance=values['metaphor_tolerance'],
+                reputation_sensitivity=values['reputation_sensitivity'],
+                trigger_words=self._generate_trigger_words(traits, profile),
+                forbidden_words=self._generate_forbidden_words(traits),
+                preferred_topics=self._generate_preferred_topics(profile),
+                behavioral_modifiers={
+                    name: value for name, value, sources
+                    in zip(modifier_names, modifiers[row], modifier_sources[row]) if sources
+                }
+            ))
+        
+        logger.info(f"Batch encoded {len(results)} governors ({len(individual_rows)} individually)")
+        return results
+    
+    def compile_trait_matrix(self) -> TraitParameterMatrix:
+        """
+        Compile the encoder's trait tables into a trait x output matrix.
+        
+        Columns are grouped by prefix: 'parameter:' (CORE_PARAMETERS deltas),
+        'modifier:' (behavioral modifiers), 'tone:' (tone scores in
+        TONE_SCORE_ORDER), 'difficulty' (difficulty contribution), and the
+        'tone_combo:' / 'difficulty_combo:' trait combinations, whose entries
+        mark the combination's required traits.
+        
+        Returns:
+            TraitParameterMatrix (requires NumPy)
+        """
+        entries = []
+        modifier_names = []
+        for trait, mapping in self.trait_mappings.items():
+            for param, modification in mapping.parameter_modifications.items():
+                if param in CORE_PARAMETERS:
+                    entries.append((trait, f"parameter:{param}", modification))
+                else:
+                    if param not in modifier_names:
+                        modifier_names.append(param)
+                    entries.append((trait, f"modifier:{param}", modification))
+        
+        for trait, scores in TRAIT_TONE_SCORES.items():
+            entries.extend((trait, f"tone:{tone.value}", score) for tone, score in scores)
+        entries.extend((trait, 'difficulty', contribution)
+                       for trait, contribution in TRAIT_DIFFICULTY_CONTRIBUTIONS.items())
+        
+        for prefix, combos in (('tone_combo', self.tone_trait_mappings),
+                               ('difficulty_combo', self.difficulty_trait_mappings)):
+            for combo in combos:
+                entries.extend((trait, f"{prefix}:{combo}", 1.0) for trait in combo.split('_'))
+        
+        traits = list(dict.fromkeys(trait for trait, _, _ in entries))
+        traits.extend(trait for trait in TRAIT_IMPORTANCE_MODIFIERS if trait not in traits)
+        columns = (
+            [f"parameter:{param}" for param in CORE_PARAMETERS] +
+            [f"modifier:{param}" for param in modifier_names] +
+            [f"tone:{tone.value}" for tone in TONE_SCORE_ORDER] +
+            ['difficulty'] +
+            [f"tone_combo:{combo}" for combo in self.tone_trait_mappings] +
+            [f"difficulty_combo:{combo}" for combo in self.difficulty_trait_mappings]
+        )
+        return TraitParameterMatrix.compile(traits, columns, entries)
+    
     def calculate_trait_weights(self, traits: List[str]) -> Dict[str, float]:
         """
         Calculate relative importance weights for each trait.
@@ -117,22 +387,9 @@ class PreferenceEncoder:
         base_weight = 1.0 / len(normalized_traits)
         trait_weights = {trait: base_weight for trait in normalized_traits}
         
-        # Apply modifiers based on trait importance
-        trait_importance_modifiers = {
-            'patient': 1.2,      # High importance for dialog flow
-            'cryptic': 1.3,      # High importance for response style
-            'scholarly': 1.1,    # Moderate importance
-            'mystical': 1.4,     # Very high importance for tone
-            'formal': 1.2,       # High importance for interaction style
-            'stern': 1.1,        # Moderate importance
-            'playful': 1.0,      # Normal importance
-            'wise': 1.2,         # High importance
-            'methodical': 1.1    # Moderate importance
-        }
-        
         # Apply importance modifiers
         for trait, weight in trait_weights.items():
-            modifier = trait_importance_modifiers.get(trait, 1.0)
+            modifier = TRAIT_IMPORTANCE_MODIFIERS.get(trait, 1.0)
             trait_weights[trait] = weight * modifier
         
         # Renormalize to ensure sum is 1.0
@@ -264,35 +521,12 @@ class PreferenceEncoder:
                 return tone
         
         # Fall back to individual trait analysis
-        trait_tone_scores = {
-            TonePreference.SOLEMN_CRYPTIC: 0.0,
-            TonePreference.MYSTICAL_POETIC: 0.0,
-            TonePreference.SCHOLARLY_PATIENT: 0.0,
-            TonePreference.STERN_FORMAL: 0.0,
-            TonePreference.ENIGMATIC_BRIEF: 0.0,
-            TonePreference.PLAYFUL_RIDDLES: 0.0,
-            TonePreference.COLD_DISTANT: 0.0,
-            TonePreference.WARM_ENCOURAGING: 0.0
-        }
+        trait_tone_scores = {tone: 0.0 for tone in TONE_SCORE_ORDER}
         
         # Score each tone based on trait weights
         for trait, weight in trait_weights.items():
-            if trait == 'mystical':
-                trait_tone_scores[TonePreference.MYSTICAL_POETIC] += weight * 0.8
-                trait_tone_scores[TonePreference.SOLEMN_CRYPTIC] += weight * 0.6
-            elif trait == 'scholarly':
-                trait_tone_scores[TonePreference.SCHOLARLY_PATIENT] += weight * 0.9
-            elif trait == 'cryptic':
-                trait_tone_scores[TonePreference.SOLEMN_CRYPTIC] += weight * 0.9
-                trait_tone_scores[TonePreference.ENIGMATIC_BRIEF] += weight * 0.7
-            elif trait == 'stern':
-                trait_tone_scores[TonePreference.STERN_FORMAL] += weight * 0.8
-                trait_tone_scores[TonePreference.COLD_DISTANT] += weight * 0.6
-            elif trait == 'patient':
-                trait_tone_scores[TonePreference.SCHOLARLY_PATIENT] += weight * 0.7
-                trait_tone_scores[TonePreference.WARM_ENCOURAGING] += weight * 0.5
-            elif trait == 'playful':
-                trait_tone_scores[TonePreference.PLAYFUL_RIDDLES] += weight * 0.9
+            for tone, score in TRAIT_TONE_SCORES.get(trait, ()):
+                trait_tone_scores[tone] += weight * score
         
         # Return the highest scoring tone
         best_tone = max(trait_tone_scores.items(), key=lambda x: x[1])
@@ -333,21 +567,14 @@ class PreferenceEncoder:
         # Calculate difficulty score from individual traits
         difficulty_score = 0.0
         
-        trait_difficulty_contributions = {
-            'wise': 0.3,
-            'scholarly': 0.2,
-            'cryptic': 0.3,
-            'mystical': 0.2,
-            'methodical': 0.2,
-            'patient': -0.1,  # Patient governors might use easier puzzles
-            'playful': -0.2   # Playful governors prefer simpler challenges
-        }
-        
         for trait, weight in trait_weights.items():
-            contribution = trait_difficulty_contributions.get(trait, 0.0)
+            contribution = TRAIT_DIFFICULTY_CONTRIBUTIONS.get(trait, 0.0)
             difficulty_score += weight * contribution
         
-        # Map score to difficulty level  
+        return self._difficulty_for_score(difficulty_score)
+    
+    def _difficulty_for_score(self, difficulty_score: float) -> PuzzleDifficulty:
+        """Map a weighted difficulty score to a difficulty level."""
         if difficulty_score >= 0.3:
             return PuzzleDifficulty.MASTERFUL
         elif difficulty_score >= 0.15:
@@ -379,6 +606,18 @@ class PreferenceEncoder:
         
         return params
     
+    def _column_group(self, matrix: TraitParameterMatrix, prefix: str) -> Tuple[List[str], Any]:
+        """Names (without prefix) and positions of a compiled matrix's column group."""
+        names = [column[len(prefix):] for column in matrix.columns if column.startswith(prefix)]
+        return names, matrix.column_positions([prefix + name for name in names])
+    
+    def _first_combo_match(self, presence: Any, combo_traits: Any) -> Tuple[Any, Any]:
+        """Index of each governor's first fully present trait combination, and whether one matched."""
+        if not combo_traits.shape[1]:
+            return np.zeros(len(presence), dtype=np.intp), np.zeros(len(presence), dtype=bool)
+        matched = (presence @ combo_traits) >= combo_traits.sum(axis=0)
+        return matched.argmax(axis=1), matched.any(axis=1)
+    
     def _generate_trigger_words(self, traits: List[str], governor_profile: GovernorProfile) -> List[str]:
         """Generate trigger words based on traits and profile."""
         trigger_words = []
@@ -0,0 +1,273 @@
+"""
+Preference Snapshot for Governor Dialog System
+==============================================
+
+This module builds and loads a prebuilt, versioned snapshot of encoded
+governor preferences so new worker processes can serve preferences without
+re-encoding (or even parsing) the governor profile JSON files.
+
+Snapshot layout (big-endian):
+    header   magic, format version, sha256 content hash, entry count
+    index    per governor: id length, id, profile fingerprint, blob offset, blob length
+    blobs    pickled GovernorPreferences, read lazily through mmap
+
+The content hash covers the raw bytes of every profile file plus the encoder
+and trait mapper tables, so any change to either invalidates the snapshot.
+
+Key Components:
+- build_preference_snapshot: Encode every governor profile into a snapshot file
+- compute_snapshot_hash: Content hash of profiles and mapping tables
+- profile_fingerprint: Per-governor check that a runtime profile matches the snapshot
+- PreferenceSnapshot: mmap-backed, lazily decoded snapshot reader
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import pickle
+import struct
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+from .core_structures import GovernorProfile
+from .preference_structures import GovernorPreferences
+from .preference_encoder import PreferenceEncoder
+from .trait_mapper import TraitMapper
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"GOVPSNAP"
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct(">8sH32sI")  # magic, version, content hash, entry count
+INDEX_ENTRY = struct.Struct(">16sQI")  # profile fingerprint, blob offset, blob length
+ID_LENGTH = struct.Struct(">H")
+
+DEFAULT_PROFILES_DIR = Path(__file__).resolve().parents[3] / "data" / "governors" / "profiles"
+DEFAULT_SNAPSHOT_PATH = Path(__file__).resolve().parents[3] / "data" / "governors" / "indexes" / "preference_snapshot.bin"
+
+def list_profile_paths(profiles_dir: Union[str, Path] = DEFAULT_PROFILES_DIR) -> List[Path]:
+    """List governor profile JSON files in a stable order"""
+    return sorted(Path(profiles_dir).glob("*.json"))
+
+def compute_snapshot_hash(profile_paths: List[Path], preference_encoder: PreferenceEncoder,
+                          trait_mapper: TraitMapper) -> bytes:
+    """
+    Hash the inputs a snapshot was built from.
+    
+    Profile files are hashed as raw bytes, so checking a snapshot never parses JSON.
+    
+    Args:
+        profile_paths: Governor profile files (see list_profile_paths)
+        preference_encoder: Encoder whose mapping tables are included
+        trait_mapper: Trait mapper whose registry is included
+    
+    Returns:
+        sha256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(SNAPSHOT_MAGIC + SNAPSHOT_FORMAT_VERSION.to_bytes(2, "big"))
+    
+    for path in profile_paths:
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    
+    mapping_tables = (
+        preference_encoder.trait_mappings,
+        preference_encoder.tone_trait_mappings,
+        preference_encoder.difficulty_trait_mappings,
+        trait_mapper.mappings_registry
+    )
+    digest.update(repr(mapping_tables).encode("utf-8"))
+    return digest.digest()
+
+def profile_fingerprint(governor_profile: GovernorProfile) -> bytes:
+    """Fingerprint of the profile fields that feed preference encoding"""
+    encoded_fields = (
+        governor_profile.governor_id,
+        governor_profile.name,
+        tuple(governor_profile.traits),
+        tuple(model.value for model in governor_profile.interaction_models),
+        tuple(sorted(governor_profile.preferences.items()))
+    )
+    return hashlib.md5(repr(encoded_fields).encode("utf-8")).digest()
+
+def load_governor_profiles(profile_paths: List[Path]) -> List[GovernorProfile]:
+    """Parse governor profile files, skipping (and logging) unreadable ones"""
+    profiles = []
+    for path in profile_paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                profiles.append(GovernorProfile.from_governor_data(json.load(f)))
+        except Exception as e:
+            logger.warning(f"Skipping governor profile {path.name}: {e}")
+    return profiles
+
+def build_preference_snapshot(output_path: Union[str, Path] = DEFAULT_SNAPSHOT_PATH,
+                              profiles_dir: Union[str, Path] = DEFAULT_PROFILES_DIR,
+                              preference_encoder: Optional[PreferenceEncoder] = None,
+                              trait_mapper: Optional[TraitMapper] = None) -> Dict[str, Any]:
+    """
+    Encode every governor profile and write the results to a snapshot file.
+    
+    Args:
+        output_path: Snapshot file to (atomically) write
+        profiles_dir: Directory containing governor profile JSON files
+        preference_encoder: Encoder to use (defaults to a new PreferenceEncoder)
+        trait_mapper: Trait mapper to use (defaults to a new TraitMapper)
+    
+    Returns:
+        Build summary with governor count, size and content hash
+    """
+    preference_encoder = preference_encoder or PreferenceEncoder()
+    trait_mapper = trait_mapper or TraitMapper()
+    
+    profile_paths = list_profile_paths(profiles_dir)
+    content_hash = compute_snapshot_hash(profile_paths, preference_encoder, trait_mapper)
+    
+    entries: List[Tuple[bytes, bytes, bytes]] = []
+    for profile in load_governor_profiles(profile_paths):
+        base_preferences = preference_encoder.encode_governor_preferences(profile)
+        preferences = trait_mapper.apply_trait_mappings_to_preferences(profile, base_preferences)
+        entries.append((
+            profile.governor_id.encode("utf-8"),
+            profile_fingerprint(profile),
+            pickle.dumps(preferences, protocol=pickle.HIGHEST_PROTOCOL)
+        ))
+    
+    index_size = sum(ID_LENGTH.size + len(governor_id) + INDEX_ENTRY.size
+                     for governor_id, _, _ in entries)
+    offset = SNAPSHOT_HEADER.size + index_size
+    
+    index = bytearray()
+    for governor_id, fingerprint, blob in entries:
+        index += ID_LENGTH.pack(len(governor_id)) + governor_id
+        index += INDEX_ENTRY.pack(fingerprint, offset, len(blob))
+        offset += len(blob)
+    
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION,
+                                     content_hash, len(entries)))
+        f.write(index)
+        for _, _, blob in entries:
+            f.write(blob)
+    temp_path.replace(output_path)
+    
+    logger.info(f"Built preference snapshot with {len(entries)} governors at {output_path}")
+    return {
+        'governors': len(entries),
+        'size_bytes': offset,
+        'content_hash': content_hash.hex(),
+        'path': str(output_path)
+    }
+
+class PreferenceSnapshot:
+    """
+    Read-only view of a preference snapshot file.
+    
+    Only the header and index are read on open; each governor's preferences
+    are unpickled from the memory map on first access.
+    """
+    
+    def __init__(self, snapshot_path: Union[str, Path]):
+        """
+        Open a snapshot file.
+        
+        Args:
+            snapshot_path: Path written by build_preference_snapshot
+        
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self._file = open(self.snapshot_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Preference snapshot {self.snapshot_path} is empty")
+        
+        try:
+            magic, version, self.content_hash, count = SNAPSHOT_HEADER.unpack_from(self._map, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported preference snapshot {self.snapshot_path} "
+                                 f"(magic {magic!r}, version {version})")
+            self._index = self._read_index(count)
+        except (struct.error, ValueError):
+            self.close()
+            raise
+        
+        self._decoded: Dict[str, GovernorPreferences] = {}
+    
+    def __contains__(self, governor_id: str) -> bool:
+        return governor_id in self._index
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    @property
+    def governor_ids(self) -> List[str]:
+        """Governor ids held in the snapshot"""
+        return list(self._index)
+    
+    def get(self, governor_id: str,
+            governor_profile: Optional[GovernorProfile] = None) -> Optional[GovernorPreferences]:
+        """
+        Get snapshot preferences for a governor.
+        
+        Args:
+            governor_id: Governor to look up
+            governor_profile: If given, only return preferences built from an identical profile
+        
+        Returns:
+            Preferences if present (and matching), None otherwise
+        """
+        location = self._index.get(governor_id)
+        if location is None:
+            return None
+        
+        fingerprint, offset, length = location
+        if governor_profile is not None and profile_fingerprint(governor_profile) != fingerprint:
+            return None
+        
+        preferences = self._decoded.get(governor_id)
+        if preferences is None:
+            preferences = pickle.loads(self._map[offset:offset + length])
+            self._decoded[governor_id] = preferences
+        return preferences
+    
+    def close(self) -> None:
+        """Release the memory map and file handle"""
+        self._map.close()
+        self._file.close()
+    
+    def _read_index(self, count: int) -> Dict[str, Tuple[bytes, int, int]]:
+        """Parse the governor index following the header"""
+        index = {}
+        position = SNAPSHOT_HEADER.size
+        for _ in range(count):
+            (id_length,) = ID_LENGTH.unpack_from(self._map, position)
+            position += ID_LENGTH.size
+            governor_id = self._map[position:position + id_length].decode("utf-8")
+            position += id_length
+            index[governor_id] = INDEX_ENTRY.unpack_from(self._map, position)
+            position += INDEX_ENTRY.size
+        return index
+
+def main():
+    """Build the preference snapshot from the governor profiles"""
+    parser = argparse.ArgumentParser(description="Build the governor preference snapshot")
+    parser.add_argument("--profiles-dir", default=str(DEFAULT_PROFILES_DIR))
+    parser.add_argument("--output", default=str(DEFAULT_SNAPSHOT_PATH))
+    args = parser.parse_args()
+    
+    summary = build_preference_snapshot(args.output, args.profiles_dir)
+    print(f"✅ Snapshot built: {summary['governors']} governors, "
+          f"{summary['size_bytes']} bytes, hash {summary['content_hash'][:16]}")
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,13 @@ from typing import Dict, List, Any, Optional, Set
 from enum import Enum
 import logging
 
+from .text_features import scanner_for_preferences
+
 logger = logging.getLogger(__name__)
 
+# Numeric GovernorPreferences fields, each in 0.0-1.0
+CORE_PARAMETERS = ('greeting_formality', 'response_patience', 'metaphor_tolerance', 'reputation_sensitivity')
+
 class TonePreference(Enum):
     """Tone preferences that govern response style."""
     SOLEMN_CRYPTIC = "solemn_cryptic"
@@ -91,14 +96,12 @@ class GovernorPreferences:
         return self.behavioral_modifiers.get(modifier_key, default)
     
     def has_trigger_word(self, text: str) -> bool:
-        """Check if text contains any trigger words."""
-        text_lower = text.lower()
-        return any(trigger.lower() in text_lower for trigger in self.trigger_words)
+        """Check if text contains any trigger words (whole words or phrases)."""
+        return scanner_for_preferences(self).scan(text).has('trigger')
     
     def has_forbidden_word(self, text: str) -> bool:
-        """Check if text contains any forbidden words."""
-        text_lower = text.lower()
-        return any(forbidden.lower() in text_lower for forbidden in self.forbidden_words)
+        """Check if text contains any forbidden words (whole words or phrases)."""
+        return scanner_for_preferences(self).scan(text).has('forbidden')
     
     def is_preferred_topic(self, topic: str) -> bool:
         """Check if topic is in preferred topics list."""
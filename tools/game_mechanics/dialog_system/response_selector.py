@@ -8,20 +8,60 @@ variants and applies tone modifications to match governor personalities.
 
 Key Components:
 - ResponseSelector: Main response selection engine
+- VariantFeatures: Cached token scans of a response variant
 - ToneModifier: Applies tone-based modifications to responses
 - ContextAnalyzer: Analyzes interaction context for better selection
 """
 
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 import hashlib
 import re
+import threading
 
 from .preference_structures import GovernorPreferences, TonePreference
 from .core_structures import PlayerState
+from .storage_schemas import DialogLibrarySchema
+from .text_features import (
+    TextFeatureScanner, TextFeatures, DEFAULT_SCANNER, scanner_for_preferences, tokenize_text
+)
 
 logger = logging.getLogger(__name__)
 
+def _shift_baseline(baseline: float, balance: int) -> float:
+    """Move a baseline score by 0.1 per net indicator, clamped to [0.0, 1.0]."""
+    if balance > 0:
+        return min(1.0, baseline + 0.1 * balance)
+    elif balance < 0:
+        return max(0.0, baseline - 0.1 * -balance)
+    return baseline
+
+@dataclass
+class VariantFeatures:
+    """
+    Cached scan results for a response variant.
+    
+    Variants are static library content, so each is tokenized once and
+    scanned once per compiled scanner (governors with the same trigger,
+    forbidden and topic words share a scanner).
+    """
+    tokens: List[str]
+    scans: Dict[TextFeatureScanner, TextFeatures] = field(default_factory=dict)
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'VariantFeatures':
+        """Tokenize variant text."""
+        return cls(tokens=tokenize_text(text))
+    
+    def features(self, scanner: TextFeatureScanner) -> TextFeatures:
+        """Get the variant's features under a scanner, scanning on first use."""
+        features = self.scans.get(scanner)
+        if features is None:
+            features = self.scans[scanner] = scanner.scan_tokens(self.tokens)
+        return features
+
 class ResponseSelector:
     """
     Main response selection engine that chooses appropriate dialog variants
@@ -31,11 +71,21 @@ class ResponseSelector:
     personalities and filtering inappropriate content based on preferences.
     """
     
-    def __init__(self):
-        """Initialize the response selector with tone modification rules."""
+    def __init__(self, max_cached_variants: int = 4096):
+        """
+        Initialize the response selector with tone modification rules.
+        
+        Args:
+            max_cached_variants: Maximum number of variants whose features are cached
+        """
         self.tone_modifiers = self._initialize_tone_modifiers()
         self.forbidden_patterns = self._initialize_forbidden_patterns()
         self.preference_weights = self._initialize_preference_weights()
+        
+        # Variant text -> extracted features, least recently used first
+        self.max_cached_variants = max_cached_variants
+        self._variant_features: OrderedDict[str, VariantFeatures] = OrderedDict()
+        self._features_lock = threading.Lock()
         logger.info("ResponseSelector initialized with tone modification and filtering rules")
     
     def select_response_variant(self, variants: List[str], preferences: GovernorPreferences, 
@@ -94,22 +144,23 @@ class ResponseSelector:
             Filtered list of appropriate responses
         """
         filtered_responses = []
+        scanner = scanner_for_preferences(preferences)
         
         for response in responses:
-            response_lower = response.lower()
+            features = self.get_variant_features(response).features(scanner)
             
             # Check for forbidden words
-            if preferences.has_forbidden_word(response):
+            if features.has('forbidden'):
                 logger.debug(f"Filtered response containing forbidden words: {response[:50]}...")
                 continue
             
             # Check formality level
-            if not self._matches_formality_preference(response, preferences):
+            if not self._matches_formality_preference(features, preferences):
                 logger.debug(f"Filtered response due to formality mismatch: {response[:50]}...")
                 continue
             
             # Check metaphor tolerance
-            if not self._matches_metaphor_preference(response, preferences):
+            if not self._matches_metaphor_preference(features, preferences):
                 logger.debug(f"Filtered response due to metaphor mismatch: {response[:50]}...")
                 continue
             
@@ -118,6 +169,49 @@ class ResponseSelector:
         logger.debug(f"Filtered {len(responses)} responses down to {len(filtered_responses)}")
         return filtered_responses
     
+    def get_variant_features(self, variant: str) -> VariantFeatures:
+        """
+        Get the cached features of a response variant, extracting them on first use.
+        
+        Args:
+            variant: Response variant text
+            
+        Returns:
+            VariantFeatures for the variant
+        """
+        with self._features_lock:
+            features = self._variant_features.get(variant)
+            if features is not None:
+                self._variant_features.move_to_end(variant)
+                return features
+        
+        features = VariantFeatures.from_text(variant)
+        with self._features_lock:
+            self._variant_features[variant] = features
+            while len(self._variant_features) > self.max_cached_variants:
+                self._variant_features.popitem(last=False)
+        return features
+    
+    def precompute_library_features(self, library: DialogLibrarySchema) -> int:
+        """
+        Extract features for every response variant in a dialog library.
+        
+        Call when a library is loaded so selection never scans variant text.
+        
+        Args:
+            library: Loaded dialog library
+            
+        Returns:
+            Number of variants processed
+        """
+        count = 0
+        for variants in library.response_variants.values():
+            for variant in variants:
+                self.get_variant_features(variant)
+                count += 1
+        logger.debug(f"Precomputed features for {count} variants of {library.governor_id}")
+        return count
+    
     def apply_tone_modifications(self, response: str, tone_preference: TonePreference) -> str:
         """
         Apply tone-based modifications to a response.
@@ -274,27 +368,21 @@ class ResponseSelector:
                                      context: Dict[str, Any]) -> Dict[str, float]:
         """Score response variants based on preference alignment."""
         scores = {}
+        weights = self.preference_weights
+        scanner = scanner_for_preferences(preferences)
         
         for variant in variants:
-            score = 0.0
-            
-            # Formality scoring
-            formality_score = self._calculate_formality_score(variant, preferences.greeting_formality)
-            score += formality_score * self.preference_weights['formality_match']
+            features = self.get_variant_features(variant).features(scanner)
             
-            # Metaphor scoring
-            metaphor_score = self._calculate_metaphor_score(variant, preferences.metaphor_tolerance)
-            score += metaphor_score * self.preference_weights['metaphor_alignment']
-            
-            # Trigger word bonus
-            if preferences.has_trigger_word(variant):
-                score += self.preference_weights['trigger_word_bonus']
-            
-            # Topic relevance (if context provides topic info)
-            topic_score = self._calculate_topic_relevance(variant, preferences, context)
-            score += topic_score * self.preference_weights['topic_relevance']
-            
-            scores[variant] = score
+            # Weighted sum of formality, metaphor, trigger word and topic alignment
+            scores[variant] = (
+                _shift_baseline(preferences.greeting_formality, features.balance('formal', 'casual'))
+                * weights['formality_match'] +
+                _shift_baseline(preferences.metaphor_tolerance, features.balance('metaphor', 'literal'))
+                * weights['metaphor_alignment'] +
+                (weights['trigger_word_bonus'] if features.has('trigger') else 0.0) +
+                self._calculate_topic_relevance(features, preferences, context) * weights['topic_relevance']
+            )
         
         return scores
     
@@ -316,17 +404,17 @@ class ResponseSelector:
         
         return best_variants[selected_index]
     
-    def _matches_formality_preference(self, response: str, preferences: GovernorPreferences) -> bool:
+    def _matches_formality_preference(self, features: TextFeatures, preferences: GovernorPreferences) -> bool:
         """Check if response matches governor's formality preference."""
-        response_formality = self._calculate_formality_score(response, 0.5)  # Neutral baseline
+        response_formality = _shift_baseline(0.5, features.balance('formal', 'casual'))  # Neutral baseline
         formality_diff = abs(response_formality - preferences.greeting_formality)
         
         # Allow responses within 0.3 range of preferred formality
         return formality_diff <= 0.3
     
-    def _matches_metaphor_preference(self, response: str, preferences: GovernorPreferences) -> bool:
+    def _matches_metaphor_preference(self, features: TextFeatures, preferences: GovernorPreferences) -> bool:
         """Check if response matches governor's metaphor tolerance."""
-        response_metaphor = self._calculate_metaphor_score(response, 0.5)  # Neutral baseline
+        response_metaphor = _shift_baseline(0.5, features.balance('metaphor', 'literal'))  # Neutral baseline
         metaphor_diff = abs(response_metaphor - preferences.metaphor_tolerance)
         
         # Allow responses within 0.4 range of preferred metaphor level
@@ -334,47 +422,25 @@ class ResponseSelector:
     
     def _calculate_formality_score(self, text: str, baseline: float) -> float:
         """Calculate formality score of text (0.0 = casual, 1.0 = formal)."""
-        formal_indicators = ['please', 'kindly', 'respectfully', 'indeed', 'shall', 'might', 'would']
-        casual_indicators = ['hey', 'yeah', 'ok', 'gonna', 'wanna', 'cool']
-        
-        formal_count = sum(1 for word in formal_indicators if word in text.lower())
-        casual_count = sum(1 for word in casual_indicators if word in text.lower())
-        
-        # Adjust baseline based on indicators
-        if formal_count > casual_count:
-            return min(1.0, baseline + 0.1 * (formal_count - casual_count))
-        elif casual_count > formal_count:
-            return max(0.0, baseline - 0.1 * (casual_count - formal_count))
-        
-        return baseline
+        features = self.get_variant_features(text).features(DEFAULT_SCANNER)
+        return _shift_baseline(baseline, features.balance('formal', 'casual'))
     
     def _calculate_metaphor_score(self, text: str, baseline: float) -> float:
         """Calculate metaphor usage score (0.0 = literal, 1.0 = highly metaphorical)."""
-        metaphor_indicators = ['like', 'as', 'shadow', 'light', 'path', 'journey', 'veil', 'mirror']
-        literal_indicators = ['exactly', 'precisely', 'specifically', 'clearly', 'directly']
-        
-        metaphor_count = sum(1 for word in metaphor_indicators if word in text.lower())
-        literal_count = sum(1 for word in literal_indicators if word in text.lower())
-        
-        if metaphor_count > literal_count:
-            return min(1.0, baseline + 0.1 * (metaphor_count - literal_count))
-        elif literal_count > metaphor_count:
-            return max(0.0, baseline - 0.1 * (literal_count - metaphor_count))
-        
-        return baseline
+        features = self.get_variant_features(text).features(DEFAULT_SCANNER)
+        return _shift_baseline(baseline, features.balance('metaphor', 'literal'))
     
-    def _calculate_topic_relevance(self, text: str, preferences: GovernorPreferences, 
+    def _calculate_topic_relevance(self, features: TextFeatures, preferences: GovernorPreferences, 
                                  context: Dict[str, Any]) -> float:
-        """Calculate how well text aligns with preferred topics."""
+        """Calculate how well a variant aligns with preferred topics."""
         if not preferences.preferred_topics:
             return 0.5  # Neutral score if no preferences
         
-        text_lower = text.lower()
         relevance_score = 0.0
         
         for topic in preferences.preferred_topics:
-            topic_words = topic.lower().replace('_', ' ').split()
-            topic_matches = sum(1 for word in topic_words if word in text_lower)
+            topic_words = tokenize_text(topic)
+            topic_matches = sum(1 for word in topic_words if features.has_term('topic', word))
             if topic_matches > 0:
                 relevance_score += topic_matches / len(topic_words)
         
@@ -8,17 +8,26 @@ similarity for efficient on-chain compatible processing.
 
 Key Components:
 - SimpleEmbedding: Basic word embedding representation
-- SimilarityMatcher: Semantic similarity matching
+- SimilarityMatcher: Semantic similarity matching (batched through similarity_matrix)
 - SemanticClassifier: Intent classification using embeddings
 """
 
 import math
+from array import array
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Any
 import logging
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # Pure-Python fallback keeps the same APIs with nested-loop similarity
+    np = None
+    NUMPY_AVAILABLE = False
+
 from .core_structures import IntentCategory
-from .nlu_engine import MatchResult
+from .nlu_engine import MatchResult, IntentPattern
 
 @dataclass
 class WordEmbedding:
@@ -38,44 +47,87 @@ class SimpleEmbedding:
     Simple word embedding system using pre-computed vectors.
     
     This provides basic semantic similarity without requiring
-    large language models or external APIs.
+    large language models or external APIs. Vectors are stored as contiguous
+    float32 rows (a NumPy matrix when available, otherwise a flat array)
+    with a vocab -> row map, so whole token lists can be compared at once.
     """
     
-    def __init__(self):
-        """Initialize the embedding system."""
+    def __init__(self, vector_size: int = 50, load_basic_vocabulary: bool = True):
+        """
+        Initialize the embedding system.
+        
+        Args:
+            vector_size: Dimension of every vector
+            load_basic_vocabulary: Whether to add the built-in dialog vocabulary (50-dim only)
+        """
         self.logger = logging.getLogger(__name__)
-        self.embeddings: Dict[str, List[float]] = {}
-        self.vector_size = 50  # Small vector size for efficiency
+        self.vector_size = vector_size  # Small vector size for efficiency
+        self.version = 0  # Bumped whenever embeddings change, for downstream caches
+        
+        # Matrix-backed store: vocab -> row index into contiguous float32 rows
+        self.vocab: Dict[str, int] = {}
+        if NUMPY_AVAILABLE:
+            self._matrix = np.zeros((64, vector_size), dtype=np.float32)
+        else:
+            self._matrix = array('f')
         
         # Initialize with basic mystical/dialog vocabulary
-        self._initialize_basic_embeddings()
+        if load_basic_vocabulary and vector_size == 50:
+            self._initialize_basic_embeddings()
+    
+    @classmethod
+    def from_vector_file(cls, path: str, limit: Optional[int] = None) -> 'SimpleEmbedding':
+        """
+        Create an embedding system sized to a pre-trained vector file.
+        
+        Args:
+            path: Local word2vec/GloVe text file (see load_vector_file)
+            limit: Maximum number of vectors to load
+            
+        Returns:
+            SimpleEmbedding holding only the file's vocabulary
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            first_line = f.readline().split()
+        vector_size = int(first_line[1]) if len(first_line) == 2 else len(first_line) - 1
+        
+        embedding = cls(vector_size=vector_size, load_basic_vocabulary=False)
+        embedding.load_vector_file(path, limit=limit)
+        return embedding
+    
+    @property
+    def embeddings(self) -> Dict[str, List[float]]:
+        """Word -> vector view of the store (copies; prefer get_embedding or the batched APIs)"""
+        return {word: self._row_as_list(row) for word, row in self.vocab.items()}
     
     def _initialize_basic_embeddings(self):
         """Initialize basic embeddings for common dialog terms."""
+        embeddings = {}
+        
         # Greeting-related terms (similar vectors)
         greeting_base = [0.8, 0.2, 0.1, 0.0, 0.3] + [0.0] * 45
-        self.embeddings["hello"] = greeting_base
-        self.embeddings["hi"] = [x + 0.1 for x in greeting_base[:5]] + [0.0] * 45
-        self.embeddings["greetings"] = [x + 0.2 for x in greeting_base[:5]] + [0.0] * 45
-        self.embeddings["hail"] = [x + 0.15 for x in greeting_base[:5]] + [0.0] * 45
+        embeddings["hello"] = greeting_base
+        embeddings["hi"] = [x + 0.1 for x in greeting_base[:5]] + [0.0] * 45
+        embeddings["greetings"] = [x + 0.2 for x in greeting_base[:5]] + [0.0] * 45
+        embeddings["hail"] = [x + 0.15 for x in greeting_base[:5]] + [0.0] * 45
         
         # Question-related terms
         question_base = [0.1, 0.8, 0.3, 0.2, 0.1] + [0.0] * 45
-        self.embeddings["what"] = question_base
-        self.embeddings["how"] = [x + 0.1 for x in question_base[:5]] + [0.0] * 45
-        self.embeddings["why"] = [x + 0.15 for x in question_base[:5]] + [0.0] * 45
-        self.embeddings["where"] = [x + 0.12 for x in question_base[:5]] + [0.0] * 45
+        embeddings["what"] = question_base
+        embeddings["how"] = [x + 0.1 for x in question_base[:5]] + [0.0] * 45
+        embeddings["why"] = [x + 0.15 for x in question_base[:5]] + [0.0] * 45
+        embeddings["where"] = [x + 0.12 for x in question_base[:5]] + [0.0] * 45
         
         # Mystical terms
         mystical_base = [0.2, 0.1, 0.8, 0.4, 0.6] + [0.0] * 45
-        self.embeddings["wisdom"] = mystical_base
-        self.embeddings["knowledge"] = [x + 0.1 for x in mystical_base[:5]] + [0.0] * 45
-        self.embeddings["mystery"] = [x + 0.15 for x in mystical_base[:5]] + [0.0] * 45
-        self.embeddings["secret"] = [x + 0.2 for x in mystical_base[:5]] + [0.0] * 45
+        embeddings["wisdom"] = mystical_base
+        embeddings["knowledge"] = [x + 0.1 for x in mystical_base[:5]] + [0.0] * 45
+        embeddings["mystery"] = [x + 0.15 for x in mystical_base[:5]] + [0.0] * 45
+        embeddings["secret"] = [x + 0.2 for x in mystical_base[:5]] + [0.0] * 45
         
         # Normalize all vectors
-        for word in self.embeddings:
-            self.embeddings[word] = self._normalize_vector(self.embeddings[word])
+        for word, vector in embeddings.items():
+            self._set_row(word, self._normalize_vector(vector))
     
     def _normalize_vector(self, vector: List[float]) -> List[float]:
         """Normalize a vector to unit length."""
@@ -86,13 +138,54 @@ class SimpleEmbedding:
     
     def get_embedding(self, word: str) -> Optional[List[float]]:
         """Get embedding for a word."""
-        return self.embeddings.get(word.lower())
+        row = self.vocab.get(word.lower())
+        return None if row is None else self._row_as_list(row)
     
     def add_embedding(self, word: str, vector: List[float]) -> None:
         """Add a new word embedding."""
         if len(vector) != self.vector_size:
             raise ValueError(f"Vector must be of size {self.vector_size}")
-        self.embeddings[word.lower()] = self._normalize_vector(vector)
+        self._set_row(word.lower(), self._normalize_vector([float(x) for x in vector]))
+        self.version += 1
+    
+    def load_vector_file(self, path: str, limit: Optional[int] = None) -> int:
+        """
+        Load pre-trained vectors from a local text file.
+        
+        Accepts GloVe format ("word v1 ... vN" per line) and word2vec text format
+        (the same, preceded by a "count dimension" header line). Vectors are
+        normalized on load; words already present are overwritten.
+        
+        Args:
+            path: Path to the vector file
+            limit: Maximum number of vectors to load
+            
+        Returns:
+            Number of vectors loaded
+            
+        Raises:
+            ValueError: If a vector's dimension differs from vector_size
+        """
+        loaded = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                parts = line.rstrip().split(" ")
+                if line_number == 1 and len(parts) == 2:
+                    continue  # word2vec header
+                if len(parts) < 2:
+                    continue
+                if len(parts) - 1 != self.vector_size:
+                    raise ValueError(f"{path}:{line_number}: expected {self.vector_size} "
+                                     f"dimensions, got {len(parts) - 1}")
+                
+                self._set_row(parts[0].lower(), self._normalize_vector([float(x) for x in parts[1:]]))
+                loaded += 1
+                if limit is not None and loaded >= limit:
+                    break
+        
+        self.version += 1
+        self.logger.info(f"Loaded {loaded} word vectors from {path}")
+        return loaded
     
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors."""
@@ -104,13 +197,105 @@ class SimpleEmbedding:
     
     def word_similarity(self, word1: str, word2: str) -> float:
         """Calculate similarity between two words."""
-        emb1 = self.get_embedding(word1)
-        emb2 = self.get_embedding(word2)
+        row1 = self.vocab.get(word1.lower())
+        row2 = self.vocab.get(word2.lower())
         
-        if emb1 is None or emb2 is None:
+        if row1 is None or row2 is None:
             return 1.0 if word1.lower() == word2.lower() else 0.0
         
-        return self.cosine_similarity(emb1, emb2)
+        if NUMPY_AVAILABLE:
+            dot_product = float(self._matrix[row1] @ self._matrix[row2])
+            return max(0.0, min(1.0, dot_product))
+        return self.cosine_similarity(self._row_as_list(row1), self._row_as_list(row2))
+    
+    def token_rows(self, words: List[str]) -> List[Optional[int]]:
+        """Row index for each word (None for out-of-vocabulary words)"""
+        return [self.vocab.get(word.lower()) for word in words]
+    
+    def stack_vectors(self, words: List[str]) -> Tuple[Any, Any]:
+        """
+        Stack the vectors of a word list into one matrix (requires NumPy).
+        
+        Args:
+            words: Words to stack
+            
+        Returns:
+            (len(words) x vector_size float32 matrix with zero rows for unknown
+            words, boolean mask of words that have embeddings)
+        """
+        rows = self.token_rows(words)
+        known = np.array([row is not None for row in rows], dtype=bool)
+        vectors = np.zeros((len(words), self.vector_size), dtype=np.float32)
+        vectors[known] = self._matrix[[row for row in rows if row is not None]]
+        return vectors, known
+    
+    def similarity_matrix(self, words_a: List[str], words_b: List[str]) -> Any:
+        """
+        Pairwise word_similarity for two word lists, in one matrix product.
+        
+        Out-of-vocabulary pairs score 1.0 for identical words and 0.0 otherwise,
+        as in word_similarity.
+        
+        Args:
+            words_a: Row words
+            words_b: Column words
+            
+        Returns:
+            len(words_a) x len(words_b) float32 ndarray, or nested lists without NumPy
+        """
+        if not NUMPY_AVAILABLE:
+            return [
+                [self._row_similarity(row_a, row_b, word_a, word_b)
+                 for word_b, row_b in zip(words_b, self.token_rows(words_b))]
+                for word_a, row_a in zip(words_a, self.token_rows(words_a))
+            ]
+        
+        vectors_a, known_a = self.stack_vectors(words_a)
+        vectors_b, known_b = self.stack_vectors(words_b)
+        similarities = np.clip(vectors_a @ vectors_b.T, 0.0, 1.0)
+        
+        # Exact-match fallback wherever either word has no embedding
+        unknown_pairs = ~(known_a[:, None] & known_b[None, :])
+        if unknown_pairs.any():
+            lowered_a = np.array([word.lower() for word in words_a], dtype=object)
+            lowered_b = np.array([word.lower() for word in words_b], dtype=object)
+            identical = lowered_a[:, None] == lowered_b[None, :]
+            similarities[unknown_pairs] = identical[unknown_pairs]
+        return similarities
+    
+    def _row_similarity(self, row_a: Optional[int], row_b: Optional[int], word_a: str, word_b: str) -> float:
+        """Similarity of two stored rows (pure-Python path)."""
+        if row_a is None or row_b is None:
+            return 1.0 if word_a.lower() == word_b.lower() else 0.0
+        return self.cosine_similarity(self._row_as_list(row_a), self._row_as_list(row_b))
+    
+    def _set_row(self, word: str, vector: List[float]) -> None:
+        """Store a normalized vector, appending a row for new words."""
+        row = self.vocab.get(word)
+        if row is None:
+            row = len(self.vocab)
+            self.vocab[word] = row
+            if NUMPY_AVAILABLE:
+                if row >= len(self._matrix):
+                    # Grow geometrically so appends stay amortized O(1)
+                    grown = np.zeros((len(self._matrix) * 2, self.vector_size), dtype=np.float32)
+                    grown[:row] = self._matrix[:row]
+                    self._matrix = grown
+            else:
+                self._matrix.extend([0.0] * self.vector_size)
+        
+        if NUMPY_AVAILABLE:
+            self._matrix[row] = vector
+        else:
+            start = row * self.vector_size
+            self._matrix[start:start + self.vector_size] = array('f', vector)
+    
+    def _row_as_list(self, row: int) -> List[float]:
+        """Copy one stored row out as a list."""
+        if NUMPY_AVAILABLE:
+            return self._matrix[row].tolist()
+        start = row * self.vector_size
+        return self._matrix[start:start + self.vector_size].tolist()
 
 class SimilarityMatcher:
     """
@@ -140,24 +325,159 @@ class SimilarityMatcher:
         if not input_tokens or not pattern_tokens:
             return 0.0, []
         
-        matched_tokens = []
-        total_similarity = 0.0
+        # Pattern x input similarities in one batched computation
+        similarities = self.embedding_system.similarity_matrix(pattern_tokens, input_tokens)
         
-        for pattern_token in pattern_tokens:
-            best_similarity = 0.0
-            best_match = None
-            
-            for input_token in input_tokens:
-                similarity = self.embedding_system.word_similarity(input_token, pattern_token)
-                if similarity > best_similarity and similarity >= self.similarity_threshold:
-                    best_similarity = similarity
-                    best_match = input_token
-            
-            if best_match:
-                matched_tokens.append(best_match)
-                total_similarity += best_similarity
+        if NUMPY_AVAILABLE:
+            eligible = np.where(similarities >= self.similarity_threshold, similarities, 0.0)
+            best_inputs = eligible.argmax(axis=1)  # First best input wins ties
+            best_similarities = eligible[np.arange(len(pattern_tokens)), best_inputs]
+            matched = best_similarities > 0.0
+            matched_tokens = [input_tokens[index] for index in best_inputs[matched]]
+            total_similarity = float(best_similarities[matched].sum())
+        else:
+            matched_tokens = []
+            total_similarity = 0.0
+            for row in similarities:
+                best_similarity = 0.0
+                best_match = None
+                for input_token, similarity in zip(input_tokens, row):
+                    if similarity > best_similarity and similarity >= self.similarity_threshold:
+                        best_similarity = similarity
+                        best_match = input_token
+                
+                if best_match:
+                    matched_tokens.append(best_match)
+                    total_similarity += best_similarity
         
         # Average similarity across pattern tokens
         avg_similarity = total_similarity / len(pattern_tokens) if pattern_tokens else 0.0
         
-        return avg_similarity, matched_tokens 
\ No newline at end of file
+        return avg_similarity, matched_tokens
+
+class PatternEmbeddingIndex:
+    """
+    Precomputed embeddings for every intent pattern's tokens.
+    
+    Pattern tokens are stacked into one matrix whose columns run pattern by
+    pattern, so all patterns are scored against one or many inputs with
+    segment sums over contiguous column runs, linear in the number of pattern
+    tokens. Scores equal those from calling
+    SimilarityMatcher.semantic_match_tokens on each pattern's required and
+    optional tokens. Requires NumPy.
+    """
+    
+    def __init__(self, embedding_system: SimpleEmbedding, similarity_threshold: float = 0.6):
+        """Initialize an empty index over an embedding system."""
+        self.embedding_system = embedding_system
+        self.similarity_threshold = similarity_threshold
+        self.patterns: List[IntentPattern] = []
+        self.logger = logging.getLogger(__name__)
+    
+    def build(self, patterns: List[IntentPattern]) -> None:
+        """
+        Precompute the stacked token matrix and weights for a pattern list.
+        
+        Args:
+            patterns: Patterns in registration order (ties resolve to the earliest)
+        """
+        self.patterns = list(patterns)
+        self._word_index: Dict[str, int] = {}
+        column_words: List[int] = []
+        column_patterns: List[int] = []
+        column_required: List[bool] = []
+        
+        for pattern_index, pattern in enumerate(self.patterns):
+            for tokens, is_required in ((pattern.required_tokens, True), (pattern.optional_tokens, False)):
+                for token in tokens:
+                    column_words.append(self._word_index.setdefault(token.lower(), len(self._word_index)))
+                    column_patterns.append(pattern_index)
+                    column_required.append(is_required)
+        
+        self._words = list(self._word_index)
+        self._word_vectors, self._word_known = self.embedding_system.stack_vectors(self._words)
+        self._column_words = np.array(column_words, dtype=np.int64)
+        column_patterns = np.array(column_patterns, dtype=np.int64)
+        column_required = np.array(column_required, dtype=bool)
+        
+        # Columns are already grouped by pattern, so each pattern owns one slice of them
+        self._column_offsets = np.searchsorted(column_patterns, np.arange(len(self.patterns) + 1))
+        self._required_segments = self._segment_layout(column_patterns, column_required)
+        self._optional_segments = self._segment_layout(column_patterns, ~column_required)
+        
+        self._weights = np.array([p.confidence_weight for p in self.patterns], dtype=np.float64)
+        self.logger.debug(f"Indexed {len(self.patterns)} patterns over {len(self._words)} tokens")
+    
+    def score_batch(self, token_lists: List[List[str]]) -> Tuple[Any, Any, Any]:
+        """
+        Score every pattern against every input in one vectorized pass.
+        
+        Args:
+            token_lists: Tokenized inputs
+            
+        Returns:
+            (inputs x patterns required-average similarity,
+             inputs x patterns optional-average similarity,
+             inputs x pattern-words index of the best input token, -1 if none)
+        """
+        batch_size = len(token_lists)
+        max_tokens = max((len(tokens) for tokens in token_lists), default=0)
+        
+        # Unique input words across the batch, plus a trailing all-zero padding row
+        input_words: Dict[str, int] = {}
+        positions = np.full((batch_size, max_tokens), -1, dtype=np.int64)
+        for batch_index, tokens in enumerate(token_lists):
+            for token_index, token in enumerate(tokens):
+                positions[batch_index, token_index] = input_words.setdefault(token.lower(), len(input_words))
+        positions[positions < 0] = len(input_words)
+        
+        input_vectors, input_known = self.embedding_system.stack_vectors(list(input_words))
+        similarities = np.clip(input_vectors @ self._word_vectors.T, 0.0, 1.0)
+        
+        # Exact-match fallback wherever either word has no embedding
+        similarities[~(input_known[:, None] & self._word_known[None, :])] = 0.0
+        for word, input_index in input_words.items():
+            word_index = self._word_index.get(word)
+            if word_index is not None and not (input_known[input_index] and self._word_known[word_index]):
+                similarities[input_index, word_index] = 1.0
+        
+        similarities = np.where(similarities >= self.similarity_threshold, similarities, 0.0)
+        padded = np.vstack([similarities, np.zeros((1, len(self._words)), dtype=similarities.dtype)])
+        
+        per_input = padded[positions]  # inputs x tokens x pattern words
+        best_similarity = per_input.max(axis=1, initial=0.0).astype(np.float64)
+        best_token = np.where(best_similarity > 0.0, per_input.argmax(axis=1) if max_tokens else 0, -1)
+        
+        column_similarity = best_similarity[:, self._column_words]
+        return (self._segment_averages(column_similarity, self._required_segments),
+                self._segment_averages(column_similarity, self._optional_segments),
+                best_token)
+    
+    @staticmethod
+    def _segment_layout(column_patterns: Any, mask: Any) -> Tuple[Any, Any, Any, Any]:
+        """Selected columns with the patterns they belong to, segment starts and token counts."""
+        columns = np.flatnonzero(mask)
+        patterns, starts, counts = np.unique(column_patterns[columns], return_index=True, return_counts=True)
+        return columns, patterns, starts, counts.astype(np.float64)
+    
+    def _segment_averages(self, column_similarity: Any, segments: Tuple[Any, Any, Any, Any]) -> Any:
+        """Average column similarity per pattern over one kind of token (0 for patterns without any)."""
+        columns, patterns, starts, counts = segments
+        averages = np.zeros((column_similarity.shape[0], len(self.patterns)))
+        if len(columns):
+            averages[:, patterns] = np.add.reduceat(column_similarity[:, columns], starts, axis=1) / counts
+        return averages
+    
+    def confidences(self, required_similarity: Any, optional_similarity: Any) -> Any:
+        """Combined semantic confidence (0 where no required token matched)."""
+        combined = (required_similarity * 0.8 + optional_similarity * 0.2) * self._weights * 0.9
+        return np.where(required_similarity > 0.0, combined, 0.0)
+    
+    def matched_tokens(self, pattern_index: int, tokens: List[str], best_token: Any) -> List[str]:
+        """Input tokens matched by a pattern's required then optional tokens."""
+        matched = []
+        for column in range(self._column_offsets[pattern_index], self._column_offsets[pattern_index + 1]):
+            token_index = best_token[self._column_words[column]]
+            if token_index >= 0:
+                matched.append(tokens[token_index])
+        return matched
@@ -10,18 +10,26 @@ Key Components:
 - StateMachine: Core state machine logic
 - TransitionValidator: Validates state transitions
 - StateManager: Manages state persistence and recovery
+- DialogCache: Bounded, memory-accounted LRU of the state machine's dialog libraries
+- TransitionTable: Precompiled (node, intent) -> target dispatch table of a library
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Any, Callable
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable, Tuple
+import json
 import logging
+import threading
 from enum import Enum
 
 from .core_structures import (
     DialogNode, GovernorProfile, PlayerState, DialogResponse,
     IntentCategory, ResponseType, InteractionType
 )
-from .storage_schemas import DialogLibrarySchema, StorageManager
+from .storage_schemas import DialogLibrarySchema, DialogLibraryView, StorageManager
+from .response_selector import ResponseSelector
+
+logger = logging.getLogger(__name__)
 
 class TransitionResult(Enum):
     """Results of attempting a state transition."""
@@ -166,6 +174,362 @@ class TransitionValidator:
         """Check if governor supports the requested interaction type."""
         return governor_profile.supports_interaction_type(interaction_type)
 
+# Compiled requirement check: (requirements_checked key, predicate). The predicate
+# takes (player_state, governor_id) and returns (passed, failure metadata).
+RequirementCheck = Tuple[str, Callable[[PlayerState, str], Tuple[bool, Optional[Dict[str, Any]]]]]
+
+def compile_requirements(requirements: Dict[str, Any]) -> Tuple[RequirementCheck, ...]:
+    """
+    Compile a node's requirements into predicate closures.
+    
+    Checks run in TransitionValidator order: reputation, then each required
+    item, then each required story flag.
+    
+    Args:
+        requirements: Node requirements dictionary
+        
+    Returns:
+        Requirement checks in evaluation order
+    """
+    checks: List[RequirementCheck] = []
+    
+    if "min_reputation" in requirements:
+        min_rep = requirements["min_reputation"]
+        
+        def check_reputation(player_state: PlayerState, governor_id: str):
+            current_rep = player_state.reputation.get(governor_id, 0)
+            if current_rep >= min_rep:
+                return True, None
+            return False, {"required_reputation": min_rep, "current_reputation": current_rep}
+        
+        checks.append(("reputation", check_reputation))
+    
+    for item in requirements.get("required_items", ()):
+        missing = {"missing_item": item}
+        checks.append((f"item_{item}", lambda player_state, governor_id, item=item, missing=missing:
+                       (True, None) if item in player_state.inventory else (False, missing)))
+    
+    for flag in requirements.get("required_flags", ()):
+        missing = {"missing_flag": flag}
+        checks.append((f"flag_{flag}", lambda player_state, governor_id, flag=flag, missing=missing:
+                       (True, None) if flag in player_state.story_flags else (False, missing)))
+    
+    return tuple(checks)
+
+@dataclass
+class CompiledTransition:
+    """Target of one (node, intent) pair with the target's compiled requirements."""
+    target_id: str
+    target_exists: bool
+    checks: Tuple[RequirementCheck, ...] = ()
+    
+    def evaluate(self, from_node_id: str, player_state: PlayerState,
+                 governor_profile: GovernorProfile, intent: IntentCategory) -> TransitionAttempt:
+        """
+        Evaluate the transition (same results as TransitionValidator.validate_transition).
+        
+        Args:
+            from_node_id: Node the transition starts from
+            player_state: Current player state
+            governor_profile: Governor being interacted with
+            intent: Player's classified intent
+            
+        Returns:
+            TransitionAttempt with validation results
+        """
+        if not self.target_exists:
+            return TransitionAttempt(
+                from_node_id=from_node_id,
+                to_node_id=self.target_id,
+                intent=intent,
+                result=TransitionResult.NODE_NOT_FOUND,
+                requirements_checked={},
+                metadata={"error": f"Target node {self.target_id} not found"}
+            )
+        
+        governor_id = governor_profile.governor_id
+        requirements_checked = {}
+        for key, predicate in self.checks:
+            passed, failure = predicate(player_state, governor_id)
+            requirements_checked[key] = passed
+            if not passed:
+                return TransitionAttempt(
+                    from_node_id=from_node_id,
+                    to_node_id=self.target_id,
+                    intent=intent,
+                    result=TransitionResult.REQUIREMENTS_NOT_MET,
+                    requirements_checked=requirements_checked,
+                    metadata=dict(failure)
+                )
+        
+        if not player_state.can_interact_with_governor(governor_id):
+            return TransitionAttempt(
+                from_node_id=from_node_id,
+                to_node_id=self.target_id,
+                intent=intent,
+                result=TransitionResult.RATE_LIMITED,
+                requirements_checked=requirements_checked,
+                metadata={"error": "Interaction rate limited"}
+            )
+        
+        return TransitionAttempt(
+            from_node_id=from_node_id,
+            to_node_id=self.target_id,
+            intent=intent,
+            result=TransitionResult.SUCCESS,
+            requirements_checked=requirements_checked,
+            metadata={}
+        )
+
+class TransitionTable:
+    """
+    Precompiled transition dispatch table of a dialog library.
+    
+    Each node's row maps intents to CompiledTransitions, so evaluating a
+    transition is one dict lookup plus the target's requirement predicates.
+    Rows are compiled on a node's first visit (compile_all compiles every
+    node up front), which keeps lazily decoded libraries lazy. The library
+    is treated as read-only once compiled.
+    """
+    
+    def __init__(self, library: DialogLibrarySchema):
+        """
+        Create the table for a library.
+        
+        Args:
+            library: Dialog library to compile
+        """
+        self.library = library
+        self._rows: Dict[str, Optional[Dict[IntentCategory, CompiledTransition]]] = {}
+        self._requirements: Dict[str, Tuple[RequirementCheck, ...]] = {}
+    
+    def row(self, node_id: str) -> Optional[Dict[IntentCategory, CompiledTransition]]:
+        """
+        Get a node's dispatch row, compiling it on first use.
+        
+        Args:
+            node_id: Node to look up
+            
+        Returns:
+            Intent -> CompiledTransition mapping, or None if the node does not exist
+        """
+        try:
+            return self._rows[node_id]
+        except KeyError:
+            pass
+        
+        node = self.library.get_dialog_node(node_id)
+        row = None
+        if node is not None:
+            row = {IntentCategory(intent): self._compile_transition(target_id)
+                   for intent, target_id in node.transitions.items() if target_id}
+        self._rows[node_id] = row
+        return row
+    
+    def compile_all(self) -> int:
+        """Compile every node's row; returns the number of rows."""
+        for node_id in list(self.library.dialog_nodes):
+            self.row(node_id)
+        return len(self._rows)
+    
+    def _compile_transition(self, target_id: str) -> CompiledTransition:
+        """Compile a transition to a target node (requirements compiled once per target)."""
+        checks = self._requirements.get(target_id)
+        if checks is None:
+            target_node = self.library.get_dialog_node(target_id)
+            if target_node is None:
+                return CompiledTransition(target_id, target_exists=False)
+            checks = self._requirements[target_id] = compile_requirements(target_node.requirements)
+        return CompiledTransition(target_id, target_exists=True, checks=checks)
+
+@dataclass
+class DialogCacheEntry:
+    """Cached library with its approximate resident size and compiled transitions."""
+    library: DialogLibrarySchema
+    size_bytes: int
+    transition_table: Optional[TransitionTable] = field(default=None, repr=False)
+
+class DialogCache:
+    """
+    Bounded LRU of dialog libraries keyed by governor.
+    
+    Entries are accounted by approximate resident bytes: the JSON size of a
+    fully decoded library, or the encoded size plus the nodes decoded so far
+    for a DialogLibraryView. Views grow as nodes are visited, so they are
+    re-measured on every hit, and a view over its governor's quota drops its
+    decoded nodes. Fully decoded libraries larger than the quota are not
+    kept within the budget; the last few are held outside it (with their
+    transition tables), so a rejected governor is not reloaded and
+    re-measured on every message.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, governor_quota_bytes: int = 4 * 1024 * 1024,
+                 max_rejected: int = 4):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_bytes: Budget for all cached libraries
+            governor_quota_bytes: Budget for any single governor's library
+            max_rejected: Number of over-quota libraries held outside the budget
+        """
+        self.max_bytes = max_bytes
+        self.governor_quota_bytes = min(governor_quota_bytes, max_bytes)
+        self.max_rejected = max_rejected
+        self.total_bytes = 0
+        self._entries: 'OrderedDict[str, DialogCacheEntry]' = OrderedDict()
+        self._rejected: 'OrderedDict[str, DialogCacheEntry]' = OrderedDict()  # Not counted in total_bytes
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'quota_trims': 0, 'rejected': 0,
+                      'rejected_hits': 0}
+    
+    def __contains__(self, governor_id: str) -> bool:
+        with self._lock:
+            return governor_id in self._entries
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def get(self, governor_id: str) -> Optional[DialogLibrarySchema]:
+        """
+        Get a governor's cached library, marking it most recently used.
+        
+        Args:
+            governor_id: ID of the governor
+            
+        Returns:
+            Cached library, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(governor_id)
+            if entry is None:
+                rejected = self._rejected.get(governor_id)
+                if rejected is not None:
+                    self._rejected.move_to_end(governor_id)
+                    self.stats['rejected_hits'] += 1
+                    return rejected.library
+                self.stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(governor_id)
+            self.stats['hits'] += 1
+            if isinstance(entry.library, DialogLibraryView):
+                self._resize(entry, self._measure(entry.library))
+                if entry.size_bytes > self.governor_quota_bytes:
+                    entry.library = DialogLibraryView.from_bytes(entry.library.blocks.data)
+                    entry.transition_table = None
+                    self._resize(entry, self._measure(entry.library))
+                    self.stats['quota_trims'] += 1
+                self._evict()
+            return entry.library
+    
+    def put(self, governor_id: str, library: DialogLibrarySchema) -> DialogLibrarySchema:
+        """
+        Cache a governor's library.
+        
+        Views are re-opened over their encoded data first, so the nodes they
+        decode belong to (and are accounted by) this cache alone.
+        
+        Args:
+            governor_id: ID of the governor
+            library: Library to cache
+            
+        Returns:
+            The library callers should use
+        """
+        if isinstance(library, DialogLibraryView):
+            library = DialogLibraryView.from_bytes(library.blocks.data)
+        size_bytes = self._measure(library)
+        
+        with self._lock:
+            self._discard(governor_id)
+            if size_bytes > self.governor_quota_bytes:
+                self.stats['rejected'] += 1
+                logger.debug(f"Dialog library for {governor_id} ({size_bytes} bytes) exceeds its cache quota")
+                if self.max_rejected > 0:
+                    self._rejected[governor_id] = DialogCacheEntry(library, size_bytes)
+                    while len(self._rejected) > self.max_rejected:
+                        self._rejected.popitem(last=False)
+                return library
+            
+            self._entries[governor_id] = DialogCacheEntry(library, size_bytes)
+            self.total_bytes += size_bytes
+            self._evict()
+        return library
+    
+    def transition_table(self, governor_id: str, library: DialogLibrarySchema) -> TransitionTable:
+        """
+        Get the compiled transition table of a governor's library.
+        
+        The table is kept with the cache entry (and dropped with it); a
+        library that is not the cached one gets a fresh, uncached table.
+        
+        Args:
+            governor_id: ID of the governor
+            library: Library returned by get or put
+            
+        Returns:
+            TransitionTable for the library
+        """
+        with self._lock:
+            entry = self._entries.get(governor_id) or self._rejected.get(governor_id)
+            if entry is None or entry.library is not library:
+                return TransitionTable(library)
+            if entry.transition_table is None:
+                entry.transition_table = TransitionTable(library)
+            return entry.transition_table
+    
+    def discard(self, governor_id: str) -> None:
+        """Drop a governor's library from the cache."""
+        with self._lock:
+            self._discard(governor_id)
+    
+    def clear(self) -> None:
+        """Drop every cached library."""
+        with self._lock:
+            self._entries.clear()
+            self._rejected.clear()
+            self.total_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and eviction statistics."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'governor_quota_bytes': self.governor_quota_bytes,
+                'governor_bytes': {governor_id: entry.size_bytes for governor_id, entry in self._entries.items()},
+                'rejected_governors': list(self._rejected),
+                **self.stats
+            }
+    
+    def _measure(self, library: DialogLibrarySchema) -> int:
+        """Approximate resident bytes of a library."""
+        if isinstance(library, DialogLibraryView):
+            return len(library.blocks.data) + library.blocks.decoded_bytes
+        return len(json.dumps(library.to_dict(), separators=(',', ':'), default=str))
+    
+    def _resize(self, entry: DialogCacheEntry, size_bytes: int) -> None:
+        """Update an entry's accounted size."""
+        self.total_bytes += size_bytes - entry.size_bytes
+        entry.size_bytes = size_bytes
+    
+    def _discard(self, governor_id: str) -> None:
+        """Remove an entry, kept or rejected (caller holds the lock)."""
+        self._rejected.pop(governor_id, None)
+        entry = self._entries.pop(governor_id, None)
+        if entry is not None:
+            self.total_bytes -= entry.size_bytes
+    
+    def _evict(self) -> None:
+        """Evict least recently used entries until within budget (caller holds the lock)."""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.size_bytes
+            self.stats['evictions'] += 1
+
 class StateMachine:
     """
     Core state machine for managing dialog flow.
@@ -174,19 +538,23 @@ class StateMachine:
     validates transitions, and maintains state consistency.
     """
     
-    def __init__(self, storage_manager: StorageManager):
+    def __init__(self, storage_manager: StorageManager, dialog_cache: Optional[DialogCache] = None,
+                 response_selector: Optional[ResponseSelector] = None):
         """
         Initialize the state machine.
         
         Args:
             storage_manager: Manager for loading dialog content
+            dialog_cache: Cache for loaded dialog libraries (a default-sized DialogCache if omitted)
+            response_selector: Selector whose variant features are precomputed as libraries load
         """
         self.storage_manager = storage_manager
         self.validator = TransitionValidator()
+        self.response_selector = response_selector
         self.logger = logging.getLogger(__name__)
         
         # Cache for loaded dialog libraries
-        self.dialog_cache: Dict[str, DialogLibrarySchema] = {}
+        self.dialog_cache = dialog_cache if dialog_cache is not None else DialogCache()
     
     def get_dialog_library(self, governor_id: str) -> Optional[DialogLibrarySchema]:
         """
@@ -198,14 +566,21 @@ class StateMachine:
         Returns:
             Dialog library if available
         """
-        if governor_id not in self.dialog_cache:
+        library = self.dialog_cache.get(governor_id)
+        if library is None:
             library = self.storage_manager.load_dialog_library(governor_id)
             if library:
-                self.dialog_cache[governor_id] = library
+                if self.response_selector is not None:
+                    self.response_selector.precompute_library_features(library)
+                library = self.dialog_cache.put(governor_id, library)
             else:
                 return None
         
-        return self.dialog_cache[governor_id]
+        return library
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get dialog cache size, byte accounting and eviction statistics."""
+        return self.dialog_cache.get_stats()
     
     def get_current_node(self, governor_id: str, player_state: PlayerState) -> Optional[DialogNode]:
         """
@@ -246,9 +621,13 @@ class StateMachine:
         Returns:
             TransitionAttempt with results
         """
-        # Get current node
-        current_node = self.get_current_node(governor_id, player_state)
-        if not current_node:
+        # Dispatch through the library's compiled transition table
+        library = self.get_dialog_library(governor_id)
+        row = None
+        if library:
+            current_node_id = player_state.get_current_node(governor_id) or f"{governor_id}_intro"
+            row = self.dialog_cache.transition_table(governor_id, library).row(current_node_id)
+        if row is None:
             return TransitionAttempt(
                 from_node_id="unknown",
                 to_node_id=None,
@@ -258,45 +637,19 @@ class StateMachine:
                 metadata={"error": f"No dialog library found for governor {governor_id}"}
             )
         
-        # Get target node ID from current node's transitions
-        target_node_id = current_node.get_next_node_id(intent)
-        if not target_node_id:
+        transition = row.get(intent)
+        if transition is None:
             return TransitionAttempt(
-                from_node_id=current_node.id,
+                from_node_id=current_node_id,
                 to_node_id=None,
                 intent=intent,
                 result=TransitionResult.INVALID_INTENT,
                 requirements_checked={},
-                metadata={"error": f"No transition defined for intent {intent.value} from node {current_node.id}"}
+                metadata={"error": f"No transition defined for intent {intent.value} from node {current_node_id}"}
             )
         
-        # Get target node - fix linter error with proper null check
-        library = self.get_dialog_library(governor_id)
-        if not library:
-            return TransitionAttempt(
-                from_node_id=current_node.id,
-                to_node_id=target_node_id,
-                intent=intent,
-                result=TransitionResult.NODE_NOT_FOUND,
-                requirements_checked={},
-                metadata={"error": f"Dialog library not found for governor {governor_id}"}
-            )
-        
-        target_node = library.get_dialog_node(target_node_id)
-        if not target_node:
-            return TransitionAttempt(
-                from_node_id=current_node.id,
-                to_node_id=target_node_id,
-                intent=intent,
-                result=TransitionResult.NODE_NOT_FOUND,
-                requirements_checked={},
-                metadata={"error": f"Target node {target_node_id} not found"}
-            )
-        
-        # Validate the transition
-        return self.validator.validate_transition(
-            current_node, target_node, player_state, governor_profile, intent
-        )
+        # Check the target's requirements and the interaction cooldown
+        return transition.evaluate(current_node_id, player_state, governor_profile, intent)
     
     def execute_transition(self,
                           transition_attempt: TransitionAttempt,
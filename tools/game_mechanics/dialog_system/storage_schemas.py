@@ -10,23 +10,61 @@ Key Components:
 - InscriptionReference: Pointers to on-chain dialog data
 - CompressionUtils: Utilities for compacting dialog content
 - StorageManager: Interface for reading/writing dialog data
+- DecodedLibraryCache: Process-wide cache of decoded libraries keyed by content hash
+- DialogLibraryView: Lazily decoded library over the random-access node block layout
+- CompressionDictionary: Preset (zdict) dictionary trained from existing dialog libraries
 """
 
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Union
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple, Union
 import json
 import gzip
 import base64
 import hashlib
+import logging
+import struct
+import threading
+import zlib
 from enum import Enum
 
 from .core_structures import DialogNode, ResponseType, IntentCategory
 
+logger = logging.getLogger(__name__)
+
 class CompressionType(Enum):
     """Types of compression available for dialog content."""
     NONE = "none"
     GZIP = "gzip"
     CUSTOM = "custom"
+    ZDICT = "zdict"  # Deflate with a trained preset dictionary (see CompressionDictionary)
+
+class LibraryLayout(Enum):
+    """On-chain layouts of a dialog library (recorded in reference metadata)."""
+    DOCUMENT = "document"        # One compressed JSON document
+    NODE_BLOCKS = "node_blocks"  # Node offset table plus independently compressed node blocks
+
+# Node block layout (big-endian):
+#     header         magic, format version, compression code, node count,
+#                    header block length, node id block length
+#     header block   governor_id, version, response_variants and metadata as compressed JSON
+#     node ids       UTF-8 node ids separated by NUL bytes
+#     offset table   per node: block offset (from the first block), block length
+#     node blocks    each node's JSON, compressed on its own (GZIP blocks are bare zlib streams)
+LIBRARY_BLOCKS_MAGIC = b"DLBK"
+LIBRARY_BLOCKS_VERSION = 1
+LIBRARY_BLOCKS_HEADER = struct.Struct(">4sHBIII")
+NODE_TABLE_ENTRY = struct.Struct(">II")
+COMPRESSION_CODES = {CompressionType.NONE: 0, CompressionType.GZIP: 1, CompressionType.CUSTOM: 2,
+                     CompressionType.ZDICT: 3}
+
+# ZDICT content: dictionary id, then a raw deflate stream primed with that dictionary
+ZDICT_HEADER = struct.Struct(">I")
+ZDICT_MAX_SIZE = 32 * 1024  # Deflate only reaches back 32 KiB, so larger dictionaries are truncated
+DICTIONARY_SEGMENT_SIZE = 128  # Bytes per dictionary segment picked by CompressionDictionary.train
+DICTIONARY_DMER_SIZE = 8  # Substring length whose frequency scores a segment
 
 class InscriptionType(Enum):
     """Types of inscriptions for different dialog content."""
@@ -163,14 +201,346 @@ class DialogLibrarySchema:
             metadata=data.get("metadata", {})
         )
 
+    def detached_copy(self) -> 'DialogLibrarySchema':
+        """Copy with fresh top-level containers; node and variant data stay shared."""
+        return DialogLibrarySchema(
+            governor_id=self.governor_id,
+            version=self.version,
+            dialog_nodes=dict(self.dialog_nodes),
+            response_variants=dict(self.response_variants),
+            metadata=dict(self.metadata)
+        )
+
+class LibraryBlocks:
+    """
+    Parsed node block encoding of a dialog library.
+    
+    Parsing reads only the header and node table; each node block is
+    decompressed and parsed on first access and then kept.
+    """
+    
+    def __init__(self, data: bytes):
+        """
+        Parse a node block encoding (see CompressionUtils.encode_library_blocks).
+        
+        Args:
+            data: Encoded library bytes
+        
+        Raises:
+            ValueError: If the data is not a supported node block encoding
+        """
+        self.data = data
+        try:
+            (magic, version, code, node_count,
+             header_length, ids_length) = LIBRARY_BLOCKS_HEADER.unpack_from(data, 0)
+            if magic != LIBRARY_BLOCKS_MAGIC or version != LIBRARY_BLOCKS_VERSION:
+                raise ValueError(f"Unsupported library block encoding (magic {magic!r}, version {version})")
+            self.compression = next(compression for compression, compression_code in COMPRESSION_CODES.items()
+                                    if compression_code == code)
+            
+            position = LIBRARY_BLOCKS_HEADER.size
+            header = json.loads(self._read_block(position, header_length))
+            position += header_length
+            
+            node_ids = data[position:position + ids_length].decode('utf-8').split('\0') if node_count else []
+            position += ids_length
+            table = struct.unpack_from(f">{2 * node_count}I", data, position)
+            position += node_count * NODE_TABLE_ENTRY.size
+            if len(node_ids) != node_count:
+                raise ValueError(f"Library node table lists {len(node_ids)} ids for {node_count} nodes")
+            self.offsets: Dict[str, Tuple[int, int]] = dict(zip(node_ids, zip(table[0::2], table[1::2])))
+        except (struct.error, StopIteration) as e:
+            raise ValueError(f"Malformed library block encoding: {e}")
+        
+        self.blocks_start = position
+        self.governor_id: str = header["governor_id"]
+        self.version: str = header["version"]
+        self.response_variants: Dict[str, List[str]] = header.get("response_variants", {})
+        self.metadata: Dict[str, Any] = header.get("metadata", {})
+        
+        self._decoded: Dict[str, Dict[str, Any]] = {}
+        self.decoded_bytes = 0  # JSON size of the decoded nodes
+        self._lock = threading.Lock()
+    
+    def __reduce__(self):
+        # Pickle as the encoded bytes; decoded nodes are rebuilt on demand
+        return (LibraryBlocks, (self.data,))
+    
+    @property
+    def nodes_decoded(self) -> int:
+        """Number of node blocks decoded so far"""
+        return len(self._decoded)
+    
+    def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a node's data, decoding its block on first access.
+        
+        Args:
+            node_id: Node to look up
+        
+        Returns:
+            Node data dictionary, or None if the library has no such node
+        """
+        node_data = self._decoded.get(node_id)
+        if node_data is None:
+            location = self.offsets.get(node_id)
+            if location is None:
+                return None
+            
+            offset, length = location
+            node_json = self._read_block(self.blocks_start + offset, length)
+            node_data = json.loads(node_json)
+            with self._lock:
+                if node_id not in self._decoded:
+                    self.decoded_bytes += len(node_json)
+                node_data = self._decoded.setdefault(node_id, node_data)
+        return node_data
+    
+    def _read_block(self, start: int, length: int) -> str:
+        """Decompress one JSON block."""
+        block = self.data[start:start + length]
+        if len(block) != length:
+            raise ValueError(f"Truncated library block at offset {start}")
+        return CompressionUtils.decompress_block(block, self.compression)
+
+class LazyDialogNodes(MutableMapping):
+    """
+    dialog_nodes mapping of a DialogLibraryView.
+    
+    Encoded nodes are decoded on first access; nodes set or deleted through
+    the mapping are tracked locally and never touch the shared blocks.
+    """
+    
+    def __init__(self, blocks: LibraryBlocks):
+        self.blocks = blocks
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._removed: Set[str] = set()
+    
+    def __getitem__(self, node_id: str) -> Dict[str, Any]:
+        node_data = self._local.get(node_id)
+        if node_data is None and node_id not in self._removed:
+            node_data = self.blocks.get_node(node_id)
+        if node_data is None:
+            raise KeyError(node_id)
+        return node_data
+    
+    def __setitem__(self, node_id: str, node_data: Dict[str, Any]) -> None:
+        self._local[node_id] = node_data
+        self._removed.discard(node_id)
+    
+    def __delitem__(self, node_id: str) -> None:
+        if node_id not in self:
+            raise KeyError(node_id)
+        self._local.pop(node_id, None)
+        self._removed.add(node_id)
+    
+    def __contains__(self, node_id: object) -> bool:
+        if node_id in self._local:
+            return True
+        return node_id not in self._removed and node_id in self.blocks.offsets
+    
+    def __iter__(self):
+        for node_id in self.blocks.offsets:
+            if node_id not in self._removed and node_id not in self._local:
+                yield node_id
+        yield from self._local
+    
+    def __len__(self) -> int:
+        encoded = sum(1 for node_id in self.blocks.offsets
+                      if node_id not in self._removed and node_id not in self._local)
+        return encoded + len(self._local)
+
+class DialogLibraryView(DialogLibrarySchema):
+    """
+    Dialog library over the random-access node block layout.
+    
+    Keeps the DialogLibrarySchema API, but dialog_nodes decodes each node on
+    first access, so memory and load time scale with the nodes a session
+    visits rather than the library size. Nodes added to a view stay local
+    to that view.
+    """
+    
+    def __init__(self, blocks: LibraryBlocks):
+        """
+        Create a view over parsed node blocks.
+        
+        Args:
+            blocks: Parsed encoding (shared, with its decoded nodes, by detached copies)
+        """
+        super().__init__(
+            governor_id=blocks.governor_id,
+            version=blocks.version,
+            dialog_nodes=LazyDialogNodes(blocks),
+            response_variants=dict(blocks.response_variants),
+            metadata=dict(blocks.metadata)
+        )
+        self.blocks = blocks
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'DialogLibraryView':
+        """Create a view from node block encoded bytes (see CompressionUtils.encode_library_blocks)."""
+        return cls(LibraryBlocks(data))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization (decodes every node)."""
+        data = super().to_dict()
+        data["dialog_nodes"] = dict(self.dialog_nodes)
+        return data
+    
+    def detached_copy(self) -> 'DialogLibraryView':
+        """New view over the same blocks with fresh top-level containers."""
+        return DialogLibraryView(self.blocks)
+
+@dataclass
+class CompressionDictionary:
+    """
+    Preset dictionary for CompressionType.ZDICT.
+    
+    Dialog libraries share most of their structure (keys, intents, node id
+    patterns, stock phrases), so deflate primed with a dictionary of that
+    shared content compresses even small documents and single node blocks
+    well. The id is derived from the dictionary bytes and is written in front
+    of every ZDICT payload.
+    """
+    data: bytes = field(repr=False)
+    dictionary_id: int = field(init=False)
+    
+    def __post_init__(self):
+        """Derive the dictionary id and prime the (de)compressors copied per call."""
+        if len(self.data) > ZDICT_MAX_SIZE:
+            self.data = self.data[-ZDICT_MAX_SIZE:]
+        self.dictionary_id = ZDICT_HEADER.unpack(hashlib.sha256(self.data).digest()[:ZDICT_HEADER.size])[0]
+        self._compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS, 9, zdict=self.data)
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS, zdict=self.data)
+    
+    def __reduce__(self):
+        # zlib objects do not pickle; they are primed again from the data
+        return (CompressionDictionary, (self.data,))
+    
+    @classmethod
+    def train(cls, samples: Iterable[Union[str, bytes]], max_size: int = ZDICT_MAX_SIZE) -> 'CompressionDictionary':
+        """
+        Train a dictionary from sample documents.
+        
+        A simplified COVER selection: the concatenated samples are split into
+        one epoch per dictionary segment, and each epoch contributes the
+        segment whose substrings occur in the most samples (substrings already
+        covered by earlier segments no longer count). Segments are ordered
+        most valuable last, where deflate reaches them with the shortest
+        distances.
+        
+        Args:
+            samples: Documents to learn from, such as serialized dialog libraries
+            max_size: Dictionary size limit in bytes
+        
+        Returns:
+            Trained CompressionDictionary
+        """
+        segment_size, dmer_size = DICTIONARY_SEGMENT_SIZE, DICTIONARY_DMER_SIZE
+        contents = [sample.encode('utf-8') if isinstance(sample, str) else sample for sample in samples]
+        
+        # Number of samples containing each d-mer
+        sample_counts: Counter = Counter()
+        for content in contents:
+            sample_counts.update({content[i:i + dmer_size] for i in range(len(content) - dmer_size + 1)})
+        
+        corpus = b"".join(contents)
+        epoch_size = max(len(corpus) // max(max_size // segment_size, 1), segment_size)
+        scored: List[Tuple[int, bytes]] = []
+        for epoch_start in range(0, max(len(corpus) - segment_size + 1, 0), epoch_size):
+            epoch = corpus[epoch_start:epoch_start + epoch_size + segment_size - 1]
+            
+            # Window score = sum of the scores of the d-mers starting inside it
+            window_dmers = segment_size - dmer_size + 1
+            prefix = [0]
+            for i in range(len(epoch) - dmer_size + 1):
+                prefix.append(prefix[-1] + sample_counts[epoch[i:i + dmer_size]])
+            start = max(range(len(prefix) - window_dmers), key=lambda i: prefix[i + window_dmers] - prefix[i])
+            score = prefix[start + window_dmers] - prefix[start]
+            segment = epoch[start:start + segment_size]
+            
+            for i in range(len(segment) - dmer_size + 1):
+                sample_counts[segment[i:i + dmer_size]] = 0
+            scored.append((score, segment))
+        
+        scored.sort(key=lambda entry: entry[0])
+        dictionary = cls(b"".join(segment for _, segment in scored)[-max_size:])
+        logger.info(f"Trained {len(dictionary.data)} byte compression dictionary {dictionary.dictionary_id:08x} "
+                    f"from {len(contents)} samples")
+        return dictionary
+    
+    @classmethod
+    def train_from_libraries(cls, libraries: Iterable[DialogLibrarySchema],
+                             max_size: int = ZDICT_MAX_SIZE) -> 'CompressionDictionary':
+        """
+        Train a dictionary from dialog libraries.
+        
+        Each library contributes its serialized document and every node's
+        JSON, so the dictionary serves both library layouts.
+        
+        Args:
+            libraries: Existing dialog libraries
+            max_size: Dictionary size limit in bytes
+        
+        Returns:
+            Trained CompressionDictionary
+        """
+        def samples():
+            for library in libraries:
+                yield json.dumps(library.to_dict(), separators=(',', ':'), sort_keys=True)
+                for node_data in library.dialog_nodes.values():
+                    yield json.dumps(node_data, separators=(',', ':'), sort_keys=True)
+        
+        return cls.train(samples(), max_size)
+    
+    def compress(self, content_bytes: bytes) -> bytes:
+        """Compress in one pass (raw deflate primed with the dictionary)."""
+        compressor = self._compressor.copy()
+        return compressor.compress(content_bytes) + compressor.flush()
+    
+    def decompress(self, compressed_data: bytes) -> bytes:
+        """Decompress a stream written by compress."""
+        decompressor = self._decompressor.copy()
+        content_bytes = decompressor.decompress(compressed_data) + decompressor.flush()
+        if not decompressor.eof:
+            raise ValueError("Truncated ZDICT compressed data")
+        return content_bytes
+
 class CompressionUtils:
     """
     Utilities for compressing and decompressing dialog content.
     
     Optimized for Bitcoin inscription storage with minimal size overhead
     while maintaining deterministic compression for consensus.
+    
+    CompressionType.ZDICT needs the payload's dictionary to be registered
+    (register_dictionary) in every process that reads or writes it.
     """
     
+    _dictionaries: Dict[int, CompressionDictionary] = {}
+    _default_dictionary: Optional[CompressionDictionary] = None
+    
+    @staticmethod
+    def register_dictionary(dictionary: CompressionDictionary, default: bool = True) -> None:
+        """
+        Register a preset dictionary for CompressionType.ZDICT.
+        
+        Args:
+            dictionary: Dictionary to register
+            default: Use it when compressing new ZDICT content
+        """
+        CompressionUtils._dictionaries[dictionary.dictionary_id] = dictionary
+        if default:
+            CompressionUtils._default_dictionary = dictionary
+    
+    @staticmethod
+    def get_dictionary(dictionary_id: int) -> CompressionDictionary:
+        """Get a registered dictionary by id (ValueError if unknown)."""
+        dictionary = CompressionUtils._dictionaries.get(dictionary_id)
+        if dictionary is None:
+            raise ValueError(f"Unknown compression dictionary {dictionary_id:08x}")
+        return dictionary
+    
     @staticmethod
     def compress_content(content: str, compression_type: CompressionType = CompressionType.GZIP) -> bytes:
         """
@@ -192,6 +562,11 @@ class CompressionUtils:
         elif compression_type == CompressionType.CUSTOM:
             # Dialog-specific compression using pattern dictionary
             return CompressionUtils._compress_dialog_patterns(content_bytes)
+        elif compression_type == CompressionType.ZDICT:
+            dictionary = CompressionUtils._default_dictionary
+            if dictionary is None:
+                raise ValueError("ZDICT compression requires a registered compression dictionary")
+            return ZDICT_HEADER.pack(dictionary.dictionary_id) + dictionary.compress(content_bytes)
         else:
             raise ValueError(f"Unsupported compression type: {compression_type}")
     
@@ -215,6 +590,12 @@ class CompressionUtils:
         elif compression_type == CompressionType.CUSTOM:
             # Dialog-specific decompression using pattern dictionary
             return CompressionUtils._decompress_dialog_patterns(compressed_data)
+        elif compression_type == CompressionType.ZDICT:
+            if len(compressed_data) < ZDICT_HEADER.size:
+                raise ValueError("Truncated ZDICT compressed data")
+            (dictionary_id,) = ZDICT_HEADER.unpack_from(compressed_data, 0)
+            dictionary = CompressionUtils.get_dictionary(dictionary_id)
+            return dictionary.decompress(compressed_data[ZDICT_HEADER.size:]).decode('utf-8')
         else:
             raise ValueError(f"Unsupported compression type: {compression_type}")
     
@@ -246,9 +627,93 @@ class CompressionUtils:
         Returns:
             Decoded dictionary data
         """
+        return CompressionUtils.decode_with_size(encoded_data, compression_type)[0]
+    
+    @staticmethod
+    def decode_with_size(encoded_data: str,
+                         compression_type: CompressionType = CompressionType.GZIP) -> Tuple[Dict[str, Any], int]:
+        """
+        Decode inscription data, also returning the decompressed JSON length.
+        
+        The JSON length is the size estimate used by DecodedLibraryCache.
+        
+        Args:
+            encoded_data: Base64-encoded inscription data
+            compression_type: Compression type used
+            
+        Returns:
+            Tuple of (decoded dictionary data, JSON length in characters)
+        """
         compressed_data = base64.b64decode(encoded_data.encode('ascii'))
         json_str = CompressionUtils.decompress_content(compressed_data, compression_type)
-        return json.loads(json_str)
+        return json.loads(json_str), len(json_str)
+    
+    @staticmethod
+    def encode_library_blocks(library: DialogLibrarySchema,
+                              compression_type: CompressionType = CompressionType.GZIP) -> bytes:
+        """
+        Encode a library in the random-access node block layout.
+        
+        Args:
+            library: Dialog library to encode
+            compression_type: Compression applied to the header and each node block
+            
+        Returns:
+            Encoded bytes, readable with DialogLibraryView.from_bytes
+        """
+        if any('\0' in node_id for node_id in library.dialog_nodes):
+            raise ValueError("Node ids must not contain NUL characters")
+        
+        def compress(data: Any) -> bytes:
+            return CompressionUtils.compress_block(
+                json.dumps(data, separators=(',', ':'), sort_keys=True), compression_type
+            )
+        
+        header_block = compress({
+            "governor_id": library.governor_id,
+            "version": library.version,
+            "response_variants": library.response_variants,
+            "metadata": library.metadata
+        })
+        
+        table = bytearray()
+        blocks = bytearray()
+        for node_data in library.dialog_nodes.values():
+            block = compress(node_data)
+            table += NODE_TABLE_ENTRY.pack(len(blocks), len(block))
+            blocks += block
+        node_ids = '\0'.join(library.dialog_nodes).encode('utf-8')
+        
+        header = LIBRARY_BLOCKS_HEADER.pack(LIBRARY_BLOCKS_MAGIC, LIBRARY_BLOCKS_VERSION,
+                                            COMPRESSION_CODES[compression_type], len(library.dialog_nodes),
+                                            len(header_block), len(node_ids))
+        return header + header_block + node_ids + bytes(table) + bytes(blocks)
+    
+    @staticmethod
+    def compress_block(content: str, compression_type: CompressionType = CompressionType.GZIP) -> bytes:
+        """
+        Compress one block of the node block layout.
+        
+        Like compress_content, but GZIP blocks are bare zlib streams: the gzip
+        header and trailer would dominate blocks holding a single node.
+        
+        Args:
+            content: Block content (JSON)
+            compression_type: Type of compression to use
+            
+        Returns:
+            Compressed block
+        """
+        if compression_type == CompressionType.GZIP:
+            return zlib.compress(content.encode('utf-8'), 9)
+        return CompressionUtils.compress_content(content, compression_type)
+    
+    @staticmethod
+    def decompress_block(block: bytes, compression_type: CompressionType = CompressionType.GZIP) -> str:
+        """Decompress one block written by compress_block."""
+        if compression_type == CompressionType.GZIP:
+            return zlib.decompress(block).decode('utf-8')
+        return CompressionUtils.decompress_content(block, compression_type)
     
     @staticmethod
     def _compress_dialog_patterns(content_bytes: bytes) -> bytes:
@@ -385,6 +850,199 @@ class CompressionUtils:
         
         return decompressed.decode('utf-8')
 
+class DecodedLibraryCache:
+    """
+    Process-wide cache of decoded dialog libraries keyed by content hash.
+    
+    Inscriptions are immutable, so once a library's content hash has been
+    verified and its content decoded it never needs to be fetched, verified or
+    decoded again. Libraries are kept in LRU order within a memory budget
+    (measured as decoded JSON size), and an optional directory keeps decoded
+    libraries across process restarts.
+    
+    Callers get their own library with fresh top-level dictionaries (see
+    DialogLibrarySchema.detached_copy); the node and variant data inside is
+    shared and must be treated as read-only. A DialogLibraryView is accounted
+    by its encoded size plus the nodes decoded so far, re-measured on every hit.
+    
+    Disk entries are data only (a JSON header, then node block bytes or library
+    JSON) and carry a SHA-256 digest of the payload that is checked on load;
+    node block payloads are also re-checked against the inscription hash. A
+    library JSON payload can only be checked against its own digest, so
+    disk_dir must be private to the process owner (it is created mode 0700).
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 disk_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the decoded library cache.
+        
+        Args:
+            max_bytes: Memory budget for held libraries (decoded JSON size)
+            disk_dir: Optional private directory for decoded libraries shared across restarts
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.total_bytes = 0
+        
+        # content hash -> (library, size in bytes), least recently used first
+        self._entries: OrderedDict[str, Tuple[DialogLibrarySchema, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def __contains__(self, content_hash: str) -> bool:
+        with self._lock:
+            return content_hash in self._entries
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def get(self, content_hash: str) -> Optional[DialogLibrarySchema]:
+        """
+        Get the decoded library for a content hash from memory or disk.
+        
+        Args:
+            content_hash: Verified content hash of the inscription
+            
+        Returns:
+            Library detached from the cache, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                self._entries.move_to_end(content_hash)
+                self.stats['hits'] += 1
+                library, size_bytes = entry
+                if isinstance(library, DialogLibraryView):
+                    # Nodes decoded through shared views since the last hit count against the budget
+                    resident_bytes = len(library.blocks.data) + library.blocks.decoded_bytes
+                    if resident_bytes != size_bytes:
+                        self._insert(content_hash, library, resident_bytes)
+                return library.detached_copy()
+        
+        entry = self._read_disk(content_hash)
+        with self._lock:
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+            self._insert(content_hash, *entry)
+        return entry[0].detached_copy()
+    
+    def put(self, content_hash: str, library: DialogLibrarySchema, size_bytes: int) -> DialogLibrarySchema:
+        """
+        Cache a verified, decoded library.
+        
+        Args:
+            content_hash: Verified content hash of the inscription
+            library: Decoded library (owned by the cache afterwards)
+            size_bytes: Decoded size estimate (see CompressionUtils.decode_with_size)
+            
+        Returns:
+            Library detached from the cache, for the caller
+        """
+        with self._lock:
+            self._insert(content_hash, library, size_bytes)
+        self._write_disk(content_hash, library, size_bytes)
+        return library.detached_copy()
+    
+    def clear(self, include_disk: bool = False) -> None:
+        """
+        Drop every held library.
+        
+        Args:
+            include_disk: Also delete the on-disk decoded libraries
+        """
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+        if include_disk and self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.library"):
+                path.unlink(missing_ok=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss and eviction counts plus current size."""
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), total_bytes=self.total_bytes,
+                        max_bytes=self.max_bytes)
+    
+    def _insert(self, content_hash: str, library: DialogLibrarySchema, size_bytes: int) -> None:
+        """Insert an entry and evict least recently used libraries over the budget (lock held)."""
+        previous = self._entries.pop(content_hash, None)
+        if previous is not None:
+            self.total_bytes -= previous[1]
+        self._entries[content_hash] = (library, size_bytes)
+        self.total_bytes += size_bytes
+        
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+            self.stats['evictions'] += 1
+    
+    def _disk_path(self, content_hash: str) -> Path:
+        """On-disk location for a content hash (hashed again to keep file names safe)."""
+        return self.disk_dir / f"{hashlib.sha256(content_hash.encode('utf-8')).hexdigest()}.library"
+    
+    def _read_disk(self, content_hash: str) -> Optional[Tuple[DialogLibrarySchema, int]]:
+        """Load and verify a decoded library written by an earlier process, if present."""
+        if self.disk_dir is None:
+            return None
+        
+        path = self._disk_path(content_hash)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                payload = f.read()
+            if header.get("content_hash") != content_hash:
+                return None
+            if hashlib.sha256(payload).hexdigest() != header.get("digest"):
+                raise ValueError("payload digest mismatch")
+            
+            if header.get("format") == LibraryLayout.NODE_BLOCKS.value:
+                if hashlib.sha256(base64.b64encode(payload)).hexdigest() != content_hash:
+                    raise ValueError("node blocks do not match the inscription hash")
+                library = DialogLibraryView.from_bytes(payload)
+            else:
+                library = DialogLibrarySchema.from_dict(json.loads(payload))
+            return library, int(header["size_bytes"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable decoded library {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        
+    def _write_disk(self, content_hash: str, library: DialogLibrarySchema, size_bytes: int) -> None:
+        """Atomically write a decoded library for later processes."""
+        if self.disk_dir is None:
+            return
+        
+        if isinstance(library, DialogLibraryView):
+            # Views are stored as their encoded blocks, so a restart decodes nothing up front
+            layout, payload = LibraryLayout.NODE_BLOCKS, library.blocks.data
+        else:
+            layout = LibraryLayout.DOCUMENT
+            payload = json.dumps(library.to_dict(), separators=(',', ':'), default=str).encode('utf-8')
+        header = {"content_hash": content_hash, "format": layout.value, "size_bytes": size_bytes,
+                  "digest": hashlib.sha256(payload).hexdigest()}
+        
+        path = self._disk_path(content_hash)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b"\n")
+                f.write(payload)
+            temp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write decoded library {path.name}: {e}")
+            temp_path.unlink(missing_ok=True)
+
+# Shared by every StorageManager that is not given its own cache
+DEFAULT_DECODED_LIBRARY_CACHE = DecodedLibraryCache()
+
 class StorageManager:
     """
     Manager for reading and writing dialog content to/from on-chain storage.
@@ -393,24 +1051,37 @@ class StorageManager:
     Bitcoin ordinal inscriptions without handling low-level details.
     """
     
-    def __init__(self):
-        """Initialize storage manager."""
+    def __init__(self, decoded_cache: Optional[DecodedLibraryCache] = None):
+        """
+        Initialize storage manager.
+        
+        Args:
+            decoded_cache: Decoded library cache (defaults to the process-wide cache)
+        """
         self.inscription_cache: Dict[str, Any] = {}
         self.reference_index: Dict[str, InscriptionReference] = {}
+        self.decoded_cache = decoded_cache if decoded_cache is not None else DEFAULT_DECODED_LIBRARY_CACHE
     
-    def store_dialog_library(self, library: DialogLibrarySchema, compression_type: CompressionType = CompressionType.GZIP) -> InscriptionReference:
+    def store_dialog_library(self, library: DialogLibrarySchema, compression_type: CompressionType = CompressionType.GZIP,
+                             layout: LibraryLayout = LibraryLayout.DOCUMENT) -> InscriptionReference:
         """
         Store a dialog library as an ordinal inscription.
         
         Args:
             library: Dialog library to store
             compression_type: Compression to use
+            layout: DOCUMENT, or NODE_BLOCKS to load as a lazily decoded DialogLibraryView
             
         Returns:
             Reference to the stored inscription
         """
         # Encode library for inscription
-        encoded_data = CompressionUtils.encode_for_inscription(library.to_dict(), compression_type)
+        if layout == LibraryLayout.NODE_BLOCKS:
+            encoded_data = base64.b64encode(
+                CompressionUtils.encode_library_blocks(library, compression_type)
+            ).decode('ascii')
+        else:
+            encoded_data = CompressionUtils.encode_for_inscription(library.to_dict(), compression_type)
         
         # Calculate content hash
         content_hash = hashlib.sha256(encoded_data.encode()).hexdigest()
@@ -427,7 +1098,7 @@ class StorageManager:
             content_hash=content_hash,
             compression=compression_type,
             size_bytes=len(encoded_data),
-            metadata={"version": library.version}
+            metadata={"version": library.version, "layout": layout.value}
         )
         
         # Cache the data (in real implementation, this would be on-chain)
@@ -451,6 +1122,11 @@ class StorageManager:
         if not reference:
             return None
         
+        # Content already verified and decoded (possibly by another manager or process)
+        library = self.decoded_cache.get(reference.content_hash)
+        if library is not None:
+            return library
+        
         # Load from cache (in real implementation, would fetch from Bitcoin)
         encoded_data = self.inscription_cache.get(reference.inscription_id)
         if not encoded_data:
@@ -460,9 +1136,14 @@ class StorageManager:
         if not reference.verify_content_hash(encoded_data.encode()):
             raise ValueError(f"Content hash mismatch for inscription {reference.inscription_id}")
         
-        # Decode and return
-        library_data = CompressionUtils.decode_from_inscription(encoded_data, reference.compression)
-        return DialogLibrarySchema.from_dict(library_data)
+        # Decode (only the node table for the node block layout), remember and return
+        if reference.metadata.get("layout") == LibraryLayout.NODE_BLOCKS.value:
+            block_data = base64.b64decode(encoded_data.encode('ascii'))
+            library, size_bytes = DialogLibraryView.from_bytes(block_data), len(block_data)
+        else:
+            library_data, size_bytes = CompressionUtils.decode_with_size(encoded_data, reference.compression)
+            library = DialogLibrarySchema.from_dict(library_data)
+        return self.decoded_cache.put(reference.content_hash, library, size_bytes)
     
     def get_inscription_reference(self, governor_id: str, content_type: InscriptionType) -> Optional[InscriptionReference]:
         """Get inscription reference for specific governor and content type."""
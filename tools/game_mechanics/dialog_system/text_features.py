@@ -0,0 +1,182 @@
+"""
+Text Feature Scanner for Governor Dialog System
+===============================================
+
+This module implements the shared, token-based scanner used to detect indicator
+words in dialog text. Response selection, behavioral filtering and preference
+word checks all read their counts from a single pass over the text's tokens.
+
+Matching is by whole tokens (and token sequences for phrases such as
+"may i"), so "as" no longer matches inside "mask".
+
+Key Components:
+- TEXT_INDICATORS: Indicator word lists shared by all dialog components
+- TextFeatureScanner: Compiled multi-category word and phrase scanner
+- TextFeatures: Per-category matches produced by one scan
+- scanner_for_preferences: Cached scanner including a governor's own words
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Iterable, Set, Tuple, TYPE_CHECKING
+import logging
+import re
+
+if TYPE_CHECKING:
+    from .preference_structures import GovernorPreferences
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Category -> indicator words or phrases
+TEXT_INDICATORS: Dict[str, Tuple[str, ...]] = {
+    # Response variant style (ResponseSelector)
+    'formal': ('please', 'kindly', 'respectfully', 'indeed', 'shall', 'might', 'would'),
+    'casual': ('hey', 'yeah', 'ok', 'gonna', 'wanna', 'cool'),
+    'metaphor': ('like', 'as', 'shadow', 'light', 'path', 'journey', 'veil', 'mirror'),
+    'literal': ('exactly', 'precisely', 'specifically', 'clearly', 'directly'),
+    
+    # Player input constraints (BehavioralFilter)
+    'input_formal': ('please', 'respectfully', 'kindly', 'may i', 'would you'),
+    'input_casual': ('hey', 'yo', 'sup', 'whatever'),
+    'haste': ('hurry', 'quick', 'fast', 'now', 'immediately'),
+    
+    # Content filters (BehavioralFilter)
+    'profanity': ('damn', 'hell', 'crap'),
+    'modern_references': ('internet', 'computer', 'phone', 'email'),
+    'casual_speech': ('yeah', 'ok', 'cool', 'awesome'),
+    'disrespectful': ('stupid', 'dumb', 'idiot', 'moron'),
+    
+    # Tone and metaphor rewrites (BehavioralFilter)
+    'mystical_enhancement': ('truth',),
+    'scholarly_softening': ('wrong',),
+    'literalizable_metaphors': ('shadow of doubt', 'light of understanding', 'path of wisdom'),
+}
+
+def tokenize_text(text: str) -> List[str]:
+    """Split text into lowercase word tokens (underscores separate words)."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def normalize_term(term: str) -> str:
+    """Normalize an indicator word or phrase to its matched form."""
+    return " ".join(tokenize_text(term))
+
+@dataclass
+class TextFeatures:
+    """Indicator terms found in a text, grouped by category."""
+    matches: Dict[str, Set[str]] = field(default_factory=dict)
+    
+    def count(self, category: str) -> int:
+        """Number of distinct terms of a category present in the text."""
+        return len(self.matches.get(category, ()))
+    
+    def has(self, category: str) -> bool:
+        """Check whether any term of a category is present."""
+        return category in self.matches
+    
+    def has_term(self, category: str, term: str) -> bool:
+        """Check whether a specific term of a category is present."""
+        return normalize_term(term) in self.matches.get(category, ())
+    
+    def balance(self, positive: str, negative: str) -> int:
+        """Distinct positive terms minus distinct negative terms."""
+        return self.count(positive) - self.count(negative)
+
+class TextFeatureScanner:
+    """
+    Compiled scanner that finds the terms of every category in one pass.
+    
+    Terms are indexed by their first token; multi-word phrases are confirmed
+    against the following tokens, so each token costs one dict lookup.
+    """
+    
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        Compile a scanner.
+        
+        Args:
+            categories: Category name -> words or phrases to detect
+        """
+        self.categories = tuple(categories)
+        self._term_categories: Dict[str, Tuple[str, ...]] = {}
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}  # first token -> (tokens, term)
+        
+        for category, terms in categories.items():
+            for term in terms:
+                phrase = tuple(tokenize_text(term))
+                if not phrase:
+                    continue
+                
+                normalized = " ".join(phrase)
+                term_categories = self._term_categories.get(normalized)
+                if term_categories is None:
+                    self._phrases.setdefault(phrase[0], []).append((phrase, normalized))
+                    self._term_categories[normalized] = (category,)
+                elif category not in term_categories:
+                    self._term_categories[normalized] = term_categories + (category,)
+    
+    def scan(self, text: str) -> TextFeatures:
+        """
+        Scan text for the terms of every category.
+        
+        Args:
+            text: Text to scan
+        
+        Returns:
+            TextFeatures with the matched terms per category
+        """
+        return self.scan_tokens(tokenize_text(text))
+    
+    def scan_tokens(self, tokens: List[str]) -> TextFeatures:
+        """Scan already tokenized text (see tokenize_text)."""
+        matches: Dict[str, Set[str]] = {}
+        phrases = self._phrases
+        
+        for position, token in enumerate(tokens):
+            candidates = phrases.get(token)
+            if not candidates:
+                continue
+            
+            for phrase, term in candidates:
+                if len(phrase) > 1 and tuple(tokens[position:position + len(phrase)]) != phrase:
+                    continue
+                for category in self._term_categories[term]:
+                    found = matches.get(category)
+                    if found is None:
+                        found = matches[category] = set()
+                    found.add(term)
+        
+        return TextFeatures(matches)
+
+DEFAULT_SCANNER = TextFeatureScanner(TEXT_INDICATORS)
+
+def scanner_for_preferences(preferences: 'GovernorPreferences') -> TextFeatureScanner:
+    """
+    Get the scanner for a governor's preferences.
+    
+    The scanner detects every TEXT_INDICATORS category plus the governor's
+    'trigger', 'forbidden' and 'topic' words. Scanners are cached by those
+    word lists, so preferences with the same words share one scanner.
+    
+    Args:
+        preferences: Governor preferences
+    
+    Returns:
+        Compiled TextFeatureScanner
+    """
+    return _compile_preference_scanner(
+        tuple(preferences.trigger_words),
+        tuple(preferences.forbidden_words),
+        tuple(preferences.preferred_topics)
+    )
+
+@lru_cache(maxsize=1024)
+def _compile_preference_scanner(trigger_words: Tuple[str, ...], forbidden_words: Tuple[str, ...],
+                                preferred_topics: Tuple[str, ...]) -> TextFeatureScanner:
+    """Compile (once per distinct word lists) a scanner with governor-specific categories."""
+    categories: Dict[str, Iterable[str]] = dict(TEXT_INDICATORS)
+    categories['trigger'] = trigger_words
+    categories['forbidden'] = forbidden_words
+    categories['topic'] = [word for topic in preferred_topics for word in tokenize_text(topic)]
+    return TextFeatureScanner(categories)
@@ -10,17 +10,29 @@ Key Components:
 - TraitMapper: Central registry for trait-behavior mappings
 - MappingRegistry: Storage and retrieval of trait mappings
 - ConflictResolver: Handles conflicts between multiple trait effects
+- ConflictStatistics: Aggregated conflict counts and resolved-value histograms
+- apply_trait_mappings_batch: Vectorized trait mapping for whole governor populations
 """
 
-from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Any, Optional, Set, Tuple
 import logging
+import threading
 from dataclasses import dataclass, field
 
-from .preference_structures import TraitBehaviorMapping, BehaviorType, GovernorPreferences
+from .preference_structures import TraitBehaviorMapping, BehaviorType, GovernorPreferences, CORE_PARAMETERS
 from .core_structures import GovernorProfile
+from .trait_matrix import NUMPY_AVAILABLE, TraitParameterMatrix, build_trait_incidence
+
+if NUMPY_AVAILABLE:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Resolved-value histogram layout for conflict statistics (values outside fall in the end bins)
+CONFLICT_HISTOGRAM_RANGE = (-1.0, 1.0)
+CONFLICT_HISTOGRAM_BINS = 20
+
 @dataclass
 class MappingConflict:
     """Represents a conflict between multiple trait mappings."""
@@ -30,6 +42,43 @@ class MappingConflict:
     resolution_strategy: str
     resolved_value: float
 
+# Resolved parameters (None if no trait is mapped), mapped trait count, conflicts encountered
+TraitResolution = Tuple[Optional[Dict[str, float]], int, Tuple[MappingConflict, ...]]
+
+@dataclass
+class ConflictStatistics:
+    """Aggregated conflicts for one (parameter, trait set) pair."""
+    parameter: str
+    traits: Tuple[str, ...]
+    count: int = 0
+    total_value: float = 0.0
+    min_value: float = float('inf')
+    max_value: float = float('-inf')
+    histogram: List[int] = field(default_factory=lambda: [0] * CONFLICT_HISTOGRAM_BINS)
+    
+    def record(self, resolved_value: float) -> None:
+        """Add one resolved value."""
+        self.count += 1
+        self.total_value += resolved_value
+        self.min_value = min(self.min_value, resolved_value)
+        self.max_value = max(self.max_value, resolved_value)
+        
+        low, high = CONFLICT_HISTOGRAM_RANGE
+        bin_index = int((resolved_value - low) / (high - low) * CONFLICT_HISTOGRAM_BINS)
+        self.histogram[max(0, min(CONFLICT_HISTOGRAM_BINS - 1, bin_index))] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            'parameter': self.parameter,
+            'traits': list(self.traits),
+            'count': self.count,
+            'mean_value': self.total_value / self.count if self.count else 0.0,
+            'min_value': self.min_value if self.count else 0.0,
+            'max_value': self.max_value if self.count else 0.0,
+            'histogram': list(self.histogram)
+        }
+
 class TraitMapper:
     """
     Central registry for trait-behavior mappings.
@@ -39,10 +88,35 @@ class TraitMapper:
     multiple traits affect the same parameter.
     """
     
-    def __init__(self):
-        """Initialize the trait mapper with comprehensive mappings."""
+    def __init__(self, conflict_log_size: int = 256, trace_conflicts: bool = False,
+                 resolution_cache_size: int = 1024):
+        """
+        Initialize the trait mapper with comprehensive mappings.
+        
+        Args:
+            conflict_log_size: Number of recent conflicts kept in parameter_conflicts
+            trace_conflicts: Also keep every conflict in conflict_trace (debugging only; unbounded)
+            resolution_cache_size: Number of trait signatures whose resolved parameters are memoized
+        """
         self.mappings_registry: Dict[str, TraitBehaviorMapping] = {}
-        self.parameter_conflicts: List[MappingConflict] = []
+        self.mapping_version = 0  # Bumped whenever the registry changes
+        
+        # (sorted normalized traits, mapping version) -> resolution, least recently used first
+        self.resolution_cache_size = resolution_cache_size
+        self._resolution_cache: OrderedDict[Tuple[Tuple[str, ...], int], TraitResolution] = OrderedDict()
+        self._resolution_lock = threading.Lock()
+        self.resolution_cache_hits = 0
+        self.resolution_cache_misses = 0
+        self._parameter_matrix: Optional[Tuple[int, TraitParameterMatrix]] = None  # (mapping version, matrix)
+        
+        # Conflict recording: recent ring buffer plus aggregated statistics
+        self.parameter_conflicts: Deque[MappingConflict] = deque(maxlen=conflict_log_size)
+        self.conflict_statistics: Dict[Tuple[str, Tuple[str, ...]], ConflictStatistics] = {}
+        self.conflicts_recorded = 0
+        self.trace_conflicts = trace_conflicts
+        self.conflict_trace: List[MappingConflict] = []
+        self._conflict_lock = threading.Lock()
+        
         self._initialize_comprehensive_mappings()
         logger.info("TraitMapper initialized with comprehensive trait mapping database")
     
@@ -90,6 +164,14 @@ class TraitMapper:
         Returns:
             Dictionary of resolved parameter values
         """
+        resolved_parameters, conflicts = self._resolve_parameters(trait_mappings, trait_weights)
+        for conflict in conflicts:
+            self._record_conflict(conflict)
+        return resolved_parameters
+    
+    def _resolve_parameters(self, trait_mappings: Dict[str, TraitBehaviorMapping],
+                            trait_weights: Dict[str, float]) -> Tuple[Dict[str, float], List[MappingConflict]]:
+        """Resolve parameter values, returning the conflicts encountered instead of recording them."""
         parameter_effects: Dict[str, List[Tuple[str, float, float]]] = {}  # param -> [(trait, effect, weight)]
         
         # Collect all parameter effects from traits
@@ -105,6 +187,7 @@ class TraitMapper:
         
         # Resolve conflicts for each parameter
         resolved_parameters = {}
+        conflicts: List[MappingConflict] = []
         for param, effects in parameter_effects.items():
             if len(effects) == 1:
                 # No conflict - single effect
@@ -122,10 +205,10 @@ class TraitMapper:
                     resolution_strategy="weighted_average",
                     resolved_value=resolved_value
                 )
-                self.parameter_conflicts.append(conflict)
+                conflicts.append(conflict)
                 logger.debug(f"Resolved conflict for parameter {param}: {[f'{t}:{v:.3f}' for t,v,w in effects]} -> {resolved_value:.3f}")
         
-        return resolved_parameters
+        return resolved_parameters, conflicts
     
     def apply_trait_mappings_to_preferences(self, governor_profile: GovernorProfile, 
                                          base_preferences: GovernorPreferences) -> GovernorPreferences:
@@ -141,25 +224,151 @@ class TraitMapper:
         """
         logger.info(f"Applying trait mappings to preferences for governor {governor_profile.governor_id}")
         
-        # Get mappings for all traits
-        trait_mappings = self.get_all_mappings_for_traits(governor_profile.traits)
-        if not trait_mappings:
+        resolved_parameters, mapped_traits = self._resolve_trait_signature(governor_profile.traits)
+        if resolved_parameters is None:
             logger.warning(f"No trait mappings found for governor {governor_profile.governor_id}")
             return base_preferences
         
-        # Calculate trait weights (equal weighting for simplicity)
-        trait_weights = {trait.lower().strip(): 1.0 / len(governor_profile.traits) 
-                        for trait in governor_profile.traits}
-        
-        # Resolve parameter conflicts
-        resolved_parameters = self.resolve_parameter_conflicts(trait_mappings, trait_weights)
-        
         # Apply resolved parameters to preferences
         modified_preferences = self._apply_parameter_modifications(base_preferences, resolved_parameters)
         
-        logger.info(f"Applied {len(resolved_parameters)} parameter modifications from {len(trait_mappings)} traits")
+        logger.info(f"Applied {len(resolved_parameters)} parameter modifications from {mapped_traits} traits")
         return modified_preferences
     
+    def apply_trait_mappings_batch(self, governor_profiles: List[GovernorProfile],
+                                   base_preferences: List[GovernorPreferences]) -> List[GovernorPreferences]:
+        """
+        Apply trait mappings to many governors' preferences at once.
+        
+        The registry is compiled into a trait x parameter matrix of scaled
+        effects (see compile_parameter_matrix), so the resolved modifications of
+        the whole batch come from one product with the governor x trait matrix.
+        Single effects, weighted-average conflict resolution and clamping follow
+        apply_trait_mappings_to_preferences, and conflicts are recorded the same
+        way. Results agree with it up to floating-point rounding; without NumPy
+        each governor goes through it.
+        
+        Args:
+            governor_profiles: Governor profiles containing traits
+            base_preferences: Base preferences for each profile, in the same order
+        
+        Returns:
+            Modified preferences for each profile, in input order
+        """
+        if len(governor_profiles) != len(base_preferences):
+            raise ValueError(f"Got {len(governor_profiles)} profiles but {len(base_preferences)} base preferences")
+        if not NUMPY_AVAILABLE or not governor_profiles:
+            return [self.apply_trait_mappings_to_preferences(profile, preferences)
+                    for profile, preferences in zip(governor_profiles, base_preferences)]
+        
+        logger.info(f"Applying trait mappings to preferences for {len(governor_profiles)} governors")
+        matrix = self.compile_parameter_matrix()
+        
+        trait_lists = [[trait.lower().strip() for trait in profile.traits] for profile in governor_profiles]
+        incidence = build_trait_incidence(trait_lists, matrix.trait_index)
+        presence = incidence.presence
+        trait_weights = np.divide(1.0, incidence.trait_counts, out=np.zeros_like(incidence.trait_counts),
+                                  where=incidence.trait_counts > 0)
+        
+        # Sum of scaled effects and number of mapped traits affecting each parameter
+        effect_sums = presence @ matrix.weights
+        sources = presence @ matrix.listed.astype(float)
+        
+        # One effect: effect * weight; several: their weighted average (equal weights), bounds-checked
+        resolved = effect_sums * trait_weights[:, None] / np.maximum(sources, 1.0)
+        conflicted = sources > 1
+        bounded = [col for col, param in enumerate(matrix.columns) if param in CORE_PARAMETERS]
+        resolved[:, bounded] = np.where(conflicted[:, bounded], np.clip(resolved[:, bounded], 0.0, 1.0),
+                                        resolved[:, bounded])
+        
+        # Core parameters are added to the base values and clamped
+        core_columns = [matrix.column_index.get(param) for param in CORE_PARAMETERS]
+        base_values = np.array([[getattr(preferences, param) for param in CORE_PARAMETERS]
+                                for preferences in base_preferences], dtype=float)
+        core_values = base_values.copy()
+        for position, col in enumerate(core_columns):
+            if col is not None:
+                affected = sources[:, col] > 0
+                core_values[affected, position] = np.clip(base_values[affected, position] + resolved[affected, col],
+                                                          0.0, 1.0)
+        
+        modifier_columns = [col for col, param in enumerate(matrix.columns) if param not in CORE_PARAMETERS]
+        mapped_rows = presence.any(axis=1).tolist()
+        conflicted_rows = conflicted.any(axis=1).tolist()
+        resolved_rows, source_rows, core_rows = resolved.tolist(), sources.tolist(), core_values.tolist()
+        
+        conflicts_by_signature: Dict[Tuple[str, ...], List[MappingConflict]] = {}
+        results = []
+        for row, (profile, preferences) in enumerate(zip(governor_profiles, base_preferences)):
+            if not mapped_rows[row]:
+                results.append(preferences)
+                continue
+            
+            if conflicted_rows[row]:
+                signature = tuple(sorted(trait_lists[row]))
+                conflicts = conflicts_by_signature.get(signature)
+                if conflicts is None:
+                    conflicts = conflicts_by_signature[signature] = self._batch_conflicts(
+                        matrix, signature, resolved_rows[row], source_rows[row]
+                    )
+                for conflict in conflicts:
+                    self._record_conflict(conflict)
+            
+            behavioral_modifiers = preferences.behavioral_modifiers.copy()
+            for col in modifier_columns:
+                if source_rows[row][col]:
+                    behavioral_modifiers[matrix.columns[col]] = resolved_rows[row][col]
+            
+            core = core_rows[row]
+            results.append(GovernorPreferences(
+                governor_id=preferences.governor_id,
+                tone_preference=preferences.tone_preference,
+                interaction_style=preferences.interaction_style,
+                greeting_formality=core[0],
+                puzzle_difficulty=preferences.puzzle_difficulty,
+                response_patience=core[1],
+                metaphor_tolerance=core[2],
+                reputation_sensitivity=core[3],
+                trigger_words=preferences.trigger_words.copy(),
+                forbidden_words=preferences.forbidden_words.copy(),
+                preferred_topics=preferences.preferred_topics.copy(),
+                behavioral_modifiers=behavioral_modifiers
+            ))
+        
+        unmapped = mapped_rows.count(False)
+        if unmapped:
+            logger.warning(f"No trait mappings found for {unmapped} of {len(governor_profiles)} governors")
+        return results
+    
+    def compile_parameter_matrix(self) -> TraitParameterMatrix:
+        """
+        Compile the registry into a trait x parameter matrix.
+        
+        Entries are modification * effect_strength. The compiled matrix is
+        reused until the mapping version changes.
+        
+        Returns:
+            TraitParameterMatrix (requires NumPy)
+        """
+        with self._resolution_lock:
+            version = self.mapping_version
+            if self._parameter_matrix is not None and self._parameter_matrix[0] == version:
+                return self._parameter_matrix[1]
+            registry = dict(self.mappings_registry)
+        
+        entries = [
+            (trait, param, modification * mapping.effect_strength)
+            for trait, mapping in registry.items()
+            for param, modification in mapping.parameter_modifications.items()
+        ]
+        parameters = list(dict.fromkeys(param for _, param, _ in entries))
+        matrix = TraitParameterMatrix.compile(registry, parameters, entries)
+        
+        with self._resolution_lock:
+            if version == self.mapping_version:
+                self._parameter_matrix = (version, matrix)
+        return matrix
+    
     def add_custom_mapping(self, mapping: TraitBehaviorMapping) -> None:
         """
         Add a custom trait mapping to the registry.
@@ -169,15 +378,28 @@ class TraitMapper:
         """
         trait_key = mapping.trait_name.lower().strip()
         self.mappings_registry[trait_key] = mapping
+        self.invalidate_resolution_cache()
         logger.info(f"Added custom mapping for trait '{trait_key}'")
     
+    def invalidate_resolution_cache(self) -> None:
+        """Bump the mapping version, discarding memoized trait resolutions."""
+        with self._resolution_lock:
+            self.mapping_version += 1
+            self._resolution_cache.clear()
+    
     def get_mapping_summary(self) -> Dict[str, Any]:
         """Get a summary of all registered mappings."""
         summary = {
             'total_mappings': len(self.mappings_registry),
             'behavior_types': {},
             'parameter_coverage': set(),
-            'conflicts_recorded': len(self.parameter_conflicts)
+            'conflicts_recorded': self.conflicts_recorded,
+            'mapping_version': self.mapping_version,
+            'resolution_cache': {
+                'size': len(self._resolution_cache),
+                'hits': self.resolution_cache_hits,
+                'misses': self.resolution_cache_misses
+            }
         }
         
         for mapping in self.mappings_registry.values():
@@ -191,6 +413,120 @@ class TraitMapper:
         summary['parameter_coverage'] = list(summary['parameter_coverage'])
         return summary
     
+    def export_conflict_statistics(self) -> List[Dict[str, Any]]:
+        """
+        Export aggregated conflict statistics, most frequent first.
+        
+        Returns:
+            One dictionary per (parameter, trait set) with count, value range and histogram
+        """
+        with self._conflict_lock:
+            statistics = [stats.to_dict() for stats in self.conflict_statistics.values()]
+        statistics.sort(key=lambda stats: stats['count'], reverse=True)
+        return statistics
+    
+    def reset_conflict_statistics(self) -> None:
+        """Clear recorded conflicts, aggregated statistics and any full trace."""
+        with self._conflict_lock:
+            self.parameter_conflicts.clear()
+            self.conflict_statistics.clear()
+            self.conflict_trace.clear()
+            self.conflicts_recorded = 0
+    
+    def _resolve_trait_signature(self, traits: List[str]) -> Tuple[Optional[Dict[str, float]], int]:
+        """
+        Resolve the parameter modifications for a trait list, memoized by trait signature.
+        
+        The result depends only on the normalized, sorted traits (duplicates
+        included, since they dilute trait weights) and the mapping version.
+        Conflicts found when the signature was first resolved are recorded
+        again on every hit so conflict statistics still count each application.
+        
+        Args:
+            traits: Governor traits
+            
+        Returns:
+            Tuple of (resolved parameters, or None if no trait is mapped; number of mapped traits)
+        """
+        normalized_traits = tuple(sorted(trait.lower().strip() for trait in traits))
+        
+        with self._resolution_lock:
+            signature = (normalized_traits, self.mapping_version)
+            cached = self._resolution_cache.get(signature)
+            if cached is not None:
+                self._resolution_cache.move_to_end(signature)
+                self.resolution_cache_hits += 1
+            else:
+                self.resolution_cache_misses += 1
+        
+        if cached is None:
+            # Get mappings for all traits
+            trait_mappings = self.get_all_mappings_for_traits(list(normalized_traits))
+            if not trait_mappings:
+                cached = (None, 0, ())
+            else:
+                # Calculate trait weights (equal weighting for simplicity)
+                trait_weights = {trait: 1.0 / len(normalized_traits) for trait in normalized_traits}
+                
+                # Resolve parameter conflicts
+                resolved_parameters, conflicts = self._resolve_parameters(trait_mappings, trait_weights)
+                cached = (resolved_parameters, len(trait_mappings), tuple(conflicts))
+            
+            with self._resolution_lock:
+                if signature[1] == self.mapping_version:
+                    self._resolution_cache[signature] = cached
+                    while len(self._resolution_cache) > self.resolution_cache_size:
+                        self._resolution_cache.popitem(last=False)
+        
+        resolved_parameters, mapped_traits, conflicts = cached
+        for conflict in conflicts:
+            self._record_conflict(conflict)
+        return resolved_parameters, mapped_traits
+    
+    def _batch_conflicts(self, matrix: TraitParameterMatrix, signature: Tuple[str, ...],
+                         resolved: List[float], sources: List[float]) -> List[MappingConflict]:
+        """Rebuild the conflicts _resolve_parameters reports for one batch row."""
+        trait_weight = 1.0 / len(signature)
+        mapped_traits = [trait for trait in dict.fromkeys(signature) if trait in matrix.trait_index]
+        
+        parameters = dict.fromkeys(
+            param for trait in mapped_traits for param in self.mappings_registry[trait].parameter_modifications
+        )
+        
+        conflicts = []
+        for param in parameters:
+            col = matrix.column_index[param]
+            if sources[col] <= 1:
+                continue
+            traits = [trait for trait in mapped_traits if matrix.listed[matrix.trait_index[trait], col]]
+            conflicts.append(MappingConflict(
+                parameter=param,
+                conflicting_traits=traits,
+                conflicting_values=[
+                    self.mappings_registry[trait].parameter_modifications[param] * trait_weight *
+                    self.mappings_registry[trait].effect_strength
+                    for trait in traits
+                ],
+                resolution_strategy="weighted_average",
+                resolved_value=resolved[col]
+            ))
+        return conflicts
+    
+    def _record_conflict(self, conflict: MappingConflict) -> None:
+        """Record a resolved conflict in the ring buffer, statistics and optional trace."""
+        key = (conflict.parameter, tuple(sorted(conflict.conflicting_traits)))
+        with self._conflict_lock:
+            self.parameter_conflicts.append(conflict)
+            self.conflicts_recorded += 1
+            
+            stats = self.conflict_statistics.get(key)
+            if stats is None:
+                stats = self.conflict_statistics[key] = ConflictStatistics(key[0], key[1])
+            stats.record(conflict.resolved_value)
+            
+            if self.trace_conflicts:
+                self.conflict_trace.append(conflict)
+    
     def _initialize_comprehensive_mappings(self) -> None:
         """Initialize the comprehensive trait mapping database."""
         logger.debug("Initializing comprehensive trait mappings")
@@ -334,7 +670,7 @@ class TraitMapper:
         resolved_value = weighted_sum / total_weight
         
         # Apply bounds checking for common parameters
-        if parameter in ['greeting_formality', 'response_patience', 'metaphor_tolerance', 'reputation_sensitivity']:
+        if parameter in CORE_PARAMETERS:
             resolved_value = max(0.0, min(1.0, resolved_value))
         
         logger.debug(f"Resolved conflict for {parameter}: {len(effects)} effects -> {resolved_value:.3f}")
@@ -0,0 +1,127 @@
+"""
+Trait Parameter Matrix for Governor Dialog System
+=================================================
+
+This module compiles trait-to-parameter tables into dense matrices so that
+whole populations of governors can be encoded with matrix products instead
+of a per-governor loop over trait mappings.
+
+A compiled table has one row per known trait and one column per output
+(behavioral parameter, tone score, difficulty contribution, ...). A batch of
+governors becomes a governor×trait matrix, built from the (governor, trait)
+entries of their trait lists, and a single product yields every output for
+every governor. Trait vocabularies are small (tens of traits), so the batch
+matrix is stored densely.
+
+Key Components:
+- TraitParameterMatrix: Compiled trait × output weight matrix
+- TraitIncidence: Governor × trait presence matrix for a batch of trait lists
+- build_trait_incidence: Build the TraitIncidence of normalized trait lists
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Iterable, Sequence, Tuple
+import logging
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # Batch encoders fall back to their per-governor paths
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TraitParameterMatrix:
+    """
+    Compiled trait × output table.
+    
+    weights holds each trait's contribution to each output; listed marks the
+    entries present in the source table (including zero contributions), which
+    is what decides whether a trait affects an output at all.
+    """
+    traits: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    weights: Any  # np.ndarray, len(traits) x len(columns)
+    listed: Any  # np.ndarray of bool, same shape
+    trait_index: Dict[str, int] = field(init=False, repr=False)
+    column_index: Dict[str, int] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        """Index traits and columns by name."""
+        self.trait_index = {trait: row for row, trait in enumerate(self.traits)}
+        self.column_index = {column: col for col, column in enumerate(self.columns)}
+    
+    @classmethod
+    def compile(cls, traits: Iterable[str], columns: Iterable[str],
+                entries: Iterable[Tuple[str, str, float]]) -> 'TraitParameterMatrix':
+        """
+        Compile a table from (trait, column, weight) entries.
+        
+        Args:
+            traits: Trait vocabulary (row order)
+            columns: Output names (column order)
+            entries: Contributions; repeated (trait, column) entries are summed
+        
+        Returns:
+            Compiled TraitParameterMatrix
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("TraitParameterMatrix requires NumPy")
+        
+        traits, columns = tuple(traits), tuple(columns)
+        trait_rows = {trait: row for row, trait in enumerate(traits)}
+        column_cols = {column: col for col, column in enumerate(columns)}
+        weights = np.zeros((len(traits), len(columns)))
+        listed = np.zeros(weights.shape, dtype=bool)
+        
+        for trait, column, weight in entries:
+            row, col = trait_rows[trait], column_cols[column]
+            weights[row, col] += weight
+            listed[row, col] = True
+        
+        logger.debug(f"Compiled {len(traits)}x{len(columns)} trait parameter matrix")
+        return cls(traits, columns, weights, listed)
+    
+    def column_positions(self, names: Sequence[str]) -> Any:
+        """Column positions of the given outputs, as an index array."""
+        return np.array([self.column_index[name] for name in names], dtype=np.intp)
+
+@dataclass
+class TraitIncidence:
+    """Presence of known traits in a batch of governor trait lists."""
+    presence: Any  # np.ndarray, governors x traits; 1.0 where the governor has the trait
+    trait_counts: Any  # np.ndarray, traits per governor including duplicates
+    unmatched: Any  # np.ndarray, distinct traits per governor outside the vocabulary
+
+def build_trait_incidence(trait_lists: Sequence[Sequence[str]],
+                          trait_index: Dict[str, int]) -> TraitIncidence:
+    """
+    Build the governor × trait presence matrix for normalized trait lists.
+    
+    Args:
+        trait_lists: One list of normalized traits per governor
+        trait_index: Trait vocabulary (see TraitParameterMatrix.trait_index)
+    
+    Returns:
+        TraitIncidence for the batch
+    """
+    rows: List[int] = []
+    cols: List[int] = []
+    unmatched = np.zeros(len(trait_lists))
+    
+    for row, traits in enumerate(trait_lists):
+        for trait in set(traits):
+            col = trait_index.get(trait)
+            if col is None:
+                unmatched[row] += 1
+            else:
+                rows.append(row)
+                cols.append(col)
+    
+    presence = np.zeros((len(trait_lists), len(trait_index)))
+    presence[rows, cols] = 1.0
+    trait_counts = np.array([len(traits) for traits in trait_lists], dtype=float)
+    return TraitIncidence(presence, trait_counts, unmatched)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Compression Benchmark for Dialog Library Storage
+================================================
+
+This script compares the inscription size and speed of the dialog library
+compression modes (GZIP, CUSTOM and the trained ZDICT dictionary) over a
+corpus of dialog libraries built from the governor profiles.
+
+The dictionary is trained on half of the governors and measured on the
+other half, so the ratios reflect libraries the dictionary has not seen.
+"""
+
+import json
+import random
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Callable
+
+from tools.game_mechanics.dialog_system import DialogNode, DialogLibrarySchema
+from tools.game_mechanics.dialog_system.storage_schemas import (
+    CompressionType,
+    CompressionUtils,
+    CompressionDictionary
+)
+
+PROFILE_DIR = Path(__file__).resolve().parents[3] / "data" / "governors" / "profiles"
+INTENTS = ["question", "ritual_phrase", "formal_greeting", "offering", "praise", "riddle_answer"]
+
+def build_corpus(node_count: int = 40) -> List[DialogLibrarySchema]:
+    """Build one dialog library per governor profile"""
+    libraries = []
+    for path in sorted(PROFILE_DIR.glob("*.json")):
+        profile = json.loads(path.read_text(encoding="utf-8"))
+        governor_id = profile["governor_name"]
+        rng = random.Random(governor_id)
+        lines = [profile.get("essence", ""), profile.get("angelic_role", ""), f"I am {profile.get('title', '')}."]
+        correspondences = profile.get("archetypal_correspondences", {})
+        
+        library = DialogLibrarySchema(governor_id=governor_id, version="1.0",
+                                      metadata={"element": profile.get("element"),
+                                                "aethyr": profile.get("aethyr")})
+        for index in range(node_count):
+            library.add_dialog_node(DialogNode(
+                id=f"{governor_id}_node_{index}",
+                content=[rng.choice(lines), f"Speak of {rng.choice(list(correspondences.values()) or ['the veil'])}."],
+                transitions={intent: f"{governor_id}_node_{rng.randrange(node_count)}"
+                             for intent in rng.sample(INTENTS, 3)},
+                requirements={"min_reputation": rng.randrange(5)},
+                metadata={"depth": index % 7, "element": profile.get("element")}
+            ))
+        library.add_response_variants("greeting", [f"Hail, seeker of {profile.get('aethyr')}",
+                                                   "Welcome to the vault"])
+        libraries.append(library)
+    return libraries
+
+def measure(name: str, documents: List[bytes], compress: Callable[[bytes], bytes],
+            decompress: Callable[[bytes], bytes], repeats: int = 5) -> Dict[str, Any]:
+    """Measure compressed size and compress/decompress throughput"""
+    raw_bytes = sum(len(document) for document in documents)
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        compressed = [compress(document) for document in documents]
+    compress_seconds = (time.perf_counter() - start) / repeats
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        restored = [decompress(data) for data in compressed]
+    decompress_seconds = (time.perf_counter() - start) / repeats
+    
+    assert restored == documents, f"{name} does not round-trip"
+    compressed_bytes = sum(len(data) for data in compressed)
+    return {
+        "mode": name,
+        "compressed_bytes": compressed_bytes,
+        "ratio": raw_bytes / compressed_bytes,
+        "compress_mb_s": raw_bytes / compress_seconds / 1e6,
+        "decompress_mb_s": raw_bytes / decompress_seconds / 1e6
+    }
+
+def custom_round_trip_works(document: bytes) -> bool:
+    """CUSTOM mode's pattern codes collide, so check it round-trips before timing it"""
+    try:
+        compressed = CompressionUtils.compress_content(document.decode("utf-8"), CompressionType.CUSTOM)
+        return CompressionUtils.decompress_content(compressed, CompressionType.CUSTOM).encode("utf-8") == document
+    except Exception:
+        return False
+
+def run_benchmark() -> List[Dict[str, Any]]:
+    """Benchmark every mode on whole documents and on single node blocks"""
+    libraries = build_corpus()
+    training, held_out = libraries[0::2], libraries[1::2]
+    dictionary = CompressionDictionary.train_from_libraries(training)
+    CompressionUtils.register_dictionary(dictionary)
+    print(f"📚 Corpus: {len(libraries)} libraries, dictionary {len(dictionary.data)} bytes "
+          f"trained on {len(training)} of them")
+    
+    corpora = {
+        "documents": [json.dumps(library.to_dict(), separators=(',', ':'), sort_keys=True).encode("utf-8")
+                      for library in held_out],
+        "node blocks": [json.dumps(node, separators=(',', ':'), sort_keys=True).encode("utf-8")
+                        for library in held_out for node in library.dialog_nodes.values()]
+    }
+    
+    results = []
+    for corpus_name, documents in corpora.items():
+        modes = {
+            CompressionType.GZIP: lambda data: CompressionUtils.compress_content(data.decode("utf-8")),
+            CompressionType.ZDICT: lambda data: CompressionUtils.compress_content(data.decode("utf-8"),
+                                                                                  CompressionType.ZDICT)
+        }
+        decoders = {
+            CompressionType.GZIP: lambda data: CompressionUtils.decompress_content(data).encode("utf-8"),
+            CompressionType.ZDICT: lambda data: CompressionUtils.decompress_content(
+                data, CompressionType.ZDICT).encode("utf-8")
+        }
+        if all(custom_round_trip_works(document) for document in documents):
+            modes[CompressionType.CUSTOM] = lambda data: CompressionUtils.compress_content(
+                data.decode("utf-8"), CompressionType.CUSTOM)
+            decoders[CompressionType.CUSTOM] = lambda data: CompressionUtils.decompress_content(
+                data, CompressionType.CUSTOM).encode("utf-8")
+        else:
+            print(f"⚠️  CUSTOM does not round-trip the {corpus_name}; measuring compression only")
+            raw_bytes = sum(len(document) for document in documents)
+            start = time.perf_counter()
+            compressed = [CompressionUtils.compress_content(document.decode("utf-8"), CompressionType.CUSTOM)
+                          for document in documents]
+            compress_seconds = time.perf_counter() - start
+            compressed_bytes = sum(len(data) for data in compressed)
+            results.append({
+                "corpus": corpus_name, "mode": CompressionType.CUSTOM.value,
+                "compressed_bytes": compressed_bytes,
+                "ratio": raw_bytes / compressed_bytes,
+                "compress_mb_s": raw_bytes / compress_seconds / 1e6,
+                "decompress_mb_s": None
+            })
+        
+        for compression_type, compress in modes.items():
+            result = measure(compression_type.value, documents, compress, decoders[compression_type])
+            result["corpus"] = corpus_name
+            results.append(result)
+    return results
+
+def main():
+    """Print the benchmark table"""
+    print("🚀 Dialog Library Compression Benchmark")
+    results = run_benchmark()
+    print(f"\n{'corpus':<12} {'mode':<7} {'bytes':>9} {'ratio':>7} {'comp MB/s':>10} {'decomp MB/s':>12}")
+    for result in sorted(results, key=lambda r: (r["corpus"], r["mode"])):
+        decompress = f"{result['decompress_mb_s']:.1f}" if result["decompress_mb_s"] else "n/a"
+        print(f"{result['corpus']:<12} {result['mode']:<7} {result['compressed_bytes']:>9} "
+              f"{result['ratio']:>7.2f} {result['compress_mb_s']:>10.1f} {decompress:>12}")
+
+if __name__ == "__main__":
+    main()
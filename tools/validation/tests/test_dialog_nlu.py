@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Dialog NLU Components
+====================================
+
+This module tests the natural language understanding components of the
+dialog system: token matching, entity recognition, similarity and intent
+classification.
+"""
+
+import os
+import tempfile
+import unittest
+
+from tools.game_mechanics.dialog_system import (
+    TokenMatcher,
+    IntentPattern,
+    IntentCategory,
+    IntentClassifier,
+    EntityRecognizer,
+    SimpleEmbedding,
+    SimilarityMatcher
+)
+from tools.game_mechanics.dialog_system.nlu_engine import PatternType
+from tools.game_mechanics.dialog_system.similarity_engine import NUMPY_AVAILABLE
+
+class TestTokenMatcher(unittest.TestCase):
+    """Test the TokenMatcher component"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.matcher = TokenMatcher()
+    
+    def _scan_all_patterns(self, text: str):
+        """Reference classification that tries every registered pattern"""
+        tokens = self.matcher.tokenize(text)
+        matches = []
+        for patterns in self.matcher.intent_patterns.values():
+            for pattern in patterns:
+                match = self.matcher.match_pattern(tokens, pattern)
+                if match:
+                    matches.append(match)
+        matches.sort(key=lambda x: x.confidence, reverse=True)
+        return matches
+    
+    def test_inverted_index_matches_full_scan(self):
+        """Test indexed classification returns the same matches as a full scan"""
+        for index in range(200):
+            self.matcher.add_pattern(IntentPattern(
+                intent=IntentCategory.QUESTION if index % 2 else IntentCategory.PRAISE,
+                pattern_type=PatternType.TOKEN_MATCH,
+                pattern=f"governor_pattern_{index}",
+                required_tokens=[f"sigil{index}", "wise"],
+                optional_tokens=["governor", f"aethyr{index % 7}"],
+                confidence_weight=0.5 + (index % 5) / 10
+            ))
+        self.matcher.add_pattern(IntentPattern(
+            intent=IntentCategory.FORMAL_GREETING,
+            pattern_type=PatternType.EXACT_MATCH,
+            pattern="greetings wise governor",
+            required_tokens=[],
+            optional_tokens=[]
+        ))
+        
+        inputs = [
+            "Greetings wise governor",
+            "What is the sigil12 of aethyr5?",
+            "hello there friend",
+            "I offer this tribute, wise one",
+            "nothing relevant here"
+        ]
+        for text in inputs:
+            self.assertEqual(self.matcher.classify_intent(text), self._scan_all_patterns(text))
+        print("✅ Inverted token index test passed")
+
+class TestEntityRecognizer(unittest.TestCase):
+    """Test the EntityRecognizer component"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.recognizer = EntityRecognizer()
+    
+    def test_single_pass_extraction_from_data(self):
+        """Test entities of every type are tagged, including data-driven governors"""
+        entities = self.recognizer.extract_entities(
+            "I offer a Crystal to ABRIOND and Occodon through scrying. Sigils? No, a sigil."
+        )
+        self.assertEqual(set(entities['governor_names']), {'abriond', 'occodon'})
+        self.assertEqual(set(entities['items']), {'crystal'})
+        self.assertEqual(set(entities['mystical_terms']), {'scrying', 'sigil'})
+        self.assertGreaterEqual(len(self.recognizer.vocabulary['governor_names']), 91)
+        print("✅ Single-pass entity extraction test passed")
+    
+    def test_vocabulary_added_incrementally(self):
+        """Test added terms, including phrases, are recognized after a rebuild"""
+        version = self.recognizer.version
+        self.assertEqual(self.recognizer.add_vocabulary('items', ['Philosopher Stone', 'stone']), 1)
+        self.assertGreater(self.recognizer.version, version)
+        
+        entities = self.recognizer.extract_entities("the philosopher  stone beside a stone")
+        self.assertEqual(entities['items'], ['philosopher stone', 'stone'])
+        self.assertEqual(self.recognizer.extract_entities("stones"), {})
+        print("✅ Incremental vocabulary test passed")
+
+class TestSimilarityEngine(unittest.TestCase):
+    """Test the matrix-backed SimpleEmbedding and SimilarityMatcher"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.embedding = SimpleEmbedding()
+        self.matcher = SimilarityMatcher(self.embedding)
+    
+    def _write_vectors(self, content: str) -> str:
+        """Write a vector file to a temporary path"""
+        handle, path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+    
+    def test_similarity_matrix_matches_pairwise(self):
+        """Test the batched matrix equals word_similarity for every pair"""
+        inputs = ["hello", "Greetings", "sigil", "wisdom"]
+        patterns = ["hail", "knowledge", "sigil", "riddle"]
+        matrix = self.embedding.similarity_matrix(inputs, patterns)
+        for row, input_word in enumerate(inputs):
+            for column, pattern_word in enumerate(patterns):
+                self.assertAlmostEqual(float(matrix[row][column]),
+                                       self.embedding.word_similarity(input_word, pattern_word), places=5)
+        
+        score, matched = self.matcher.semantic_match_tokens(["greetings", "secret"], ["hello", "wisdom", "sigil"])
+        self.assertEqual(matched, ["greetings", "secret"])
+        self.assertGreater(score, 0.6)
+        print("✅ Batched similarity matrix test passed")
+    
+    def test_vector_file_loading(self):
+        """Test GloVe and word2vec text vector files load into the store"""
+        glove_path = self._write_vectors("aethyr 1 0 0\nsigil 0.9 0.1 0\nwand 0 0 1\n")
+        embedding = SimpleEmbedding.from_vector_file(glove_path)
+        self.assertEqual((embedding.vector_size, len(embedding.vocab)), (3, 3))
+        self.assertGreater(embedding.word_similarity("aethyr", "sigil"), 0.9)
+        self.assertEqual(embedding.word_similarity("aethyr", "wand"), 0.0)
+        
+        word2vec_path = self._write_vectors("2 50\n" + "\n".join(
+            f"{word} " + " ".join(["0.5"] * 50) for word in ("rune", "glyph")
+        ))
+        self.assertEqual(self.embedding.load_vector_file(word2vec_path), 2)
+        self.assertAlmostEqual(self.embedding.word_similarity("rune", "glyph"), 1.0, places=5)
+        
+        with self.assertRaises(ValueError):
+            self.embedding.load_vector_file(glove_path)
+        print("✅ Vector file loader test passed")
+
+class TestIntentClassifier(unittest.TestCase):
+    """Test the IntentClassifier component"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.classifier = IntentClassifier(cache_size=2)
+    
+    def test_memoized_results_match_and_are_copies(self):
+        """Test repeated inputs hit the cache and return independent copies"""
+        uncached = IntentClassifier(cache_size=0)
+        first = self.classifier.classify("Greetings, wise governor!")
+        first.matched_tokens.append("tampered")
+        second = self.classifier.classify("greetings wise GOVERNOR")
+        
+        self.assertEqual(second, uncached.classify("Greetings, wise governor!"))
+        self.assertNotIn("tampered", second.matched_tokens)
+        stats = self.classifier.get_cache_stats()
+        self.assertEqual((stats['cache_hits'], stats['cache_misses']), (1, 1))
+        
+        # LRU bound
+        self.classifier.classify("hello there")
+        self.classifier.classify("what is the answer")
+        self.assertEqual(self.classifier.get_cache_stats()['cache_size'], 2)
+        print("✅ Classification memoization test passed")
+    
+    def test_memoized_results_rescan_entities(self):
+        """Test inputs sharing normalized tokens still get the entities of their own text"""
+        uncached = IntentClassifier(cache_size=0)
+        for first, second in (("divine nature", "divine the nature"), ("ritual practice", "ritual the practice")):
+            self.classifier.classify(first)
+            self.assertEqual(self.classifier.classify(second).entities, uncached.classify(second).entities)
+            self.assertEqual(self.classifier.classify_many([first, second]),
+                             [uncached.classify(first), uncached.classify(second)])
+        print("✅ Memoized entity rescan test passed")
+    
+    def test_cache_invalidated_when_patterns_change(self):
+        """Test adding a pattern discards memoized results"""
+        self.assertEqual(self.classifier.classify("behold the sigil").intent, IntentCategory.UNKNOWN)
+        self.classifier.token_matcher.add_pattern(IntentPattern(
+            intent=IntentCategory.OFFERING,
+            pattern_type=PatternType.TOKEN_MATCH,
+            pattern="sigil_offering",
+            required_tokens=["sigil"],
+            optional_tokens=["behold"],
+            confidence_weight=1.0
+        ))
+        self.assertEqual(self.classifier.classify("behold the sigil").intent, IntentCategory.OFFERING)
+        
+        self.classifier.invalidate_cache()
+        self.assertEqual(self.classifier.get_cache_stats()['cache_size'], 0)
+        print("✅ Classification cache invalidation test passed")
+    
+    def test_classify_many_matches_classify(self):
+        """Test batch classification preserves order, dedupes inputs and fills the cache"""
+        texts = [
+            "Greetings, wise governor!",
+            "",
+            "greetings wise GOVERNOR",
+            "I seek knowledge of the secret",
+            "I offer this crystal as tribute",
+            "Greetings, wise governor!",
+            "zzz qqq"
+        ]
+        classifier = IntentClassifier(cache_size=16)
+        uncached = IntentClassifier(cache_size=0)
+        
+        results = classifier.classify_many(texts)
+        self.assertEqual(results, [uncached.classify(text) for text in texts])
+        self.assertEqual(results, uncached.classify_many(texts))
+        self.assertIsNot(results[0], results[2])
+        
+        stats = classifier.get_cache_stats()
+        self.assertEqual((stats['cache_size'], stats['cache_misses'], stats['cache_hits']), (4, 4, 2))
+        classifier.classify("I seek knowledge of the secret")
+        self.assertEqual(classifier.get_cache_stats()['cache_hits'], 3)
+        self.assertEqual(classifier.classify_many([]), [])
+        print("✅ Batch classification test passed")
+    
+    @unittest.skipUnless(NUMPY_AVAILABLE, "pattern-embedding index requires NumPy")
+    def test_pattern_index_matches_pattern_scan(self):
+        """Test vectorized semantic scoring agrees with the per-pattern scan"""
+        for index, word in enumerate(["wisdom", "mystery", "hail", "sigil"]):
+            self.classifier.token_matcher.add_pattern(IntentPattern(
+                intent=IntentCategory.QUESTION if index % 2 else IntentCategory.PRAISE,
+                pattern_type=PatternType.TOKEN_MATCH,
+                pattern=f"semantic_{word}",
+                required_tokens=[word, "knowledge"],
+                optional_tokens=["secret", "greetings"],
+                confidence_weight=1.0
+            ))
+        
+        for text in ["secret knowledge please", "hi there", "how", "sigil of wisdom", "unknown words"]:
+            tokens = self.classifier.token_matcher.tokenize(text)
+            indexed = self.classifier._semantic_classification(text, {})
+            scanned = self.classifier._semantic_classification_scan(tokens, {})
+            self.assertEqual(indexed is None, scanned is None, text)
+            if indexed:
+                self.assertEqual(indexed.intent, scanned.intent)
+                self.assertAlmostEqual(indexed.confidence, scanned.confidence, places=5)
+                self.assertEqual(indexed.matched_tokens, scanned.matched_tokens)
+                self.assertNotIn(indexed.intent, [intent for intent, _ in indexed.alternatives])
+        print("✅ Pattern embedding index test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
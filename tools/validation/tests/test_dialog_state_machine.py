@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Dialog State Machine
+=======================================
+
+This module tests dialog flow through the StateMachine: library caching
+and node transitions.
+"""
+
+import json
+import unittest
+
+from tools.game_mechanics.dialog_system import (
+    DialogCache,
+    DialogLibrarySchema,
+    DialogNode,
+    GovernorProfile,
+    IntentCategory,
+    PlayerState,
+    ResponseSelector,
+    StateMachine,
+    StorageManager
+)
+from tools.game_mechanics.dialog_system.storage_schemas import (
+    DecodedLibraryCache,
+    DialogLibraryView,
+    LibraryLayout
+)
+from tools.game_mechanics.dialog_system.state_machine import TransitionAttempt, TransitionResult
+from tools.validation.tests.test_dialog_storage import build_library
+
+class TestDialogCache(unittest.TestCase):
+    """Test the StateMachine's bounded dialog library cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = StorageManager(decoded_cache=DecodedLibraryCache())
+        for governor_id in ("ABRIOND", "OCCODON", "PASCOMB"):
+            self.storage.store_dialog_library(build_library(governor_id))
+        self.storage.store_dialog_library(build_library("VALGARS", 200), layout=LibraryLayout.NODE_BLOCKS)
+        self.library_bytes = len(json.dumps(build_library("ABRIOND").to_dict(), separators=(',', ':')))
+    
+    def test_lru_budget_and_stats(self):
+        """Test libraries are evicted least recently used first once over budget"""
+        machine = StateMachine(self.storage, DialogCache(max_bytes=self.library_bytes * 2))
+        player = PlayerState(player_id="seeker")
+        for governor_id in ("ABRIOND", "OCCODON", "ABRIOND", "PASCOMB"):
+            machine.get_current_node(governor_id, player)
+        
+        stats = machine.get_cache_stats()
+        self.assertEqual(set(stats['governor_bytes']), {"ABRIOND", "PASCOMB"})
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 3, 1))
+        self.assertEqual(stats['total_bytes'], sum(stats['governor_bytes'].values()))
+        self.assertLessEqual(stats['total_bytes'], stats['max_bytes'])
+        
+        # Libraries over the governor quota are served without being kept
+        machine = StateMachine(self.storage, DialogCache(governor_quota_bytes=self.library_bytes - 1))
+        self.assertIsNotNone(machine.get_dialog_library("OCCODON"))
+        self.assertNotIn("OCCODON", machine.dialog_cache)
+        self.assertEqual(machine.get_cache_stats()['rejected'], 1)
+        print("✅ Dialog cache LRU budget test passed")
+    
+    def test_rejected_library_not_reloaded(self):
+        """Test an over-quota library is held outside the budget instead of reloaded per message"""
+        selector = ResponseSelector()
+        machine = StateMachine(self.storage, DialogCache(governor_quota_bytes=self.library_bytes - 1),
+                               response_selector=selector)
+        loads = []
+        load_dialog_library = self.storage.load_dialog_library
+        
+        def counting_load(governor_id):
+            loads.append(governor_id)
+            return load_dialog_library(governor_id)
+        self.storage.load_dialog_library = counting_load
+        
+        library = machine.get_dialog_library("OCCODON")
+        table = machine.dialog_cache.transition_table("OCCODON", library)
+        selector._variant_features.clear()
+        self.assertIs(machine.get_dialog_library("OCCODON"), library)
+        self.assertIs(machine.dialog_cache.transition_table("OCCODON", library), table)
+        
+        stats = machine.get_cache_stats()
+        self.assertEqual(loads, ["OCCODON"])
+        self.assertEqual(len(selector._variant_features), 0)
+        self.assertEqual((stats['rejected'], stats['rejected_hits'], stats['total_bytes']), (1, 1, 0))
+        self.assertNotIn("OCCODON", machine.dialog_cache)
+        print("✅ Rejected library reuse test passed")
+    
+    def test_lazy_view_growth_trimmed_to_quota(self):
+        """Test views are re-measured as nodes decode and trimmed at the governor quota"""
+        encoded_bytes = len(self.storage.load_dialog_library("VALGARS").blocks.data)
+        machine = StateMachine(self.storage, DialogCache(governor_quota_bytes=encoded_bytes + 2000))
+        
+        library = machine.get_dialog_library("VALGARS")
+        self.assertIsInstance(library, DialogLibraryView)
+        self.assertEqual(machine.get_cache_stats()['governor_bytes']["VALGARS"], encoded_bytes)
+        
+        library.get_dialog_node("VALGARS_node_1")
+        library = machine.get_dialog_library("VALGARS")
+        self.assertEqual(library.blocks.nodes_decoded, 1)
+        self.assertGreater(machine.get_cache_stats()['governor_bytes']["VALGARS"], encoded_bytes)
+        
+        for index in range(200):
+            library.get_dialog_node(f"VALGARS_node_{index}")
+        library = machine.get_dialog_library("VALGARS")
+        stats = machine.get_cache_stats()
+        self.assertEqual(library.blocks.nodes_decoded, 0)
+        self.assertEqual((stats['quota_trims'], stats['governor_bytes']["VALGARS"]), (1, encoded_bytes))
+        self.assertIsNotNone(library.get_dialog_node("VALGARS_node_7"))
+        print("✅ Lazy view quota test passed")
+    
+    def test_variant_features_precomputed_on_load(self):
+        """Test response variant features are extracted when a library is loaded, not on selection"""
+        selector = ResponseSelector()
+        machine = StateMachine(self.storage, response_selector=selector)
+        for governor_id in ("ABRIOND", "VALGARS"):
+            library = machine.get_dialog_library(governor_id)
+            for variant in library.get_response_variants("greeting"):
+                self.assertIn(variant, selector._variant_features)
+        
+        selector._variant_features.clear()
+        machine.get_dialog_library("ABRIOND")
+        self.assertEqual(len(selector._variant_features), 0)
+        print("✅ Variant feature precompute test passed")
+
+def build_branching_library(governor_id: str, node_count: int = 30) -> DialogLibrarySchema:
+    """Build a densely branching library with every kind of requirement and a dangling target"""
+    intents = [intent for intent in IntentCategory if intent != IntentCategory.UNKNOWN]
+    library = DialogLibrarySchema(governor_id=governor_id, version="1.0")
+    node_ids = [f"{governor_id}_intro"] + [f"{governor_id}_node_{index}" for index in range(1, node_count)]
+    for index, node_id in enumerate(node_ids):
+        requirements = {"min_reputation": index % 4} if index % 3 else {}
+        if index % 5 == 1:
+            requirements["required_items"] = ["crystal", f"sigil_{index % 2}"]
+        if index % 7 == 2:
+            requirements["required_flags"] = ["met_governor"]
+        transitions = {intent.value: node_ids[(index + offset * 3) % node_count]
+                       for offset, intent in enumerate(intents) if (index + offset) % 4}
+        transitions[IntentCategory.OFF_TOPIC.value] = f"{governor_id}_missing"
+        library.add_dialog_node(DialogNode(id=node_id, content=["..."], transitions=transitions,
+                                           requirements=requirements))
+    return library
+
+class TestTransitionTable(unittest.TestCase):
+    """Test compiled transition dispatch against the TransitionValidator path"""
+    
+    def _validated_transition(self, machine: StateMachine, governor_id: str, player_state: PlayerState,
+                              profile: GovernorProfile, intent: IntentCategory) -> TransitionAttempt:
+        """Reference transition: node lookups plus TransitionValidator.validate_transition"""
+        current_node = machine.get_current_node(governor_id, player_state)
+        if not current_node:
+            return TransitionAttempt("unknown", None, intent, TransitionResult.NODE_NOT_FOUND, {},
+                                     {"error": f"No dialog library found for governor {governor_id}"})
+        target_node_id = current_node.get_next_node_id(intent)
+        if not target_node_id:
+            return TransitionAttempt(current_node.id, None, intent, TransitionResult.INVALID_INTENT, {},
+                                     {"error": f"No transition defined for intent {intent.value} "
+                                               f"from node {current_node.id}"})
+        target_node = machine.get_dialog_library(governor_id).get_dialog_node(target_node_id)
+        if not target_node:
+            return TransitionAttempt(current_node.id, target_node_id, intent, TransitionResult.NODE_NOT_FOUND, {},
+                                     {"error": f"Target node {target_node_id} not found"})
+        return machine.validator.validate_transition(current_node, target_node, player_state, profile, intent)
+    
+    def test_compiled_transitions_match_validator(self):
+        """Test every (node, intent) pair gives the validator's result for varied players"""
+        storage = StorageManager(decoded_cache=DecodedLibraryCache())
+        storage.store_dialog_library(build_branching_library("ABRIOND"))
+        storage.store_dialog_library(build_branching_library("OCCODON"), layout=LibraryLayout.NODE_BLOCKS)
+        machine = StateMachine(storage)
+        
+        players = [PlayerState(player_id="novice"),
+                   PlayerState(player_id="adept", reputation={"ABRIOND": 2, "OCCODON": 2}, inventory=["crystal"]),
+                   PlayerState(player_id="master", reputation={"ABRIOND": 9, "OCCODON": 9},
+                               inventory=["crystal", "sigil_0", "sigil_1"], story_flags={"met_governor"})]
+        compared = 0
+        for governor_id in ("ABRIOND", "OCCODON", "PASCOMB"):
+            profile = GovernorProfile(governor_id=governor_id, name=governor_id.title())
+            library = build_branching_library(governor_id)
+            for node_id in list(library.dialog_nodes) + [None, f"{governor_id}_missing"]:
+                for player in players:
+                    player.current_nodes.pop(governor_id, None)
+                    if node_id:
+                        player.set_current_node(governor_id, node_id)
+                    for intent in IntentCategory:
+                        self.assertEqual(machine.attempt_transition(governor_id, player, profile, intent),
+                                         self._validated_transition(machine, governor_id, player, profile, intent))
+                        compared += 1
+        
+        self.assertGreater(compared, 3000)
+        print("✅ Compiled transition table test passed")
+    
+    def test_transition_table_kept_with_cache_entry(self):
+        """Test tables are compiled once per cached library and dropped with it"""
+        storage = StorageManager(decoded_cache=DecodedLibraryCache())
+        storage.store_dialog_library(build_branching_library("ABRIOND"))
+        machine = StateMachine(storage)
+        profile = GovernorProfile(governor_id="ABRIOND", name="Abriond")
+        player = PlayerState(player_id="seeker", reputation={"ABRIOND": 5},
+                             inventory=["crystal", "sigil_0", "sigil_1"], story_flags={"met_governor"})
+        
+        attempt = machine.attempt_transition("ABRIOND", player, profile, IntentCategory.QUESTION)
+        self.assertEqual(attempt.result, TransitionResult.SUCCESS)
+        library = machine.get_dialog_library("ABRIOND")
+        table = machine.dialog_cache.transition_table("ABRIOND", library)
+        self.assertIs(machine.dialog_cache.transition_table("ABRIOND", library), table)
+        self.assertEqual(table.compile_all(), 30)
+        
+        machine.dialog_cache.discard("ABRIOND")
+        library = machine.get_dialog_library("ABRIOND")
+        self.assertIsNot(machine.dialog_cache.transition_table("ABRIOND", library), table)
+        print("✅ Transition table caching test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Dialog Storage Components
+========================================
+
+This module tests the on-chain storage layer of the dialog system: dialog
+library encoding, the StorageManager and its decoded library cache.
+"""
+
+import hashlib
+import json
+import tempfile
+import unittest
+
+from tools.game_mechanics.dialog_system import (
+    DialogNode,
+    DialogLibrarySchema,
+    StorageManager
+)
+from tools.game_mechanics.dialog_system.storage_schemas import (
+    CompressionDictionary,
+    CompressionType,
+    CompressionUtils,
+    DecodedLibraryCache,
+    DialogLibraryView,
+    LibraryLayout
+)
+
+def build_library(governor_id: str, node_count: int = 20) -> DialogLibrarySchema:
+    """Build a dialog library with a chain of nodes and some response variants"""
+    library = DialogLibrarySchema(governor_id=governor_id, version="1.0")
+    for index in range(node_count):
+        library.add_dialog_node(DialogNode(
+            id=f"{governor_id}_node_{index}",
+            content=[f"Greetings, seeker of the {index}th mystery.", "The veil parts for the worthy."],
+            transitions={"question": f"{governor_id}_node_{(index + 1) % node_count}",
+                         "ritual_phrase": f"{governor_id}_intro"},
+            requirements={"min_reputation": index % 5},
+            metadata={"depth": index}
+        ))
+    library.add_response_variants("greeting", ["Hail, traveler", "Welcome, seeker"])
+    return library
+
+class TestStorageManager(unittest.TestCase):
+    """Test the StorageManager and its decoded library cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.decoded_cache = DecodedLibraryCache()
+        self.storage = StorageManager(decoded_cache=self.decoded_cache)
+    
+    def test_decoded_library_cached_by_content_hash(self):
+        """Test repeated loads decode once, verify once and return detached libraries"""
+        reference = self.storage.store_dialog_library(build_library("ABRIOND"))
+        first = self.storage.load_dialog_library("ABRIOND")
+        self.assertEqual(first.to_dict(), build_library("ABRIOND").to_dict())
+        
+        # Verified once: later loads never touch (or re-hash) the inscription data
+        self.storage.inscription_cache[reference.inscription_id] = "tampered"
+        second = self.storage.load_dialog_library("ABRIOND")
+        self.assertEqual(second.to_dict(), first.to_dict())
+        self.assertEqual(self.decoded_cache.get_stats()['hits'], 1)
+        
+        # Another manager sharing the cache skips decoding; an unverified one does not
+        other = StorageManager(decoded_cache=self.decoded_cache)
+        other.reference_index.update(self.storage.reference_index)
+        self.assertIsNotNone(other.load_dialog_library("ABRIOND"))
+        fresh = StorageManager(decoded_cache=DecodedLibraryCache())
+        fresh.reference_index.update(self.storage.reference_index)
+        fresh.inscription_cache.update(self.storage.inscription_cache)
+        with self.assertRaises(ValueError):
+            fresh.load_dialog_library("ABRIOND")
+        
+        # Callers own the top-level containers
+        second.add_response_variants("greeting", [])
+        self.assertEqual(first.get_response_variants("greeting"), ["Hail, traveler", "Welcome, seeker"])
+        self.assertEqual(self.storage.load_dialog_library("ABRIOND").get_response_variants("greeting"),
+                         ["Hail, traveler", "Welcome, seeker"])
+        print("✅ Decoded library cache test passed")
+    
+    def test_decoded_cache_budget_and_disk(self):
+        """Test the memory budget evicts least recently used libraries and disk survives restarts"""
+        with tempfile.TemporaryDirectory() as disk_dir:
+            self.storage.decoded_cache = DecodedLibraryCache(max_bytes=12000, disk_dir=disk_dir)
+            for governor_id in ("ABRIOND", "OCCODON", "PASCOMB"):
+                self.storage.store_dialog_library(build_library(governor_id))
+                self.storage.load_dialog_library(governor_id)
+            
+            stats = self.storage.decoded_cache.get_stats()
+            self.assertGreater(stats['evictions'], 0)
+            self.assertLessEqual(stats['total_bytes'], 12000)
+            self.assertEqual(stats['misses'], 3)
+            
+            # A new process: decoded libraries come from disk without the inscription data
+            restarted = DecodedLibraryCache(disk_dir=disk_dir)
+            self.storage.decoded_cache = restarted
+            self.storage.clear_cache()
+            library = self.storage.load_dialog_library("ABRIOND")
+            self.assertEqual(library.to_dict(), build_library("ABRIOND").to_dict())
+            self.assertEqual(restarted.get_stats()['disk_hits'], 1)
+            
+            restarted.clear(include_disk=True)
+            self.assertIsNone(self.storage.load_dialog_library("ABRIOND"))
+        print("✅ Decoded cache budget and disk test passed")
+    
+    def test_decoded_cache_disk_entries_are_verified(self):
+        """Test disk entries are data only and tampered or foreign files are discarded"""
+        with tempfile.TemporaryDirectory() as disk_dir:
+            self.storage.decoded_cache = DecodedLibraryCache(disk_dir=disk_dir)
+            self.storage.store_dialog_library(build_library("ABRIOND"))
+            self.storage.store_dialog_library(build_library("OCCODON"), layout=LibraryLayout.NODE_BLOCKS)
+            for governor_id in ("ABRIOND", "OCCODON"):
+                self.storage.load_dialog_library(governor_id)
+            
+            for governor_id in ("ABRIOND", "OCCODON"):
+                restarted = DecodedLibraryCache(disk_dir=disk_dir)
+                content_hash = self.storage.reference_index[f"{governor_id}_dialog_library"].content_hash
+                path = restarted._disk_path(content_hash)
+                header, payload = path.read_bytes().split(b"\n", 1)
+                self.assertEqual(json.loads(header)["content_hash"], content_hash)
+                
+                # Changing the payload breaks its digest
+                path.write_bytes(header + b"\n" + payload.replace(governor_id.encode(), b"MALLORY"))
+                self.assertIsNone(restarted.get(content_hash))
+                self.assertFalse(path.exists())
+                
+                # Node blocks are also checked against the inscription hash, so a matching digest is not enough
+                if governor_id == "OCCODON":
+                    forged = payload.replace(b"OCCODON", b"MALLORY")
+                    forged_header = dict(json.loads(header), digest=hashlib.sha256(forged).hexdigest())
+                    path.write_bytes(json.dumps(forged_header).encode() + b"\n" + forged)
+                    self.assertIsNone(restarted.get(content_hash))
+        print("✅ Decoded cache disk verification test passed")
+    
+    def test_decoded_cache_remeasures_shared_views(self):
+        """Test nodes decoded through shared views count against the memory budget"""
+        self.storage.store_dialog_library(build_library("OCCODON", 200), layout=LibraryLayout.NODE_BLOCKS)
+        library = self.storage.load_dialog_library("OCCODON")
+        encoded_bytes = self.decoded_cache.get_stats()['total_bytes']
+        
+        for index in range(200):
+            library.get_dialog_node(f"OCCODON_node_{index}")
+        self.storage.load_dialog_library("OCCODON")
+        self.assertEqual(self.decoded_cache.get_stats()['total_bytes'],
+                         encoded_bytes + library.blocks.decoded_bytes)
+        self.assertGreater(library.blocks.decoded_bytes, 0)
+        print("✅ Decoded cache view re-measure test passed")
+    
+    def test_node_block_layout_decodes_lazily(self):
+        """Test node block libraries decode nodes on access and keep the schema API"""
+        for compression in (CompressionType.NONE, CompressionType.GZIP):
+            reference = self.storage.store_dialog_library(build_library("ABRIOND"), compression,
+                                                          layout=LibraryLayout.NODE_BLOCKS)
+            self.assertEqual(reference.metadata['layout'], LibraryLayout.NODE_BLOCKS.value)
+            self.decoded_cache.clear()
+            
+            library = self.storage.load_dialog_library("ABRIOND")
+            self.assertIsInstance(library, DialogLibraryView)
+            self.assertEqual(library.blocks.nodes_decoded, 0)
+            self.assertEqual(library.get_dialog_node("ABRIOND_node_3").transitions["question"], "ABRIOND_node_4")
+            self.assertIsNone(library.get_dialog_node("missing"))
+            self.assertEqual(library.blocks.nodes_decoded, 1)
+            self.assertEqual(library.to_dict(), build_library("ABRIOND").to_dict())
+        
+        # Local edits stay on the caller's copy; the cached view keeps the stored nodes
+        library.add_dialog_node(build_library("OCCODON", 1).get_dialog_node("OCCODON_node_0"))
+        del library.dialog_nodes["ABRIOND_node_0"]
+        self.assertEqual(len(library.dialog_nodes), 20)
+        self.assertIn("OCCODON_node_0", library.to_dict()["dialog_nodes"])
+        reloaded = self.storage.load_dialog_library("ABRIOND")
+        self.assertIn("ABRIOND_node_0", reloaded.dialog_nodes)
+        self.assertNotIn("OCCODON_node_0", reloaded.dialog_nodes)
+        
+        # Views persist to the disk cache as their encoded blocks
+        with tempfile.TemporaryDirectory() as disk_dir:
+            self.storage.decoded_cache = DecodedLibraryCache(disk_dir=disk_dir)
+            self.storage.load_dialog_library("ABRIOND")
+            restarted = DecodedLibraryCache(disk_dir=disk_dir)
+            self.storage.decoded_cache = restarted
+            library = self.storage.load_dialog_library("ABRIOND")
+            self.assertEqual(restarted.get_stats()['disk_hits'], 1)
+            self.assertEqual(library.to_dict(), build_library("ABRIOND").to_dict())
+        print("✅ Node block layout test passed")
+
+    def test_trained_dictionary_compression(self):
+        """Test ZDICT libraries round-trip in both layouts and beat GZIP on unseen libraries"""
+        dictionary = CompressionDictionary.train_from_libraries(
+            [build_library(governor_id) for governor_id in ("ABRIOND", "OCCODON", "PASCOMB")]
+        )
+        self.assertLessEqual(len(dictionary.data), 32 * 1024)
+        CompressionUtils.register_dictionary(dictionary)
+        
+        library = build_library("VALGARS")
+        for layout in LibraryLayout:
+            zdict_reference = self.storage.store_dialog_library(library, CompressionType.ZDICT, layout=layout)
+            gzip_size = StorageManager().store_dialog_library(library, CompressionType.GZIP, layout=layout).size_bytes
+            self.assertLess(zdict_reference.size_bytes, gzip_size)
+            self.decoded_cache.clear()
+            self.assertEqual(self.storage.load_dialog_library("VALGARS").to_dict(), library.to_dict())
+        
+        # The dictionary id travels with the data; unknown dictionaries are rejected
+        compressed = CompressionUtils.compress_content("{}", CompressionType.ZDICT)
+        CompressionUtils.register_dictionary(CompressionDictionary(b"unrelated dictionary"))
+        self.assertEqual(CompressionUtils.decompress_content(compressed, CompressionType.ZDICT), "{}")
+        with self.assertRaises(ValueError):
+            CompressionUtils.decompress_content(b"\0\0\0\0" + compressed[4:], CompressionType.ZDICT)
+        print("✅ Trained dictionary compression test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -7,9 +7,12 @@ This module provides thorough testing of all governor preference components
 including unit tests, integration tests, and performance validation.
 """
 
+import os
 import unittest
 import time
 import sys
+import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import Mock, patch
 from dataclasses import dataclass
@@ -32,7 +35,15 @@ from tools.game_mechanics.dialog_system import (
     PuzzleDifficulty,
     PreferenceEncoding,
     TraitBehaviorMapping,
-    BehaviorType
+    BehaviorType,
+    DialogLibrarySchema,
+    build_preference_snapshot
+)
+from tools.game_mechanics.dialog_system.text_features import scanner_for_preferences
+from tools.game_mechanics.dialog_system.cache_optimizer import (
+    AdvancedCache, CacheLevel, CacheTags, CountMinSketch, L3Backend, PreferenceOptimizer,
+    SegmentL3StorageManager,
+    ShardedAdvancedCache, TimingWheel, TinyLFUAdmissionPolicy
 )
 
 class TestPreferenceEncoder(unittest.TestCase):
@@ -98,6 +109,38 @@ class TestPreferenceEncoder(unittest.TestCase):
         self.assertIsInstance(preferences, GovernorPreferences)
         self.assertEqual(preferences.governor_id, 'empty')
         print("✅ Error handling test passed: graceful degradation with empty traits")
+    
+    def test_batch_encoding_matches_individual(self):
+        """Test vectorized batch encoding agrees with per-governor encoding"""
+        trait_sets = [
+            ['mystical', 'scholarly', 'patient'], ['Stern', 'formal '], ['wise', 'playful'],
+            ['cryptic', 'cryptic', 'unknown'], ['playful'], ['patient', 'methodical'], [], ['obscure'],
+            ['wise', 'cryptic', 'mystical', 'formal'], ['stern', 'patient']
+        ]
+        profiles = [
+            GovernorProfile(governor_id=f'gov_{index}', name=f'Governor{index}', traits=traits,
+                            preferences={'puzzle_style': 'metaphor'} if index % 2 else {})
+            for index, traits in enumerate(trait_sets)
+        ]
+        
+        # A lowering 'stern' formality makes results depend on trait order for stern + patient/formal
+        self.encoder.trait_mappings['stern'].parameter_modifications['greeting_formality'] = -0.9
+        
+        for batch, individual in zip(self.encoder.encode_preferences_batch(profiles),
+                                     [self.encoder.encode_governor_preferences(p) for p in profiles]):
+            self.assertEqual(batch.governor_id, individual.governor_id)
+            self.assertEqual((batch.tone_preference, batch.puzzle_difficulty, batch.interaction_style),
+                             (individual.tone_preference, individual.puzzle_difficulty, individual.interaction_style))
+            for param in ('greeting_formality', 'response_patience', 'metaphor_tolerance', 'reputation_sensitivity'):
+                self.assertAlmostEqual(getattr(batch, param), getattr(individual, param), places=12)
+            self.assertEqual(batch.behavioral_modifiers.keys(), individual.behavioral_modifiers.keys())
+            for key, value in individual.behavioral_modifiers.items():
+                self.assertAlmostEqual(batch.behavioral_modifiers[key], value, places=12)
+            self.assertEqual(sorted(batch.trigger_words), sorted(individual.trigger_words))
+            self.assertEqual(sorted(batch.preferred_topics), sorted(individual.preferred_topics))
+        
+        self.assertEqual(self.encoder.encode_preferences_batch([]), [])
+        print("✅ Batch preference encoding test passed")
 
 class TestTraitMapper(unittest.TestCase):
     """Test the TraitMapper component"""
@@ -154,6 +197,142 @@ class TestTraitMapper(unittest.TestCase):
         
         self.assertGreater(summary['total_mappings'], 0)
         print(f"✅ Mapping summary test passed: {summary['total_mappings']} total mappings")
+    
+    def test_conflict_log_bounded_with_statistics(self):
+        """Test conflicts are kept in a ring buffer and aggregated per trait set"""
+        mapper = TraitMapper(conflict_log_size=3)
+        traits = ['mystical', 'scholarly', 'patient']
+        mappings = mapper.get_all_mappings_for_traits(traits)
+        weights = {trait: 1.0 / len(traits) for trait in traits}
+        
+        mapper.resolve_parameter_conflicts(mappings, weights)
+        per_call = mapper.conflicts_recorded
+        self.assertGreater(per_call, 0)
+        for _ in range(9):
+            mapper.resolve_parameter_conflicts(mappings, weights)
+        
+        self.assertEqual(mapper.conflicts_recorded, per_call * 10)
+        self.assertLessEqual(len(mapper.parameter_conflicts), 3)
+        self.assertEqual(mapper.conflict_trace, [])
+        
+        statistics = mapper.export_conflict_statistics()
+        self.assertEqual(len(statistics), per_call)
+        self.assertTrue(all(stats['count'] == 10 and sum(stats['histogram']) == 10 for stats in statistics))
+        self.assertEqual(mapper.get_mapping_summary()['conflicts_recorded'], per_call * 10)
+        
+        tracing = TraitMapper(conflict_log_size=1, trace_conflicts=True)
+        tracing.resolve_parameter_conflicts(mappings, weights)
+        tracing.resolve_parameter_conflicts(mappings, weights)
+        self.assertEqual(len(tracing.conflict_trace), per_call * 2)
+        tracing.reset_conflict_statistics()
+        self.assertEqual((tracing.conflicts_recorded, tracing.export_conflict_statistics()), (0, []))
+        print("✅ Bounded conflict log test passed")
+    
+    def test_trait_resolution_memoized_by_signature(self):
+        """Test trait sets resolve once per mapping version and custom mappings invalidate"""
+        encoder = PreferenceEncoder()
+        first = GovernorProfile(governor_id='FIRST', name='First',
+                                traits=['Mystical', 'scholarly', 'patient'], preferences={})
+        reordered = GovernorProfile(governor_id='SECOND', name='Second',
+                                    traits=['patient', 'mystical ', 'Scholarly'], preferences={})
+        
+        first_preferences = self.mapper.apply_trait_mappings_to_preferences(
+            first, encoder.encode_governor_preferences(first))
+        conflicts = self.mapper.conflicts_recorded
+        second_preferences = self.mapper.apply_trait_mappings_to_preferences(
+            reordered, encoder.encode_governor_preferences(reordered))
+        
+        summary = self.mapper.get_mapping_summary()['resolution_cache']
+        self.assertEqual((summary['hits'], summary['misses']), (1, 1))
+        self.assertEqual(self.mapper.conflicts_recorded, conflicts * 2)
+        self.assertEqual(second_preferences.governor_id, 'SECOND')
+        self.assertAlmostEqual(second_preferences.response_patience, first_preferences.response_patience)
+        self.assertEqual(second_preferences.behavioral_modifiers, first_preferences.behavioral_modifiers)
+        
+        version = self.mapper.mapping_version
+        self.mapper.add_custom_mapping(TraitBehaviorMapping(
+            trait_name='patient',
+            behavior_type=BehaviorType.PATIENCE_MODIFIER,
+            parameter_modifications={'response_patience': -0.4},
+            effect_strength=1.0,
+            description='Test override'
+        ))
+        self.assertGreater(self.mapper.mapping_version, version)
+        overridden = self.mapper.apply_trait_mappings_to_preferences(
+            first, encoder.encode_governor_preferences(first))
+        self.assertLess(overridden.response_patience, first_preferences.response_patience)
+        print("✅ Trait signature memoization test passed")
+    
+    def test_batch_trait_mapping_matches_individual(self):
+        """Test vectorized trait mapping agrees with per-governor mapping, conflicts included"""
+        manager = GovernorPreferencesManager(enable_caching=False)
+        profiles = [
+            GovernorProfile(governor_id=f'gov_{index}', name=f'Governor{index}', traits=traits, preferences={})
+            for index, traits in enumerate([
+                ['mystical', 'scholarly', 'patient'], ['stern', 'formal', 'stern'], ['obscure'],
+                ['cryptic'], ['Patient', 'scholarly', 'mystical'], ['wise', 'methodical', 'playful']
+            ])
+        ]
+        
+        batch = manager.generate_preferences_batch(profiles)
+        batch_statistics = manager.trait_mapper.export_conflict_statistics()
+        individual = [self.mapper.apply_trait_mappings_to_preferences(profile, base) for profile, base in
+                      zip(profiles, [manager.preference_encoder.encode_governor_preferences(p) for p in profiles])]
+        
+        for batch_preferences, preferences in zip(batch, individual):
+            for param in ('greeting_formality', 'response_patience', 'metaphor_tolerance', 'reputation_sensitivity'):
+                self.assertAlmostEqual(getattr(batch_preferences, param), getattr(preferences, param), places=12)
+            self.assertEqual(batch_preferences.behavioral_modifiers.keys(), preferences.behavioral_modifiers.keys())
+            for key, value in preferences.behavioral_modifiers.items():
+                self.assertAlmostEqual(batch_preferences.behavioral_modifiers[key], value, places=12)
+        
+        self.assertEqual(manager.trait_mapper.conflicts_recorded, self.mapper.conflicts_recorded)
+        self.assertEqual([(s['parameter'], s['traits'], s['count']) for s in batch_statistics],
+                         [(s['parameter'], s['traits'], s['count'])
+                          for s in self.mapper.export_conflict_statistics()])
+        with self.assertRaises(ValueError):
+            manager.trait_mapper.apply_trait_mappings_batch(profiles, batch[:1])
+        print("✅ Batch trait mapping test passed")
+
+class TestTextFeatureScanner(unittest.TestCase):
+    """Test the shared token-based text feature scanner"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.preferences = GovernorPreferences(
+            governor_id='test_scanner',
+            tone_preference=TonePreference.SOLEMN_CRYPTIC,
+            interaction_style='riddle_keeper',
+            greeting_formality=0.5,
+            puzzle_difficulty=PuzzleDifficulty.MODERATE,
+            response_patience=0.5,
+            metaphor_tolerance=0.5,
+            reputation_sensitivity=0.5,
+            trigger_words=['Sacred Geometry', 'sigil'],
+            forbidden_words=['whatever'],
+            preferred_topics=['hidden_truths']
+        )
+    
+    def test_single_pass_counts_whole_tokens(self):
+        """Test all categories are counted by whole tokens and phrases in one scan"""
+        scanner = scanner_for_preferences(self.preferences)
+        self.assertIs(scanner, scanner_for_preferences(self.preferences))
+        
+        features = scanner.scan("May I ask, as a seeker: kindly reveal the sacred   geometry of hidden truths?")
+        self.assertEqual(features.count('input_formal'), 2)  # "may i", "kindly"
+        self.assertEqual(features.count('metaphor'), 1)  # "as", not "ask"
+        self.assertTrue(features.has('trigger'))
+        self.assertEqual(features.matches['topic'], {'hidden', 'truths'})
+        self.assertFalse(features.has('forbidden'))
+        
+        # Substrings inside other words no longer match
+        masked = scanner.scan("The mask hides the sigils; hello, whatevers.")
+        self.assertFalse(masked.has('metaphor'))
+        self.assertFalse(masked.has('trigger'))
+        self.assertFalse(masked.has('profanity'))
+        self.assertFalse(self.preferences.has_forbidden_word("whatevers"))
+        self.assertTrue(self.preferences.has_forbidden_word("Whatever, mortal."))
+        print("✅ Text feature scanner test passed")
 
 class TestResponseSelector(unittest.TestCase):
     """Test the ResponseSelector component"""
@@ -239,6 +418,639 @@ class TestResponseSelector(unittest.TestCase):
         self.assertIsInstance(modified_response, str)
         self.assertGreater(len(modified_response), 0)
         print(f"✅ Tone modification test passed: '{base_response}' → '{modified_response}'")
+    
+    def test_variant_features_cached_per_library(self):
+        """Test variant features are extracted once and reused across governors"""
+        library = DialogLibrarySchema(governor_id='test_selector', version='1.0')
+        library.add_response_variants('greeting', [
+            'Indeed, seeker, your wisdom grows through patient study.',
+            'The ancient knowledge reveals itself to those who seek.'
+        ])
+        self.assertEqual(self.selector.precompute_library_features(library), 2)
+        
+        features = self.selector.get_variant_features('Indeed, seeker, your wisdom grows through patient study.')
+        self.assertIs(features, self.selector.get_variant_features(
+            'Indeed, seeker, your wisdom grows through patient study.'
+        ))
+        scanned = features.features(scanner_for_preferences(self.sample_preferences))
+        self.assertIs(scanned, features.features(scanner_for_preferences(self.sample_preferences)))
+        self.assertEqual(scanned.balance('formal', 'casual'), 1)
+        self.assertTrue(scanned.has('trigger'))
+        
+        selected = self.selector.select_response_variant(
+            library.get_response_variants('greeting'), self.sample_preferences, {}
+        )
+        self.assertIn('wisdom', selected)
+        
+        small_selector = ResponseSelector(max_cached_variants=1)
+        small_selector.precompute_library_features(library)
+        self.assertEqual(len(small_selector._variant_features), 1)
+        print("✅ Variant feature cache test passed")
+
+class TestAdvancedCache(unittest.TestCase):
+    """Test the AdvancedCache multi-level cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage_dir.cleanup)
+    
+    def _create_cache(self, **kwargs) -> AdvancedCache:
+        """Create a cache whose L3 tier lives in a temporary directory"""
+        return AdvancedCache(l3_storage_dir=self.storage_dir.name, **kwargs)
+    
+    def test_l2_entries_are_compressed(self):
+        """Test L1 evictions are stored as compressed bytes in L2"""
+        cache = self._create_cache(max_l1_size=1)
+        payload = {'governor': 'OCCODON', 'text': 'wisdom ' * 200}
+        cache.put('OCCODON_a', payload)
+        cache.put('OCCODON_b', {'data': 'value'})
+        
+        entry = cache.l2_cache['OCCODON_a']
+        self.assertEqual(entry.cache_level, CacheLevel.L2_COMPRESSED)
+        self.assertIsInstance(entry.data, bytes)
+        self.assertEqual(entry.compressed_size, len(entry.data))
+        self.assertLess(entry.compressed_size, entry.uncompressed_size)
+        self.assertEqual(cache.get_stats()['l2_bytes'], entry.compressed_size)
+        
+        # Promotion decompresses back into L1
+        self.assertEqual(cache.get('OCCODON_a'), payload)
+        self.assertIn('OCCODON_a', cache.l1_cache)
+        self.assertNotIn('OCCODON_a', cache.l2_cache)
+        print("✅ Compressed L2 tier test passed")
+    
+    def test_cached_none_and_expired_l2_miss(self):
+        """Test None survives the L2 round trip and expired L2 entries miss without an L3 probe"""
+        cache = self._create_cache(max_l1_size=1, ttl_seconds=60)
+        cache.put('response_silence', None)
+        cache.put('response_other', 'Greetings')
+        self.assertIn('response_silence', cache.l2_cache)
+        
+        self.assertIsNone(cache.get('response_silence'))
+        self.assertIn('response_silence', cache.l1_cache)
+        self.assertEqual(cache.get_stats()['cache_levels']['l2_hits'], 1)
+        
+        cache.put('response_stale', 'wisdom')
+        cache.l2_cache['response_silence'].timestamp -= 120
+        probes = []
+        cache._l3_storage_manager.load_from_persistent_cache = probes.append
+        self.assertIsNone(cache.get('response_silence'))
+        self.assertEqual(probes, [])
+        self.assertNotIn('response_silence', cache.l2_cache)
+        self.assertEqual(cache.get_stats()['cache_levels']['l1_misses'], 1)
+        print("✅ Cached None and expired L2 miss test passed")
+    
+    def test_l2_byte_budget_eviction(self):
+        """Test L2 evicts by compressed bytes and spills to L3"""
+        cache = self._create_cache(max_l1_size=1, max_l2_bytes=200)
+        for index in range(10):
+            cache.put(f"key_{index}", {'index': index, 'text': f"variant {index}"})
+        
+        stats = cache.get_stats()
+        self.assertLessEqual(stats['l2_bytes'], 200)
+        self.assertGreater(stats['l3_size'], 0)
+        self.assertEqual(cache.get('key_0'), {'index': 0, 'text': 'variant 0'})
+        print(f"✅ L2 byte budget test passed: {stats['l2_bytes']} bytes resident")
+    
+    def test_tag_invalidation_across_tiers(self):
+        """Test governor invalidation removes tagged keys from every tier"""
+        cache = self._create_cache(max_l1_size=1, max_l2_bytes=1)
+        occodon = CacheTags.governor('OCCODON')
+        cache.put('preferences_OCCODON', {'tone': 'solemn'}, tags=[occodon])
+        cache.put('response_abc', 'Greetings', tags=[occodon, CacheTags.traits(['mystical'])])
+        cache.put('preferences_PASCOMB', {'tone': 'stern'}, tags=[CacheTags.governor('PASCOMB')])
+        self.assertIn('preferences_OCCODON', cache.l3_cache)
+        
+        cache.clear('OCCODON')
+        self.assertIsNone(cache.get('preferences_OCCODON'))
+        self.assertIsNone(cache.get('response_abc'))
+        self.assertIsNone(cache._l3_storage_manager.load_from_persistent_cache('preferences_OCCODON'))
+        self.assertEqual(cache.get('preferences_PASCOMB'), {'tone': 'stern'})
+        self.assertEqual(cache.invalidate_tag(CacheTags.traits(['mystical'])), 0)
+        self.assertEqual(cache.get_stats()['cache_levels']['invalidations'], 2)
+        print("✅ Tag invalidation test passed")
+    
+    def test_tinylfu_admission_protects_hot_entries(self):
+        """Test one-off keys from a scan do not displace hot L1 entries"""
+        cache = self._create_cache(max_l1_size=4, admission_policy=TinyLFUAdmissionPolicy(capacity=4))
+        hot_keys = [f"preferences_{name}" for name in ('OCCODON', 'PASCOMB', 'VALGARS', 'DOAGNIS')]
+        for key in hot_keys:
+            cache.put(key, key)
+            for _ in range(3):
+                cache.get(key)
+        
+        for index in range(50):
+            cache.put(f"response_{index}", index)
+        
+        self.assertEqual(set(cache.l1_cache), set(hot_keys))
+        stats = cache.get_stats()
+        self.assertEqual(stats['admission_policy'], 'TinyLFUAdmissionPolicy')
+        self.assertEqual(stats['cache_levels']['rejections'], 50)
+        self.assertEqual(stats['cache_levels']['admissions'], 0)
+        print("✅ TinyLFU admission test passed")
+    
+    def test_count_min_sketch_aging(self):
+        """Test sketch estimates and periodic halving"""
+        sketch = CountMinSketch(width=16, sample_size=20)
+        for _ in range(10):
+            sketch.increment('hot')
+        self.assertGreaterEqual(sketch.estimate('hot'), 10)
+        for index in range(10):
+            sketch.increment(f"cold_{index}")
+        self.assertEqual(sketch.resets, 1)
+        self.assertLessEqual(sketch.estimate('hot'), 7)
+        print("✅ Count-min sketch aging test passed")
+    
+    def test_timing_wheel_expiry_order(self):
+        """Test the wheel fires keys after their deadlines, across cascading levels"""
+        wheel = TimingWheel(tick_seconds=1.0, slots_per_level=8, levels=3, start_time=0)
+        deadlines = {'near': 3.5, 'middle': 40.0, 'far': 300.0, 'beyond': 5000.0}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+        wheel.schedule('cancelled', 10.0)
+        wheel.cancel('cancelled')
+        
+        self.assertEqual(wheel.advance(3.0), [])
+        self.assertEqual(wheel.advance(4.0), ['near'])
+        self.assertEqual(wheel.advance(39.0), [])
+        self.assertEqual(wheel.advance(40.0), ['middle'])
+        self.assertEqual(wheel.advance(299.0), [])
+        self.assertEqual(wheel.advance(1000.0), ['far'])
+        self.assertEqual(wheel.advance(5000.0), ['beyond'])
+        self.assertEqual(len(wheel), 0)
+        print("✅ Timing wheel expiry test passed")
+    
+    def test_expire_entries_reclaims_bytes(self):
+        """Test expired L1 and L2 entries are reclaimed and accounted"""
+        cache = self._create_cache(max_l1_size=1, ttl_seconds=60)
+        cache.put('response_old', 'wisdom ' * 50, tags=[CacheTags.governor('OCCODON')])
+        cache.put('response_new', 'guidance ' * 50)
+        self.assertIn('response_old', cache.l2_cache)
+        cache._serialize_data = lambda data: self.fail("expiry must not serialize entries")
+        
+        self.assertEqual(cache.expire_entries(), 0)
+        self.assertEqual(cache.expire_entries(time.time() + 120), 2)
+        
+        stats = cache.get_stats()
+        self.assertEqual(stats['l1_size'] + stats['l2_size'], 0)
+        self.assertEqual(stats['l2_bytes'], 0)
+        self.assertEqual(stats['tag_count'], 0)
+        self.assertEqual(stats['expiry_tracked'], 0)
+        self.assertEqual(stats['cache_levels']['expirations'], 2)
+        self.assertGreater(stats['cache_levels']['reclaimed_bytes'], 0)
+        print("✅ Expiry reclamation test passed")
+    
+    def test_background_expiry_sweeper(self):
+        """Test the sweeper thread reclaims entries without explicit calls"""
+        cache = self._create_cache(ttl_seconds=0.05, expiry_tick_seconds=0.01)
+        cache.put('response_short_lived', 'Greetings')
+        sweeper = cache.start_expiry_sweeper(interval_seconds=0.02)
+        self.addCleanup(cache.stop_expiry_sweeper)
+        
+        deadline = time.time() + 2.0
+        while cache.l1_cache and time.time() < deadline:
+            time.sleep(0.02)
+        
+        self.assertNotIn('response_short_lived', cache.l1_cache)
+        self.assertGreater(sweeper.sweeps, 0)
+        print("✅ Background expiry sweeper test passed")
+
+class TestGovernorPreferencesManager(unittest.TestCase):
+    """Test the GovernorPreferencesManager preference cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.manager = GovernorPreferencesManager()
+        self.profile = GovernorProfile(
+            governor_id='OCCODON',
+            name='Occodon',
+            traits=['mystical', 'scholarly', 'patient'],
+            preferences={'tone': 'formal'}
+        )
+    
+    def test_expire_stale_preferences(self):
+        """Test cached preferences past their TTL are reclaimed"""
+        preferences = self.manager.get_governor_preferences(self.profile)
+        self.assertIs(self.manager.get_governor_preferences(self.profile), preferences)
+        
+        self.assertEqual(self.manager.expire_stale_preferences(), 0)
+        expired = self.manager.expire_stale_preferences(time.time() + self.manager.cache_ttl + 1)
+        self.assertEqual(expired, 1)
+        self.assertNotIn('OCCODON', self.manager.preference_cache)
+        
+        status = self.manager.get_system_status()
+        self.assertEqual(status['expired_preferences'], 1)
+        self.assertGreater(status['reclaimed_bytes'], 0)
+        print("✅ Preference expiry test passed")
+    
+    def test_concurrent_misses_generate_once(self):
+        """Test concurrent misses for one governor share a single generation"""
+        release = threading.Event()
+        encode = self.manager.preference_encoder.encode_governor_preferences
+        calls = []
+        
+        def slow_encode(profile):
+            calls.append(profile.governor_id)
+            release.wait(5.0)
+            return encode(profile)
+        
+        results = []
+        with patch.object(self.manager.preference_encoder, 'encode_governor_preferences', side_effect=slow_encode):
+            threads = [threading.Thread(target=lambda: results.append(
+                self.manager.get_governor_preferences(self.profile))) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            deadline = time.time() + 2.0
+            while self.manager.preference_cache.stats['coalesced'] < 7 and time.time() < deadline:
+                time.sleep(0.01)
+            release.set()
+            for thread in threads:
+                thread.join(5.0)
+        
+        self.assertEqual(calls, ['OCCODON'])
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        stats = self.manager.preference_cache.get_stats()
+        self.assertEqual((stats['misses'], stats['coalesced'], stats['in_flight']), (1, 7, 0))
+        print("✅ Single-flight preference generation test passed")
+    
+    def test_bounded_lru_preference_cache(self):
+        """Test the preference cache evicts least recently used governors beyond its budgets"""
+        manager = GovernorPreferencesManager(max_cached_governors=2)
+        profiles = [
+            GovernorProfile(governor_id=governor_id, name=governor_id.title(),
+                            traits=['mystical'], preferences={})
+            for governor_id in ('ABRIOND', 'OCCODON', 'ZAMFRES')
+        ]
+        manager.get_governor_preferences(profiles[0])
+        manager.get_governor_preferences(profiles[1])
+        manager.get_governor_preferences(profiles[0])  # ABRIOND most recently used
+        manager.get_governor_preferences(profiles[2])
+        
+        self.assertIn('ABRIOND', manager.preference_cache)
+        self.assertNotIn('OCCODON', manager.preference_cache)
+        self.assertEqual(manager.preference_cache.stats['evictions'], 1)
+        
+        size = manager.preference_cache.total_bytes // 2
+        byte_bounded = GovernorPreferencesManager(max_cache_bytes=size + size // 2)
+        for profile in profiles:
+            byte_bounded.get_governor_preferences(profile)
+        self.assertEqual(len(byte_bounded.preference_cache), 1)
+        self.assertLessEqual(byte_bounded.preference_cache.total_bytes, size + size // 2)
+        print("✅ Bounded preference cache test passed")
+    
+    def test_preference_snapshot_load_and_staleness(self):
+        """Test snapshot preferences are served until the profiles change"""
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        profiles_dir = Path(work_dir.name) / 'profiles'
+        profiles_dir.mkdir()
+        for name in ('OCCODON', 'PASCOMB'):
+            (profiles_dir / f"{name}.json").write_text(f'{{"governor_name": "{name}"}}')
+        snapshot_path = Path(work_dir.name) / 'preference_snapshot.bin'
+        
+        summary = build_preference_snapshot(snapshot_path, profiles_dir)
+        self.assertEqual(summary['governors'], 2)
+        
+        manager = GovernorPreferencesManager(snapshot_path=str(snapshot_path),
+                                             profiles_dir=str(profiles_dir))
+        self.addCleanup(manager.preference_snapshot.close)
+        profile = GovernorProfile.from_governor_data({'governor_name': 'OCCODON'})
+        preferences = manager.get_governor_preferences(profile)
+        self.assertEqual(preferences.governor_id, 'OCCODON')
+        self.assertEqual(manager.get_system_status()['snapshot_hits'], 1)
+        
+        # A runtime profile that differs from the snapshot's is encoded live
+        manager.get_governor_preferences(self.profile)
+        self.assertEqual(manager.snapshot_hits, 1)
+        
+        (profiles_dir / 'PASCOMB.json').write_text('{"governor_name": "PASCOMB", "tone": "stern"}')
+        stale_manager = GovernorPreferencesManager()
+        self.assertFalse(stale_manager.load_preference_snapshot(str(snapshot_path), str(profiles_dir)))
+        self.assertIsNone(stale_manager.preference_snapshot)
+        print("✅ Preference snapshot test passed")
+
+class TestPreferenceOptimizer(unittest.TestCase):
+    """Test the PreferenceOptimizer batch paths"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage_dir.cleanup)
+        self.optimizer = PreferenceOptimizer(AdvancedCache(l3_storage_dir=self.storage_dir.name))
+        self.encoder = PreferenceEncoder()
+        trait_sets = [['mystical', 'scholarly'], ['stern', 'formal', 'patient'], ['cryptic']]
+        self.profiles = [
+            GovernorProfile(
+                governor_id=f"GOVERNOR_{index}",
+                name=f"Governor{index}",
+                traits=trait_sets[index % 3],
+                preferences={'puzzle_style': 'metaphor' if index % 2 else 'direct'}
+            )
+            for index in range(30)
+        ]
+    
+    def test_batch_encoding_deduplicates_signatures(self):
+        """Test each trait signature is encoded once and patched per governor"""
+        results = self.optimizer.optimize_batch_encoding(
+            self.profiles, self.encoder.encode_governor_preferences
+        )
+        
+        for profile in self.profiles:
+            expected = self.encoder.encode_governor_preferences(profile)
+            actual = results[profile.governor_id]
+            self.assertEqual(actual.governor_id, profile.governor_id)
+            self.assertEqual(actual.tone_preference, expected.tone_preference)
+            self.assertEqual(actual.greeting_formality, expected.greeting_formality)
+            self.assertEqual(set(actual.trigger_words), set(expected.trigger_words))
+            self.assertEqual(set(actual.preferred_topics), set(expected.preferred_topics))
+        
+        stats = self.optimizer.optimization_stats
+        self.assertEqual(stats['signature_encodings'], 3)
+        self.assertEqual(stats['patched_encodings'], 27)
+        print("✅ Signature-deduplicated batch encoding test passed")
+
+    def test_clear_governor_removes_optimizer_entries(self):
+        """Test every governor-specific entry the optimizer writes is tagged for clear()"""
+        self.optimizer.optimize_batch_encoding(self.profiles, self.encoder.encode_governor_preferences)
+        preferences = self.optimizer.cache.get('preferences_GOVERNOR_0')
+        self.optimizer.optimize_response_selection(
+            ['Greetings, seeker', 'Welcome'], preferences, lambda variants, prefs, context: variants[0], {}
+        )
+        cache = self.optimizer.cache
+        tagged = set(cache._tag_index[CacheTags.governor('GOVERNOR_0')])
+        self.assertEqual(len(tagged), 2)
+        
+        cache.clear('GOVERNOR_0')
+        self.assertTrue(all(cache.get(key) is None for key in tagged))
+        self.assertNotIn(CacheTags.governor('GOVERNOR_0'), cache._tag_index)
+        self.assertIsNotNone(cache.get('preferences_GOVERNOR_1'))
+        print("✅ Optimizer governor clear test passed")
+
+class TestSegmentL3Storage(unittest.TestCase):
+    """Test the append-only segment L3 storage backend"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage_dir.cleanup)
+    
+    def _create_storage(self, **kwargs) -> SegmentL3StorageManager:
+        """Create a segment store that is closed after the test"""
+        storage = SegmentL3StorageManager(self.storage_dir.name, **kwargs)
+        self.addCleanup(storage.close)
+        return storage
+    
+    def test_save_load_and_reopen(self):
+        """Test records survive a restart via index rebuild"""
+        storage = self._create_storage()
+        self.assertTrue(storage.save_to_persistent_cache('OCCODON_prefs', {'tone': 'solemn'}))
+        self.assertTrue(storage.save_to_persistent_cache('OCCODON_prefs', {'tone': 'cryptic'}))
+        self.assertEqual(storage.load_from_persistent_cache('OCCODON_prefs'), {'tone': 'cryptic'})
+        storage.close()
+        
+        reopened = self._create_storage()
+        self.assertEqual(reopened.load_from_persistent_cache('OCCODON_prefs'), {'tone': 'cryptic'})
+        self.assertIsNone(reopened.load_from_persistent_cache('missing'))
+        print("✅ Segment save/load/reopen test passed")
+    
+    def test_directory_owned_by_one_manager(self):
+        """Test a second manager cannot append to a directory that is already owned"""
+        storage = self._create_storage()
+        with self.assertRaises(RuntimeError):
+            SegmentL3StorageManager(self.storage_dir.name)
+        storage.close()
+        
+        reopened = self._create_storage()
+        self.assertTrue(reopened.save_to_persistent_cache('OCCODON_prefs', {'tone': 'solemn'}))
+        print("✅ Segment directory ownership test passed")
+    
+    def test_corrupt_record_is_rejected(self):
+        """Test CRC verification drops corrupted records"""
+        storage = self._create_storage()
+        storage.save_to_persistent_cache('key', 'value')
+        location = storage.index['key']
+        with open(storage._segment_path(location.segment_id), 'r+b') as f:
+            f.seek(location.offset + location.length - 1)
+            f.write(b'\x00')
+        
+        self.assertIsNone(storage.load_from_persistent_cache('key'))
+        self.assertNotIn('key', storage.index)
+        print("✅ Segment CRC corruption test passed")
+    
+    def test_compaction_reclaims_dead_segments(self):
+        """Test compaction removes sealed segments and keeps live data"""
+        storage = self._create_storage(max_segment_bytes=256)
+        for version in range(20):
+            storage.save_to_persistent_cache('hot_key', f"version {version}")
+        size_before = storage.get_cache_size()
+        
+        reclaimed = storage.compact()
+        self.assertGreater(reclaimed, 0)
+        self.assertLess(storage.get_cache_size(), size_before)
+        self.assertEqual(storage.load_from_persistent_cache('hot_key'), 'version 19')
+        
+        self.assertTrue(storage.clear_persistent_cache())
+        self.assertEqual(storage.get_cache_size(), 0)
+        print(f"✅ Segment compaction test passed: {reclaimed} bytes reclaimed")
+    
+    def test_compaction_keeps_tombstones_for_older_segments(self):
+        """Test a deleted key stays deleted after compaction and reopen"""
+        storage = self._create_storage(max_segment_bytes=100)
+        storage.save_to_persistent_cache('K', 'stale')
+        storage.save_to_persistent_cache('live', os.urandom(300))  # Keeps segment 0 mostly live
+        self.assertTrue(storage.delete_from_persistent_cache('K'))
+        storage.save_to_persistent_cache('scratch', os.urandom(300))
+        storage.save_to_persistent_cache('scratch', 'small')  # Leaves the tombstone's segment all dead
+        
+        self.assertGreater(storage.compact(), 0)
+        self.assertIn(0, storage.segment_sizes)
+        storage.close()
+        
+        reopened = self._create_storage(max_segment_bytes=100)
+        self.assertIsNone(reopened.load_from_persistent_cache('K'))
+        self.assertEqual(reopened.load_from_persistent_cache('scratch'), 'small')
+        print("✅ Segment tombstone compaction test passed")
+    
+    def test_advanced_cache_segment_backend(self):
+        """Test AdvancedCache spills into the segment backend"""
+        cache = AdvancedCache(max_l1_size=1, max_l2_bytes=1, l3_storage_dir=self.storage_dir.name,
+                              l3_backend=L3Backend.SEGMENT)
+        self.addCleanup(cache._l3_storage_manager.close)
+        cache.put('a', {'data': 1})
+        cache.put('b', {'data': 2})
+        
+        self.assertIn('a', cache.l3_cache)
+        self.assertEqual(cache.get('a'), {'data': 1})
+        self.assertEqual(list(Path(self.storage_dir.name).glob('*.cache')), [])
+        print("✅ AdvancedCache segment backend test passed")
+
+class TestShardedAdvancedCache(unittest.TestCase):
+    """Test the lock-striped ShardedAdvancedCache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage_dir.cleanup)
+    
+    def test_concurrent_access_and_merged_stats(self):
+        """Test worker threads share the cache and stats merge across shards"""
+        cache = ShardedAdvancedCache(num_shards=4, max_l1_size=400,
+                                     l3_storage_dir=self.storage_dir.name, l3_backend=L3Backend.SEGMENT)
+        self.addCleanup(cache._l3_storage_manager.close)
+        
+        def worker(worker_id: int):
+            for index in range(50):
+                key = f"governor_{worker_id}_{index}"
+                cache.put(key, {'index': index})
+                self.assertEqual(cache.get(key), {'index': index})
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        stats = cache.get_stats()
+        self.assertEqual(stats['shards'], 4)
+        self.assertEqual(stats['cache_levels']['l1_hits'] + stats['cache_levels']['l2_hits'] +
+                         stats['cache_levels']['l3_hits'], 400)
+        self.assertEqual(sum(stats['shard_sizes']), stats['l1_size'] + stats['l2_size'])
+        print(f"✅ Sharded cache concurrency test passed: {stats['shard_sizes']}")
+    
+    def test_l3_read_does_not_hold_lock(self):
+        """Test a slow L3 read does not block other cache operations"""
+        release_read = threading.Event()
+        
+        class SlowStorage:
+            def save_to_persistent_cache(self, key, data):
+                return True
+            
+            def load_from_persistent_cache(self, key):
+                release_read.wait(5)
+                return {'restored': key}
+        
+        cache = AdvancedCache(max_l1_size=1, max_l2_bytes=1, l3_storage_manager=SlowStorage())
+        cache.put('cold', 1)
+        cache.put('warm', 2)
+        self.assertIn('cold', cache.l3_cache)
+        
+        reader = threading.Thread(target=cache.get, args=('cold',))
+        reader.start()
+        time.sleep(0.05)
+        
+        # Would deadlock until the read finished if the lock were held
+        writer = threading.Thread(target=cache.put, args=('other', 3))
+        writer.start()
+        writer.join(1)
+        self.assertFalse(writer.is_alive())
+        
+        release_read.set()
+        reader.join()
+        print("✅ L3 read outside lock test passed")
+    
+    def test_l3_read_not_promoted_after_invalidation(self):
+        """Test an invalidation or newer put during an L3 read is not undone by the promotion"""
+        reading, release_read = threading.Event(), threading.Event()
+        
+        class SlowStorage:
+            def save_to_persistent_cache(self, key, data):
+                return True
+            
+            def load_from_persistent_cache(self, key):
+                reading.set()
+                release_read.wait(5)
+                return 'persisted'
+            
+            def delete_from_persistent_cache(self, key):
+                return True
+        
+        occodon = CacheTags.governor('OCCODON')
+        for change in ('invalidate', 'put'):
+            reading.clear()
+            release_read.clear()
+            cache = AdvancedCache(max_l1_size=1, max_l2_bytes=1, l3_storage_manager=SlowStorage())
+            cache.put('response_cold', 'persisted', tags=[occodon])
+            cache.put('response_warm', 'other')
+            
+            results = []
+            reader = threading.Thread(target=lambda: results.append(cache.get('response_cold')))
+            reader.start()
+            self.assertTrue(reading.wait(5))
+            if change == 'invalidate':
+                cache.invalidate_tag(occodon)
+            else:
+                cache.put('response_cold', 'fresh')
+            release_read.set()
+            reader.join()
+            
+            if change == 'invalidate':
+                self.assertEqual(results, [None])
+                self.assertNotIn('response_cold', cache.l1_cache)
+                self.assertNotIn(occodon, cache._tag_index)
+            else:
+                self.assertEqual(results, ['fresh'])
+                self.assertEqual(cache.l1_cache['response_cold'].data, 'fresh')
+            self.assertEqual(cache._l3_loads, {})
+        print("✅ L3 promotion re-check test passed")
+    
+    def test_l3_read_retries_are_bounded(self):
+        """Test a key rewritten during every L3 read is reported as a miss after a few attempts"""
+        loads = []
+        
+        class RacingStorage:
+            def save_to_persistent_cache(self, key, data):
+                return True
+            
+            def load_from_persistent_cache(self, key):
+                loads.append(key)
+                # Another worker rewrites the key and pushes it back out to L3
+                cache.put(key, len(loads))
+                cache.put('response_other', len(loads))
+                return 'persisted'
+        
+        cache = AdvancedCache(max_l1_size=1, max_l2_bytes=1, l3_storage_manager=RacingStorage())
+        cache.put('response_hot', 0)
+        cache.put('response_other', 0)
+        
+        self.assertIsNone(cache.get('response_hot'))
+        self.assertEqual(len(loads), AdvancedCache.MAX_L3_READ_ATTEMPTS)
+        self.assertEqual(cache._l3_loads, {})
+        print("✅ Bounded L3 read retry test passed")
+    
+    def test_l3_write_deleted_after_invalidation(self):
+        """Test a spill written while its key is invalidated does not stay persisted"""
+        saving, release_save = threading.Event(), threading.Event()
+        deleted = []
+        
+        class SlowStorage:
+            def save_to_persistent_cache(self, key, data):
+                saving.set()
+                release_save.wait(5)
+                return True
+            
+            def load_from_persistent_cache(self, key):
+                return None
+            
+            def delete_from_persistent_cache(self, key):
+                deleted.append(key)
+                return True
+        
+        occodon = CacheTags.governor('OCCODON')
+        cache = AdvancedCache(max_l1_size=1, max_l2_bytes=1, l3_storage_manager=SlowStorage())
+        cache.put('response_cold', 'persisted', tags=[occodon])
+        writer = threading.Thread(target=cache.put, args=('response_warm', 'other'))
+        writer.start()
+        self.assertTrue(saving.wait(5))
+        
+        self.assertEqual(cache.invalidate_tag(occodon), 1)
+        release_save.set()
+        writer.join()
+        
+        self.assertEqual(deleted, ['response_cold'])
+        self.assertNotIn('response_cold', cache.l3_cache)
+        self.assertEqual(cache._l3_writes_in_flight, set())
+        print("✅ L3 write invalidation test passed")
 
 if __name__ == '__main__':
     print("🚀 Governor Preferences System - Comprehensive Test Suite")